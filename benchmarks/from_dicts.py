@@ -0,0 +1,45 @@
+''' Compare deserializing batches of dicts with from_dicts against
+    constructing each contract, for plain and compiled contracts.
+
+    python benchmarks/from_dicts.py [count]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+import timeit
+
+import lazycontract
+
+
+class Record(lazycontract.LazyContract):
+
+    id = lazycontract.IntegerProperty()
+    name = lazycontract.StringProperty()
+    score = lazycontract.FloatProperty()
+    active = lazycontract.BooleanProperty()
+    tags = lazycontract.ListProperty(lazycontract.StringProperty())
+
+
+class CompiledRecord(Record):
+
+    _compiled = True
+
+
+def report(name, count, seconds):
+    print('{:<40} {:>8.3f} s {:>10.2f} us per record'.format(name, seconds, seconds / count * 1e6))
+
+
+def main(count):
+    objs = [dict(id=i, name='record {}'.format(i), score=i / 2, active=i % 2 == 0,
+                 tags=['a', 'b']) for i in range(count)]
+
+    for contract in (Record, CompiledRecord):
+        report('[{}(obj) for obj in objs]'.format(contract.__name__), count,
+               min(timeit.repeat(lambda: [contract(obj) for obj in objs], number=1, repeat=5)))
+        report('{}.from_dicts(objs)'.format(contract.__name__), count,
+               min(timeit.repeat(lambda: contract.from_dicts(objs), number=1, repeat=5)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
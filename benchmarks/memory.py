@@ -0,0 +1,61 @@
+''' Compare the memory used by contracts stored in the instance __dict__
+    with contracts stored in __slots__ (the _slotted option).
+
+    python benchmarks/memory.py [count]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import gc
+import sys
+import tracemalloc
+
+import lazycontract
+
+
+class DictContract(lazycontract.LazyContract):
+
+    id = lazycontract.IntegerProperty()
+    name = lazycontract.StringProperty()
+    score = lazycontract.FloatProperty()
+    active = lazycontract.BooleanProperty()
+    tags = lazycontract.ListProperty(lazycontract.StringProperty())
+
+
+class SlottedContract(lazycontract.LazyContract):
+
+    _slotted = True
+
+    id = lazycontract.IntegerProperty()
+    name = lazycontract.StringProperty()
+    score = lazycontract.FloatProperty()
+    active = lazycontract.BooleanProperty()
+    tags = lazycontract.ListProperty(lazycontract.StringProperty())
+
+
+def measure(contract, messages):
+    gc.collect()
+    tracemalloc.start()
+    instances = [contract(message) for message in messages]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return size
+
+
+def main(count):
+    tags = ['a', 'b']
+    messages = [dict(id=i, name='name', score=0.5, active=True, tags=tags)
+                for i in range(count)]
+
+    baseline = measure(DictContract, messages)
+    print('{:<20} {:>12} bytes {:>8.1f} bytes/instance'.format(
+        'DictContract', baseline, baseline / count))
+
+    slotted = measure(SlottedContract, messages)
+    print('{:<20} {:>12} bytes {:>8.1f} bytes/instance ({:.0%})'.format(
+        'SlottedContract', slotted, slotted / count, slotted / baseline))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
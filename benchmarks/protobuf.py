@@ -0,0 +1,61 @@
+''' Compare the size and speed of contracts encoded as protobuf messages
+    by lazycontract.codecs.protobuf with JSON.
+
+    python benchmarks/protobuf.py [count]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import json
+import sys
+import timeit
+
+import lazycontract
+from lazycontract.codecs import protobuf
+
+
+class Location(lazycontract.LazyContract):
+
+    latitude = lazycontract.FloatProperty(tag=1)
+    longitude = lazycontract.FloatProperty(tag=2)
+
+
+class Event(lazycontract.LazyContract):
+
+    id = lazycontract.IntegerProperty(tag=1)
+    name = lazycontract.StringProperty(tag=2)
+    score = lazycontract.FloatProperty(tag=3)
+    active = lazycontract.BooleanProperty(tag=4)
+    tags = lazycontract.ListProperty(lazycontract.StringProperty(), tag=5)
+    counts = lazycontract.ListProperty(lazycontract.IntegerProperty(), tag=6)
+    location = lazycontract.ObjectProperty(Location, tag=7)
+
+
+def report(name, count, size, encode, decode):
+    print('{:<30} {:>8} bytes {:>10.2f} us encode {:>10.2f} us decode'.format(
+        name, size, encode / count * 1e6, decode / count * 1e6))
+
+
+def main(count):
+    event = Event(id=123456789, name='sensor reading', score=0.75, active=True,
+                  tags=['north', 'roof'], counts=[1, 20, 300, 4000],
+                  location=dict(latitude=45.5, longitude=-73.6))
+
+    text = json.dumps(event.to_dict())
+    report('json.dumps(to_dict())', count, len(text.encode('utf-8')),
+           timeit.timeit(lambda: json.dumps(event.to_dict()), number=count),
+           timeit.timeit(lambda: Event(json.loads(text)), number=count))
+
+    text = event.to_json()
+    report('to_json / from_json', count, len(text.encode('utf-8')),
+           timeit.timeit(event.to_json, number=count),
+           timeit.timeit(lambda: Event.from_json(text), number=count))
+
+    data = protobuf.dumps(event)
+    report('protobuf', count, len(data),
+           timeit.timeit(lambda: protobuf.dumps(event), number=count),
+           timeit.timeit(lambda: protobuf.loads(Event, data), number=count))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1 @@
+''' Optional wire formats for contracts, derived from their declared properties '''
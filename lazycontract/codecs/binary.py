@@ -0,0 +1,623 @@
+''' Compact binary encoding of contracts derived from their declared properties.
+
+    A contract is encoded as a bitmap of the properties holding a value, a
+    bitmap of the values of boolean properties, then the value of each
+    remaining property with a value in declaration order:
+
+     * integers as zigzag varints
+     * floats as 8 little-endian bytes
+     * strings as a varint byte length followed by UTF-8
+     * UUIDs as 16 bytes
+     * contracts recursively, without their class
+     * lists and sets of a property as a varint length, a bitmap of the
+       elements which aren't None, then the elements; dicts likewise with
+       each key encoded as a self-describing value before the element
+     * anything else as the self-describing encoding of its serialized value
+
+    Property names aren't encoded, so both ends must use the same contract
+    definition. Undeclared attributes aren't encoded.
+
+    Contracts whose properties all declare a tag are instead encoded as their
+    length followed by a key for each value: a varint of the tag shifted left
+    by 3 bits, ORed with the wire type of the value (0 varint for integers
+    and booleans, 1 for 8-byte floats, 2 for values prefixed by their length
+    or 3 for None when the property doesn't exclude it). Decoders skip values
+    with unknown tags and leave the defaults of properties which are absent,
+    so producers and consumers may add and remove tagged properties
+    independently as long as tags aren't reused.
+'''
+
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, LazyContractError, _MISSING, _deserialization_error,
+                        _manages_assignment, _overrides_init)
+from ..properties import (StringProperty, IntegerProperty, FloatProperty, BooleanProperty,
+                          EnumerationProperty, ObjectProperty, ListProperty, SetProperty,
+                          DictProperty)
+from ..extra import UUIDProperty
+from .json import _is_plain, _PropertyError
+
+import six
+import struct
+import uuid
+import weakref
+
+
+_encoders = weakref.WeakKeyDictionary()  # contract encoder by contract class
+_decoders = weakref.WeakKeyDictionary()  # contract decoder by contract class
+
+_DOUBLE = struct.Struct('<d')
+
+# wire types of the values of tagged contracts
+_VARINT, _FIXED64, _DELIMITED, _NULL = range(4)
+
+# type codes of self-describing values
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STRING, _LIST, _DICT = range(8)
+
+
+def _truncated(index):
+    return ValueError('truncated data at offset {}'.format(index))
+
+
+def write_varint(out, value):
+    ''' Append a non-negative integer to a bytearray as a varint '''
+
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, index):
+    ''' Decode the varint at index, returning (value, index after the varint) '''
+
+    byte = data[index]
+    if byte < 0x80:
+        return byte, index + 1
+
+    result = 0
+    shift = 0
+    while True:
+        byte = data[index]
+        index += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, index
+        shift += 7
+
+
+def _write_int(out, value):
+    write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _read_int(data, index):
+    value, index = read_varint(data, index)
+    return (-((value + 1) >> 1) if value & 1 else value >> 1), index
+
+
+def _write_float(out, value):
+    out += _DOUBLE.pack(value)
+
+
+def _read_float(data, index):
+    try:
+        return _DOUBLE.unpack_from(data, index)[0], index + 8
+    except struct.error:
+        raise _truncated(index)
+
+
+def _write_bool(out, value):
+    out.append(1 if value else 0)
+
+
+def _read_bool(data, index):
+    return data[index] != 0, index + 1
+
+
+def _write_string(out, value):
+    if not isinstance(value, bytes):
+        value = value.encode('utf-8')
+    write_varint(out, len(value))
+    out += value
+
+
+def _read_string(data, index):
+    length, index = read_varint(data, index)
+    end = index + length
+    if end > len(data):
+        raise _truncated(index)
+    return data[index:end].decode('utf-8'), end
+
+
+def _write_uuid(out, value):
+    out += value.bytes
+
+
+def _read_uuid(data, index):
+    end = index + 16
+    if end > len(data):
+        raise _truncated(index)
+    return uuid.UUID(bytes=bytes(data[index:end])), end
+
+
+def _write_bitmap(out, flags):
+    ''' Append a bitmap of a sequence of flags, bit i & 7 of byte i >> 3 for flag i '''
+
+    bitmap = bytearray((len(flags) + 7) >> 3)
+    for i, flag in enumerate(flags):
+        if flag:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    out += bitmap
+
+
+def _read_bitmap(data, index, count):
+    ''' (bitmap of count flags at index, index after the bitmap), in which
+        flag i is bitmap[i >> 3] >> (i & 7) & 1
+    '''
+
+    end = index + ((count + 7) >> 3)
+    if end > len(data):
+        raise IndexError('truncated bitmap at offset {}'.format(index))
+    return data[index:end], end
+
+
+def write_value(out, value):
+    ''' Append a basic value (None, bool, int, float, string, list or dict of
+        basic values) to a bytearray in the self-describing encoding.
+    '''
+
+    if value is None:
+        out.append(_NONE)
+    elif value is True or value is False:
+        out.append(_TRUE if value else _FALSE)
+    elif isinstance(value, six.integer_types):
+        out.append(_INT)
+        _write_int(out, value)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        _write_float(out, value)
+    elif isinstance(value, six.string_types):
+        out.append(_STRING)
+        _write_string(out, value)
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        write_varint(out, len(value))
+        for element in value:
+            write_value(out, element)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        write_varint(out, len(value))
+        for key, element in six.iteritems(value):
+            write_value(out, key)
+            write_value(out, element)
+    else:
+        raise TypeError('{} is not a basic serializable type'.format(type(value).__name__))
+
+
+def _read_value(data, index):
+    code = data[index]
+    index += 1
+    if code == _NONE:
+        return None, index
+    elif code == _FALSE:
+        return False, index
+    elif code == _TRUE:
+        return True, index
+    elif code == _INT:
+        return _read_int(data, index)
+    elif code == _FLOAT:
+        return _read_float(data, index)
+    elif code == _STRING:
+        return _read_string(data, index)
+    elif code == _LIST:
+        length, index = read_varint(data, index)
+        result = []
+        for _ in six.moves.range(length):
+            value, index = _read_value(data, index)
+            result.append(value)
+        return result, index
+    elif code == _DICT:
+        length, index = read_varint(data, index)
+        result = dict()
+        for _ in six.moves.range(length):
+            key, index = _read_value(data, index)
+            result[key], index = _read_value(data, index)
+        return result, index
+    raise ValueError('invalid type code {} at offset {}'.format(code, index - 1))
+
+
+def read_value(data, index):
+    ''' Decode the self-describing value at index, returning (value, index after the value) '''
+
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+    return _read_value(data, index)
+
+
+def _write_elements(out, values, write_element):
+    write_varint(out, len(values))
+    _write_bitmap(out, [value is not None for value in values])
+    for value in values:
+        if value is not None:
+            write_element(out, value)
+
+
+def _read_elements(data, index, read_element):
+    length, index = read_varint(data, index)
+    bitmap, index = _read_bitmap(data, index, length)
+    result = []
+    for i in six.moves.range(length):
+        if bitmap[i >> 3] >> (i & 7) & 1:
+            value, index = read_element(data, index)
+            result.append(value)
+        else:
+            result.append(None)
+    return result, index
+
+
+def value_codec(inst):
+    ''' (write, read) functions encoding a property's non-null values:
+        write(bytearray, value) appends a value and read(data, index) returns
+        (deserialized value, index after the value).
+    '''
+
+    if _is_plain(inst, StringProperty) or _is_plain(inst, EnumerationProperty):
+        return _write_string, _read_string
+    elif _is_plain(inst, BooleanProperty):
+        return _write_bool, _read_bool
+    elif _is_plain(inst, IntegerProperty):
+        return _write_int, _read_int
+    elif _is_plain(inst, FloatProperty):
+        return _write_float, _read_float
+    elif _is_plain(inst, UUIDProperty):
+        return _write_uuid, _read_uuid
+    elif _is_plain(inst, ObjectProperty):
+        kind = inst._kind
+        return (lambda out, value: contract_encoder(kind)(out, value),
+                lambda data, index: contract_decoder(kind)(data, index))
+    elif (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty)) and \
+            inst._property is not None:
+        write_element, read_element = value_codec(inst._property)
+        kind = inst._type
+
+        def read(data, index):
+            elements, index = _read_elements(data, index, read_element)
+            return (elements if kind is list else kind(elements)), index
+
+        return (lambda out, value: _write_elements(out, list(value), write_element)), read
+    elif _is_plain(inst, DictProperty) and inst._property is not None:
+        write_element, read_element = value_codec(inst._property)
+
+        def write(out, value):
+            items = list(six.iteritems(value))
+            write_varint(out, len(items))
+            _write_bitmap(out, [element is not None for _, element in items])
+            for key, element in items:
+                write_value(out, key)
+                if element is not None:
+                    write_element(out, element)
+
+        def read(data, index):
+            length, index = read_varint(data, index)
+            bitmap, index = _read_bitmap(data, index, length)
+            result = dict()
+            for i in six.moves.range(length):
+                key, index = _read_value(data, index)
+                if bitmap[i >> 3] >> (i & 7) & 1:
+                    result[key], index = read_element(data, index)
+                else:
+                    result[key] = None
+            return result, index
+
+        return write, read
+
+    serialize = inst.serialize
+    deserialize = inst.deserialize
+
+    def read(data, index):
+        value, index = _read_value(data, index)
+        if value is not None:
+            try:
+                value = deserialize(value)
+            except Exception as e:
+                raise _PropertyError(value, e)
+        return value, index
+
+    return (lambda out, value: write_value(out, serialize(value))), read
+
+
+def _fields(cls):
+    ''' (attribute name, property) of the properties of cls which are encoded '''
+
+    return [(name, inst) for name, inst in six.iteritems(cls._schema.properties)
+            if not inst.name.startswith('_')]
+
+
+def _tagged(cls):
+    ''' Whether contracts of class cls use the tagged layout '''
+
+    tags = [inst.tag for _, inst in _fields(cls)]
+    if any(tag is None for tag in tags):
+        if any(tag is not None for tag in tags):
+            raise LazyContractError('{} must declare a tag for all or none of its properties'.format(
+                    cls.__name__))
+        return False
+    return bool(tags)
+
+
+def _wire_codec(inst):
+    ''' (wire type, write, read) of a property's non-null values in tagged contracts '''
+
+    if _is_plain(inst, IntegerProperty):
+        return _VARINT, _write_int, _read_int
+    elif _is_plain(inst, BooleanProperty):
+        return _VARINT, _write_bool, _read_bool
+    elif _is_plain(inst, FloatProperty):
+        return _FIXED64, _write_float, _read_float
+    elif _is_plain(inst, StringProperty) or _is_plain(inst, EnumerationProperty) or \
+            (_is_plain(inst, ObjectProperty) and _tagged(inst._kind)):
+        # already prefixed by their length
+        return (_DELIMITED,) + value_codec(inst)
+
+    write_value, read_value = value_codec(inst)
+
+    def write(out, value):
+        body = bytearray()
+        write_value(body, value)
+        write_varint(out, len(body))
+        out += body
+
+    def read(data, index):
+        length, index = read_varint(data, index)
+        end = index + length
+        value, index = read_value(data, index)
+        if index != end:
+            raise ValueError('invalid length at offset {}'.format(index))
+        return value, end
+
+    return _DELIMITED, write, read
+
+
+def skip_field(data, index, wire_type):
+    ''' Index after a value of a tagged contract with wire type wire_type at
+        index, found without decoding the value.
+    '''
+
+    if wire_type == _VARINT:
+        while data[index] >= 0x80:
+            index += 1
+        return index + 1
+    elif wire_type == _FIXED64:
+        return index + 8
+    elif wire_type == _DELIMITED:
+        length, index = read_varint(data, index)
+        return index + length
+    elif wire_type == _NULL:
+        return index
+    raise ValueError('invalid wire type {} at offset {}'.format(wire_type, index))
+
+
+def _builder(cls, fields):
+    ''' Function building a contract of class cls from a list of decoded values
+        of fields, where _MISSING leaves the property's default, and a sequence
+        of (key, value) of undefined attributes.
+    '''
+
+    # (attribute name, message key, validate or None)
+    specs = [(name, inst.name, None if _manages_assignment(inst) else inst.validate)
+             for name, inst in fields]
+    required = set(name for name, _ in cls._schema.required)
+    required = [i for i, (name, _) in enumerate(fields) if name in required]
+    construct = _overrides_init(cls)
+    new = cls.__new__
+    setattr_ = object.__setattr__
+
+    def build(values, undefined=()):
+        if construct:
+            # classes which define __init__ are constructed from a dict of the values
+            obj = dict(undefined)
+            obj.update((key, value) for (_, key, _), value in zip(specs, values)
+                       if value is not _MISSING)
+            return cls(obj)
+
+        contract = new(cls)
+        for (name, _, validate), value in zip(specs, values):
+            if value is _MISSING:
+                continue
+            elif validate is None:
+                setattr(contract, name, value)
+            else:
+                validate(value)
+                setattr_(contract, name, value)
+
+        for i in required:
+            if values[i] is _MISSING:
+                contract._check_required(set(key for (_, key, _), value in zip(specs, values)
+                                             if value is not _MISSING))
+
+        for key, value in undefined:
+            contract._undefined_attribute(key, value)
+
+        return contract
+
+    return build
+
+
+def contract_encoder(cls):
+    ''' Function appending a contract of class cls to a bytearray, built once per class '''
+
+    try:
+        return _encoders[cls]
+    except KeyError:
+        pass
+
+    if _tagged(cls):
+        encode = _tagged_encoder(cls)
+        _encoders[cls] = encode
+        return encode
+
+    fields = _fields(cls)
+    names = [name for name, _ in fields]
+    bools = [i for i, (_, inst) in enumerate(fields) if _is_plain(inst, BooleanProperty)]
+    writers = [None if i in bools else value_codec(inst)[0]
+               for i, (_, inst) in enumerate(fields)]
+
+    def encode(out, contract):
+        values = [getattr(contract, name) for name in names]
+
+        _write_bitmap(out, [value is not None for value in values])
+        if bools:
+            _write_bitmap(out, [values[i] for i in bools])
+
+        for value, write in zip(values, writers):
+            if value is not None and write is not None:
+                write(out, value)
+
+    _encoders[cls] = encode
+    return encode
+
+
+def _tagged_encoder(cls):
+    # (attribute name, key, key of a null value or None to omit it, write)
+    fields = []
+    for name, inst in _fields(cls):
+        wire_type, write, _ = _wire_codec(inst)
+        key = bytearray()
+        write_varint(key, inst.tag << 3 | wire_type)
+        null_key = None
+        if not inst.exclude_if_none:
+            null_key = bytearray()
+            write_varint(null_key, inst.tag << 3 | _NULL)
+        fields.append((name, bytes(key), null_key and bytes(null_key), write))
+
+    def encode(out, contract):
+        body = bytearray()
+        for name, key, null_key, write in fields:
+            value = getattr(contract, name)
+            if value is not None:
+                body += key
+                write(body, value)
+            elif null_key is not None:
+                body += null_key
+        write_varint(out, len(body))
+        out += body
+
+    return encode
+
+
+def contract_decoder(cls):
+    ''' Function decoding a contract of class cls at an index of a bytes-like
+        object, returning (contract, index after the contract). Built once per class.
+    '''
+
+    try:
+        return _decoders[cls]
+    except KeyError:
+        pass
+
+    if _tagged(cls):
+        decode = _tagged_decoder(cls)
+        _decoders[cls] = decode
+        return decode
+
+    fields = _fields(cls)
+    count = len(fields)
+    bools = [i for i, (_, inst) in enumerate(fields) if _is_plain(inst, BooleanProperty)]
+    # (attribute name, read or None for booleans, value when absent)
+    specs = [(name, None if i in bools else value_codec(inst)[1],
+              _MISSING if inst.exclude_if_none else None)
+             for i, (name, inst) in enumerate(fields)]
+    bool_bits = dict((i, j) for j, i in enumerate(bools))
+    build = _builder(cls, fields)
+
+    def decode(data, index):
+        present, index = _read_bitmap(data, index, count)
+        bits, index = _read_bitmap(data, index, len(bools))
+
+        values = []
+        append = values.append
+        for i, (name, read, absent) in enumerate(specs):
+            if not present[i >> 3] >> (i & 7) & 1:
+                append(absent)
+            elif read is None:
+                j = bool_bits[i]
+                append(bool(bits[j >> 3] >> (j & 7) & 1))
+            else:
+                try:
+                    value, index = read(data, index)
+                except _PropertyError as e:
+                    raise _deserialization_error(cls.__new__(cls), name, e.value, e.cause)
+                append(value)
+
+        return build(values), index
+
+    _decoders[cls] = decode
+    return decode
+
+
+def _tagged_decoder(cls):
+    fields = _fields(cls)
+    # (position, attribute name, wire type, read) by tag
+    specs = dict((inst.tag, (i, name) + _wire_codec(inst))
+                 for i, (name, inst) in enumerate(fields))
+    build = _builder(cls, fields)
+
+    def decode(data, index):
+        length, index = read_varint(data, index)
+        end = index + length
+        if end > len(data):
+            raise _truncated(index)
+
+        values = [_MISSING] * len(fields)
+        while index < end:
+            key, index = read_varint(data, index)
+            wire_type = key & 7
+            spec = specs.get(key >> 3)
+            if spec is None:
+                # unknown to this version of the contract
+                index = skip_field(data, index, wire_type)
+                continue
+
+            i, name, expected, _, read = spec
+            if wire_type == _NULL:
+                values[i] = None
+            elif wire_type != expected:
+                raise ValueError('wire type {} of {}.{} is not {} at offset {}'.format(
+                        wire_type, cls.__name__, name, expected, index))
+            else:
+                try:
+                    values[i], index = read(data, index)
+                except _PropertyError as e:
+                    raise _deserialization_error(cls.__new__(cls), name, e.value, e.cause)
+
+        if index != end:
+            raise ValueError('invalid length at offset {}'.format(index))
+        return build(values), index
+
+    return decode
+
+
+def dumps(contract):
+    ''' Serialize a contract to bytes '''
+
+    assert isinstance(contract, LazyContract)
+    out = bytearray()
+    contract_encoder(type(contract))(out, contract)
+    return bytes(out)
+
+
+def loads(cls, data):
+    ''' Deserialize a contract of class cls from a bytes-like object '''
+
+    assert issubclass(cls, LazyContract)
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+
+    try:
+        contract, index = contract_decoder(cls)(data, 0)
+    except (IndexError, struct.error):
+        raise _truncated(len(data))
+
+    if index != len(data):
+        raise ValueError('extra data at offset {}'.format(index))
+    return contract
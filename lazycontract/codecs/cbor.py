@@ -0,0 +1,545 @@
+''' CBOR (RFC 7049) encoding of contracts derived from their declared properties.
+
+    A contract is encoded as a map from the serialization name of each
+    property to its value. UUIDs are encoded as 16 bytes with tag 37, datetimes
+    as epoch seconds with tag 1 (naive datetimes are taken to be UTC) and bytes
+    as byte strings, so properties whose values are UUIDs, datetimes or bytes
+    are decoded without converting strings. Integers and lengths use their
+    smallest encoding and floats are encoded in 32 bits when that's exact.
+
+    Decoders also accept indefinite-length items, half-precision floats,
+    bignums (tags 2 and 3) and date/time strings (tag 0), and ignore other tags.
+'''
+
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, LazyProperty, _MISSING, _deserialization_error, _inherits,
+                        _message_keys)
+from ..properties import (StringProperty, IntegerProperty, FloatProperty, BooleanProperty,
+                          ObjectProperty, ListProperty, SetProperty, DictProperty)
+from .binary import _builder, _fields, _truncated
+from .json import _is_plain, _PropertyError
+
+import binascii
+import datetime
+import math
+import six
+import struct
+import uuid
+import weakref
+
+
+_encoders = weakref.WeakKeyDictionary()  # contract encoder by contract class
+_decoders = weakref.WeakKeyDictionary()  # contract decoder by contract class
+
+_UINT16 = struct.Struct('>H')
+_UINT32 = struct.Struct('>I')
+_UINT64 = struct.Struct('>Q')
+_FLOAT32 = struct.Struct('>f')
+_FLOAT64 = struct.Struct('>d')
+
+_UNSIGNED, _NEGATIVE, _BYTES, _TEXT, _ARRAY, _MAP, _TAG, _SIMPLE = range(8)
+
+_TAG_DATETIME_STRING = 0
+_TAG_EPOCH_DATETIME = 1
+_TAG_POSITIVE_BIGNUM = 2
+_TAG_NEGATIVE_BIGNUM = 3
+_TAG_UUID = 37
+
+_BREAK = 0xff
+
+try:
+    _UTC = datetime.timezone.utc
+except AttributeError:  # python 2
+    _UTC = None
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _encode_head(out, major, value):
+    if value < 24:
+        out.append(major << 5 | value)
+    elif value < 0x100:
+        out.append(major << 5 | 24)
+        out.append(value)
+    elif value < 0x10000:
+        out.append(major << 5 | 25)
+        out += _UINT16.pack(value)
+    elif value < 0x100000000:
+        out.append(major << 5 | 26)
+        out += _UINT32.pack(value)
+    else:
+        out.append(major << 5 | 27)
+        out += _UINT64.pack(value)
+
+
+def _encode_int(out, value):
+    if 0 <= value < 0x10000000000000000:
+        _encode_head(out, _UNSIGNED, value)
+    elif -0x10000000000000000 <= value < 0:
+        _encode_head(out, _NEGATIVE, -1 - value)
+    else:
+        # bignum
+        _encode_head(out, _TAG, _TAG_POSITIVE_BIGNUM if value >= 0 else _TAG_NEGATIVE_BIGNUM)
+        value = value if value >= 0 else -1 - value
+        digits = '{:x}'.format(value)
+        _encode_bytes(out, binascii.unhexlify('0' * (len(digits) % 2) + digits))
+
+
+def _encode_float(out, value):
+    try:
+        packed = _FLOAT32.pack(value)
+    except OverflowError:
+        packed = None
+    if packed is not None and _FLOAT32.unpack(packed)[0] == value:
+        out.append(0xfa)
+        out += packed
+    else:
+        out.append(0xfb)
+        out += _FLOAT64.pack(value)
+
+
+def _encode_bool(out, value):
+    out.append(0xf5 if value else 0xf4)
+
+
+def _encode_text(out, value):
+    if not isinstance(value, bytes):
+        value = value.encode('utf-8')
+    _encode_head(out, _TEXT, len(value))
+    out += value
+
+
+def _encode_bytes(out, value):
+    _encode_head(out, _BYTES, len(value))
+    out += value
+
+
+def _encode_uuid(out, value):
+    out.append(0xd8)
+    out.append(_TAG_UUID)
+    out.append(0x50)  # 16 bytes
+    out += value.bytes
+
+
+def _encode_datetime(out, value):
+    out.append(0xc0 | _TAG_EPOCH_DATETIME)
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    delta = value - _EPOCH
+    if delta.microseconds:
+        _encode_float(out, delta.total_seconds())
+    else:
+        _encode_int(out, delta.days * 86400 + delta.seconds)
+
+
+def encode_value(out, value):
+    ''' Append a basic value (None, bool, int, float, string, bytes, list or
+        dict of basic values), UUID or datetime to a bytearray as CBOR.
+    '''
+
+    if value is None:
+        out.append(0xf6)
+    elif value is True or value is False:
+        _encode_bool(out, value)
+    elif isinstance(value, six.integer_types):
+        _encode_int(out, value)
+    elif isinstance(value, float):
+        _encode_float(out, value)
+    elif isinstance(value, six.string_types):
+        _encode_text(out, value)
+    elif isinstance(value, (bytes, bytearray)):
+        _encode_bytes(out, value)
+    elif isinstance(value, (list, tuple)):
+        _encode_head(out, _ARRAY, len(value))
+        for element in value:
+            encode_value(out, element)
+    elif isinstance(value, dict):
+        _encode_head(out, _MAP, len(value))
+        for key, element in six.iteritems(value):
+            encode_value(out, key)
+            encode_value(out, element)
+    elif isinstance(value, uuid.UUID):
+        _encode_uuid(out, value)
+    elif isinstance(value, datetime.datetime):
+        _encode_datetime(out, value)
+    else:
+        raise TypeError('{} is not a basic serializable type'.format(type(value).__name__))
+
+
+def _decode_head(data, index):
+    ''' (major type, argument or None for indefinite length, index after the head) '''
+
+    byte = data[index]
+    major = byte >> 5
+    info = byte & 0x1f
+    if info < 24:
+        return major, info, index + 1
+    elif info == 24:
+        return major, data[index + 1], index + 2
+    elif info == 25:
+        return major, _UINT16.unpack_from(data, index + 1)[0], index + 3
+    elif info == 26:
+        return major, _UINT32.unpack_from(data, index + 1)[0], index + 5
+    elif info == 27:
+        return major, _UINT64.unpack_from(data, index + 1)[0], index + 9
+    elif info == 31 and major in (_BYTES, _TEXT, _ARRAY, _MAP):
+        return major, None, index + 1
+    raise ValueError('invalid CBOR item 0x{:02x} at offset {}'.format(byte, index))
+
+
+def _decode_half(value):
+    exponent = (value >> 10) & 0x1f
+    mantissa = value & 0x3ff
+    if exponent == 0:
+        result = math.ldexp(mantissa, -24)
+    elif exponent != 31:
+        result = math.ldexp(mantissa + 1024, exponent - 25)
+    else:
+        result = float('inf') if mantissa == 0 else float('nan')
+    return -result if value & 0x8000 else result
+
+
+def _decode_string(data, index, major, length):
+    if length is None:
+        # indefinite length: concatenation of definite length chunks
+        chunks = []
+        while data[index] != _BREAK:
+            chunk_major, length, index = _decode_head(data, index)
+            if chunk_major != major or length is None:
+                raise ValueError('invalid chunk of indefinite length string at offset {}'.format(
+                        index))
+            chunk, index = _decode_string(data, index, major, length)
+            chunks.append(chunk)
+        return (b'' if major == _BYTES else u'').join(chunks), index + 1
+
+    end = index + length
+    if end > len(data):
+        raise _truncated(index)
+    value = bytes(data[index:end])
+    return (value if major == _BYTES else value.decode('utf-8')), end
+
+
+def _decode_datetime(value):
+    if isinstance(value, six.string_types):
+        # RFC 3339
+        text = value[:-1] + '+00:00' if value.endswith(('Z', 'z')) else value
+        if hasattr(datetime.datetime, 'fromisoformat'):
+            return datetime.datetime.fromisoformat(text)
+        return value
+    elif isinstance(value, (six.integer_types, float)):
+        result = _EPOCH + datetime.timedelta(seconds=value)
+        return result if _UTC is None else result.replace(tzinfo=_UTC)
+    return value
+
+
+def _from_bignum(value, negative):
+    value = int(binascii.hexlify(value), 16) if value else 0
+    return -1 - value if negative else value
+
+
+def _decode_value(data, index):
+    info = data[index] & 0x1f
+    major, argument, index = _decode_head(data, index)
+    if major == _UNSIGNED:
+        return argument, index
+    elif major == _TEXT or major == _BYTES:
+        return _decode_string(data, index, major, argument)
+    elif major == _NEGATIVE:
+        return -1 - argument, index
+    elif major == _SIMPLE:
+        if info == 20:
+            return False, index
+        elif info == 21:
+            return True, index
+        elif info == 22 or info == 23:  # null or undefined
+            return None, index
+        elif info == 25:
+            return _decode_half(argument), index
+        elif info == 26:
+            return _FLOAT32.unpack_from(data, index - 4)[0], index
+        elif info == 27:
+            return _FLOAT64.unpack_from(data, index - 8)[0], index
+        raise ValueError('unsupported simple value {} at offset {}'.format(argument, index))
+    elif major == _ARRAY:
+        result = []
+        if argument is None:
+            while data[index] != _BREAK:
+                value, index = _decode_value(data, index)
+                result.append(value)
+            return result, index + 1
+        for _ in six.moves.range(argument):
+            value, index = _decode_value(data, index)
+            result.append(value)
+        return result, index
+    elif major == _MAP:
+        result = dict()
+        if argument is None:
+            while data[index] != _BREAK:
+                key, index = _decode_value(data, index)
+                result[key], index = _decode_value(data, index)
+            return result, index + 1
+        for _ in six.moves.range(argument):
+            key, index = _decode_value(data, index)
+            result[key], index = _decode_value(data, index)
+        return result, index
+
+    # tag
+    value, index = _decode_value(data, index)
+    if argument == _TAG_UUID and isinstance(value, bytes) and len(value) == 16:
+        return uuid.UUID(bytes=value), index
+    elif argument == _TAG_EPOCH_DATETIME or argument == _TAG_DATETIME_STRING:
+        return _decode_datetime(value), index
+    elif (argument == _TAG_POSITIVE_BIGNUM or argument == _TAG_NEGATIVE_BIGNUM) and \
+            isinstance(value, bytes):
+        return _from_bignum(value, argument == _TAG_NEGATIVE_BIGNUM), index
+    return value, index
+
+
+def decode_value(data, index):
+    ''' Decode the CBOR item at index into basic types, UUIDs and datetimes,
+        returning (value, index after the item).
+    '''
+
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+    return _decode_value(data, index)
+
+
+def value_encoder(inst):
+    ''' Function appending a property's non-null values to a bytearray '''
+
+    if _is_plain(inst, StringProperty):
+        return _encode_text
+    elif _is_plain(inst, BooleanProperty):
+        return _encode_bool
+    elif _is_plain(inst, IntegerProperty):
+        return _encode_int
+    elif _is_plain(inst, FloatProperty):
+        return _encode_float
+    elif _is_plain(inst, ObjectProperty):
+        kind = inst._kind
+        return lambda out, value: contract_encoder(kind)(out, value)
+    elif (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty)) and \
+            inst._property is not None:
+        encode = value_encoder(inst._property)
+
+        def encode_elements(out, value):
+            _encode_head(out, _ARRAY, len(value))
+            for element in value:
+                if element is None:
+                    out.append(0xf6)
+                else:
+                    encode(out, element)
+
+        return encode_elements
+    elif _is_plain(inst, DictProperty) and inst._property is not None:
+        encode = value_encoder(inst._property)
+
+        def encode_items(out, value):
+            _encode_head(out, _MAP, len(value))
+            for key, element in six.iteritems(value):
+                encode_value(out, key)
+                if element is None:
+                    out.append(0xf6)
+                else:
+                    encode(out, element)
+
+        return encode_items
+
+    # UUIDs and datetimes have their own tags, rather than their serialized strings
+    if isinstance(inst._type, type) and issubclass(inst._type, (uuid.UUID, datetime.datetime)):
+        return encode_value
+    # byte strings of properties which don't serialize them are binary even on
+    # python 2, where encode_value can't tell them from text
+    if inst._type is bytes and _inherits(type(inst), LazyProperty, 'serialize'):
+        return _encode_bytes
+
+    serialize = inst.serialize
+    return lambda out, value: encode_value(out, serialize(value))
+
+
+def contract_encoder(cls):
+    ''' Function appending a contract of class cls to a bytearray, built once per class '''
+
+    try:
+        return _encoders[cls]
+    except KeyError:
+        pass
+
+    # (attribute name, encoded key, value encoder, exclude_if_none)
+    specs = []
+    for name, inst in _fields(cls):
+        key = bytearray()
+        _encode_text(key, inst.name)
+        specs.append((name, bytes(key), value_encoder(inst), inst.exclude_if_none))
+
+    def encode(out, contract):
+        entries = []
+        for name, key, encode_value, exclude_if_none in specs:
+            value = getattr(contract, name)
+            if value is not None or not exclude_if_none:
+                entries.append((key, encode_value, value))
+
+        _encode_head(out, _MAP, len(entries))
+        for key, encode_value, value in entries:
+            out += key
+            if value is None:
+                out.append(0xf6)
+            else:
+                encode_value(out, value)
+
+    _encoders[cls] = encode
+    return encode
+
+
+def _deserializing_decoder(inst):
+    deserialize = inst.deserialize
+
+    def decode(data, index):
+        value, index = _decode_value(data, index)
+        if value is not None:
+            try:
+                value = deserialize(value)
+            except Exception as e:
+                raise _PropertyError(value, e)
+        return value, index
+
+    return decode
+
+
+def value_decoder(inst):
+    ''' Function decoding and deserializing a property's non-null value at an
+        index of a bytes-like object, returning (value, index after the value).
+    '''
+
+    fallback = _deserializing_decoder(inst)
+
+    for kind in (IntegerProperty, FloatProperty, BooleanProperty, StringProperty):
+        if _is_plain(inst, kind):
+            types = kind._type if isinstance(kind._type, tuple) else (kind._type,)
+
+            def decode(data, index):
+                value, end = _decode_value(data, index)
+                if type(value) in types:
+                    return value, end
+                return fallback(data, index)
+            return decode
+
+    if _is_plain(inst, ObjectProperty):
+        kind = inst._kind
+
+        def decode(data, index):
+            if data[index] >> 5 == _MAP:
+                return contract_decoder(kind)(data, index)
+            return fallback(data, index)
+        return decode
+
+    elif (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty) or
+          _is_plain(inst, DictProperty)) and inst._property is not None:
+        decode_element = value_decoder(inst._property)
+        kind = inst._type
+
+        def decode(data, index):
+            major, length, index = _decode_head(data, index)
+            if major != (_MAP if kind is dict else _ARRAY):
+                raise _PropertyError(None, ValueError('unexpected CBOR major type {}'.format(
+                        major)))
+
+            result = []
+            while (data[index] != _BREAK) if length is None else len(result) < length:
+                if kind is dict:
+                    key, index = _decode_value(data, index)
+                if data[index] == 0xf6:
+                    value = None
+                    index += 1
+                else:
+                    value, index = decode_element(data, index)
+                result.append((key, value) if kind is dict else value)
+            if length is None:
+                index += 1
+            return (result if kind is list else kind(result)), index
+        return decode
+
+    return fallback
+
+
+def contract_decoder(cls):
+    ''' Function decoding a contract of class cls from the CBOR map at an index
+        of a bytes-like object, returning (contract, index after the map).
+        Built once per class.
+    '''
+
+    try:
+        return _decoders[cls]
+    except KeyError:
+        pass
+
+    fields = _fields(cls)
+    # (position, attribute name, value decoder) by key
+    specs = dict()
+    for i, (name, inst) in enumerate(fields):
+        spec = (i, name, value_decoder(inst))
+        for key in _message_keys(name, inst):
+            specs[key] = spec
+    build = _builder(cls, fields)
+
+    def decode(data, index):
+        major, length, index = _decode_head(data, index)
+        if major != _MAP:
+            raise ValueError('expected a map at offset {}'.format(index))
+
+        values = [_MISSING] * len(fields)
+        undefined = []
+        count = 0
+        while (data[index] != _BREAK) if length is None else count < length:
+            count += 1
+            key, index = _decode_value(data, index)
+            spec = specs.get(key)
+            if spec is None:
+                value, index = _decode_value(data, index)
+                undefined.append((key, value))
+                continue
+
+            i, name, decode_property = spec
+            if data[index] == 0xf6 or data[index] == 0xf7:
+                values[i] = None
+                index += 1
+            else:
+                try:
+                    values[i], index = decode_property(data, index)
+                except _PropertyError as e:
+                    raise _deserialization_error(cls.__new__(cls), name, e.value, e.cause)
+
+        if length is None:
+            index += 1
+        return build(values, undefined), index
+
+    _decoders[cls] = decode
+    return decode
+
+
+def dumps(contract):
+    ''' Serialize a contract to CBOR '''
+
+    assert isinstance(contract, LazyContract)
+    out = bytearray()
+    contract_encoder(type(contract))(out, contract)
+    return bytes(out)
+
+
+def loads(cls, data):
+    ''' Deserialize a contract of class cls from CBOR in a bytes-like object '''
+
+    assert issubclass(cls, LazyContract)
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+
+    try:
+        contract, index = contract_decoder(cls)(data, 0)
+    except (IndexError, struct.error):
+        raise _truncated(len(data))
+
+    if index != len(data):
+        raise ValueError('extra data at offset {}'.format(index))
+    return contract
@@ -0,0 +1,211 @@
+from __future__ import absolute_import
+
+from ..contract import LazyContract, _inherits, _overrides
+from ..properties import (StringProperty, IntegerProperty, FloatProperty, BooleanProperty,
+                          EnumerationProperty, ObjectProperty, ListProperty, SetProperty,
+                          DictProperty)
+from ..extra import UUIDProperty
+
+import json
+import re
+import six
+import weakref
+
+from json.encoder import encode_basestring_ascii
+
+try:
+    from json.decoder import JSONDecodeError
+except ImportError:  # python 2
+    JSONDecodeError = None
+
+
+_encoders = weakref.WeakKeyDictionary()  # contract encoder by contract class
+
+_scan_once = json.JSONDecoder().scan_once
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+
+def _is_plain(inst, kind):
+    ''' Whether inst (de-)serializes exactly like properties of kind '''
+
+    return isinstance(inst, kind) and inst._type is kind._type and \
+        _inherits(type(inst), kind, 'serialize') and _inherits(type(inst), kind, 'deserialize')
+
+
+def _encode_float(value):
+    if value != value:
+        return 'NaN'
+    elif value == float('inf'):
+        return 'Infinity'
+    elif value == -float('inf'):
+        return '-Infinity'
+    return repr(float(value))  # FloatProperty values such as defaults may be ints
+
+
+def _encode_int(value):
+    if value is True or value is False:
+        return _encode_bool(value)
+    return '%d' % value  # int.__repr__ rejects longs on python 2
+
+
+def _encode_bool(value):
+    return 'true' if value else 'false'
+
+
+def _encode_key(key):
+    if isinstance(key, six.string_types):
+        return encode_basestring_ascii(key)
+    elif isinstance(key, bool):
+        return '"true"' if key else '"false"'
+    elif isinstance(key, six.integer_types):
+        return '"' + _encode_int(key) + '"'
+    elif isinstance(key, float):
+        return '"' + _encode_float(key) + '"'
+    elif key is None:
+        return '"null"'
+    raise TypeError('keys must be str, int, float, bool or None, not {}'.format(
+            type(key).__name__))
+
+
+def _encode_object(value):
+    return contract_encoder(type(value))(value)
+
+
+def _encode_uuid(value):
+    return '"' + str(value).lower() + '"'
+
+
+def value_encoder(inst):
+    ''' Function encoding the values of a property as JSON text '''
+
+    if _is_plain(inst, StringProperty) or _is_plain(inst, EnumerationProperty):
+        return encode_basestring_ascii
+    elif _is_plain(inst, BooleanProperty):
+        return _encode_bool
+    elif _is_plain(inst, IntegerProperty):
+        return _encode_int
+    elif _is_plain(inst, FloatProperty):
+        return _encode_float
+    elif _is_plain(inst, UUIDProperty):
+        return _encode_uuid
+    elif _is_plain(inst, ObjectProperty):
+        return _encode_object
+    elif (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty)) and \
+            inst._property is not None:
+        encode = value_encoder(inst._property)
+        return lambda value: '[' + ','.join(
+                'null' if e is None else encode(e) for e in value) + ']'
+    elif _is_plain(inst, DictProperty) and inst._property is not None:
+        encode = value_encoder(inst._property)
+        return lambda value: '{' + ','.join(
+                _encode_key(k) + ':' + ('null' if e is None else encode(e))
+                for k, e in six.iteritems(value)) + '}'
+
+    serialize = inst.serialize
+    return lambda value: json.dumps(serialize(value), separators=(',', ':'))
+
+
+def contract_encoder(cls):
+    ''' Function encoding contracts of class cls as JSON text, built once per class '''
+
+    try:
+        return _encoders[cls]
+    except KeyError:
+        pass
+
+    if _overrides(cls, 'to_dict'):
+        def encode(contract):
+            return json.dumps(contract.to_dict(), separators=(',', ':'))
+        _encoders[cls] = encode
+        return encode
+
+    # (attribute name, '"key":' fragment, value encoder, exclude_if_none)
+    fields = [(name, encode_basestring_ascii(inst.name) + ':', value_encoder(inst),
+               inst.exclude_if_none)
+              for name, inst in six.iteritems(cls._schema.properties)
+              if not inst.name.startswith('_')]
+
+    def encode(contract):
+        parts = []
+        append = parts.append
+        for name, key, encode_value, exclude_if_none in fields:
+            value = getattr(contract, name)
+            if value is not None:
+                append(key + encode_value(value))
+            elif not exclude_if_none:
+                append(key + 'null')
+        return '{' + ','.join(parts) + '}'
+
+    _encoders[cls] = encode
+    return encode
+
+
+class _PropertyError(Exception):
+    ''' Deserialization of a decoded value failed '''
+
+    def __init__(self, value, cause):
+        super(_PropertyError, self).__init__(value, cause)
+        self.value = value
+        self.cause = cause
+
+
+def _syntax_error(message, text, index):
+    if JSONDecodeError is None:
+        return ValueError('{}: char {}'.format(message, index))
+    return JSONDecodeError(message, text, index)
+
+
+def _scan_value(text, index):
+    ''' Decode the JSON value at index into basic types '''
+
+    try:
+        return _scan_once(text, index)
+    except StopIteration:
+        raise _syntax_error('Expecting value', text, index)
+
+
+def contract_decoder(cls):
+    ''' Function decoding a JSON object at an index of a string into a contract
+        of class cls, returning (contract, index after the object). The object is
+        decoded by the C scanner and deserialized by the constructor, which maps
+        renamed keys and deserializes nested contracts.
+    '''
+
+    def decode(text, index):
+        if not text.startswith('{', index):
+            raise _syntax_error('Expecting object', text, index)
+        obj, index = _scan_value(text, index)
+        return cls(obj), index
+
+    return decode
+
+
+def loads(cls, text):
+    ''' Deserialize a contract of class cls from a JSON object in a string or
+        UTF-8 bytes.
+    '''
+
+    assert issubclass(cls, LazyContract)
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+
+    index = _WHITESPACE_RE.match(text).end()
+    contract, index = contract_decoder(cls)(text, index)
+    index = _WHITESPACE_RE.match(text, index).end()
+    if index != len(text):
+        raise _syntax_error('Extra data', text, index)
+    return contract
+
+
+def dumps(contract):
+    ''' Serialize a contract to a compact JSON string '''
+
+    assert isinstance(contract, LazyContract)
+    return contract_encoder(type(contract))(contract)
+
+
+def dump(contract, fp):
+    ''' Serialize a contract as compact JSON to a file-like object '''
+
+    fp.write(six.text_type(dumps(contract)))  # the ASCII text is a str on python 2
@@ -0,0 +1,581 @@
+''' MessagePack encoding of contracts derived from their declared properties,
+    without depending on a MessagePack package.
+
+    A contract is encoded as a map from the serialization name of each
+    property to its value, or optionally from an integer: the property's tag
+    when all of the contract's properties declare one, otherwise its position.
+    Integers, floats and strings use their smallest format: floats are
+    encoded in 32 bits when that's exact. UUIDs are encoded as 16 bytes of
+    binary data and anything else as its serialized value.
+'''
+
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, _MISSING, _deserialization_error, _discards_undefined,
+                        _message_keys)
+from ..properties import (StringProperty, IntegerProperty, FloatProperty, BooleanProperty,
+                          EnumerationProperty, ObjectProperty, ListProperty, SetProperty,
+                          DictProperty)
+from ..extra import UUIDProperty
+from .binary import _builder, _fields, _tagged, _truncated
+from .json import _is_plain, _PropertyError
+
+import six
+import struct
+import uuid
+import weakref
+
+
+_encoders = weakref.WeakKeyDictionary()  # contract encoders by contract class and integer_keys
+_decoders = weakref.WeakKeyDictionary()  # contract decoder by contract class
+
+_FLOAT32 = struct.Struct('>f')
+_FLOAT64 = struct.Struct('>d')
+_UINT16 = struct.Struct('>H')
+_UINT32 = struct.Struct('>I')
+_UINT64 = struct.Struct('>Q')
+_INT8 = struct.Struct('>b')
+_INT16 = struct.Struct('>h')
+_INT32 = struct.Struct('>i')
+_INT64 = struct.Struct('>q')
+
+# format by first byte of fixed-size values: (struct or None for uint8, size)
+_FIXED = {0xca: (_FLOAT32, 4), 0xcb: (_FLOAT64, 8), 0xcc: (None, 1), 0xcd: (_UINT16, 2),
+          0xce: (_UINT32, 4), 0xcf: (_UINT64, 8), 0xd0: (_INT8, 1), 0xd1: (_INT16, 2),
+          0xd2: (_INT32, 4), 0xd3: (_INT64, 8)}
+
+# (struct or None for uint8, size) of the length of str, bin, array and map formats
+_LENGTHS = {0xd9: (None, 1), 0xda: (_UINT16, 2), 0xdb: (_UINT32, 4),
+            0xc4: (None, 1), 0xc5: (_UINT16, 2), 0xc6: (_UINT32, 4),
+            0xdc: (_UINT16, 2), 0xdd: (_UINT32, 4), 0xde: (_UINT16, 2), 0xdf: (_UINT32, 4)}
+
+# size of the data of ext formats, or None when preceded by its length
+_EXT = {0xd4: 1, 0xd5: 2, 0xd6: 4, 0xd7: 8, 0xd8: 16, 0xc7: None, 0xc8: None, 0xc9: None}
+
+
+def _pack_int(out, value):
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -0x20 <= value < 0:
+        out.append(value & 0xff)
+    elif value >= 0:
+        if value < 0x100:
+            out.append(0xcc)
+            out.append(value)
+        elif value < 0x10000:
+            out.append(0xcd)
+            out += _UINT16.pack(value)
+        elif value < 0x100000000:
+            out.append(0xce)
+            out += _UINT32.pack(value)
+        elif value < 0x10000000000000000:
+            out.append(0xcf)
+            out += _UINT64.pack(value)
+        else:
+            raise ValueError('{} is too large for MessagePack'.format(value))
+    elif value >= -0x80:
+        out.append(0xd0)
+        out += _INT8.pack(value)
+    elif value >= -0x8000:
+        out.append(0xd1)
+        out += _INT16.pack(value)
+    elif value >= -0x80000000:
+        out.append(0xd2)
+        out += _INT32.pack(value)
+    elif value >= -0x8000000000000000:
+        out.append(0xd3)
+        out += _INT64.pack(value)
+    else:
+        raise ValueError('{} is too small for MessagePack'.format(value))
+
+
+def _pack_float(out, value):
+    try:
+        packed = _FLOAT32.pack(value)
+    except OverflowError:
+        packed = None
+    if packed is not None and _FLOAT32.unpack(packed)[0] == value:
+        out.append(0xca)
+        out += packed
+    else:
+        out.append(0xcb)
+        out += _FLOAT64.pack(value)
+
+
+def _pack_bool(out, value):
+    out.append(0xc3 if value else 0xc2)
+
+
+def _pack_length(out, length, fix, fix_max, formats):
+    if length <= fix_max:
+        out.append(fix | length)
+    elif formats[0] is not None and length < 0x100:
+        out.append(formats[0])
+        out.append(length)
+    elif length < 0x10000:
+        out.append(formats[1])
+        out += _UINT16.pack(length)
+    else:
+        out.append(formats[2])
+        out += _UINT32.pack(length)
+
+
+def _pack_str(out, value):
+    if not isinstance(value, bytes):
+        value = value.encode('utf-8')
+    _pack_length(out, len(value), 0xa0, 31, (0xd9, 0xda, 0xdb))
+    out += value
+
+
+def _pack_bin(out, value):
+    _pack_length(out, len(value), 0, -1, (0xc4, 0xc5, 0xc6))
+    out += value
+
+
+def _pack_array_header(out, length):
+    _pack_length(out, length, 0x90, 15, (None, 0xdc, 0xdd))
+
+
+def _pack_map_header(out, length):
+    _pack_length(out, length, 0x80, 15, (None, 0xde, 0xdf))
+
+
+def _pack_uuid(out, value):
+    out.append(0xc4)
+    out.append(16)
+    out += value.bytes
+
+
+def pack_value(out, value):
+    ''' Append a basic value (None, bool, int, float, string, bytes, list or
+        dict of basic values) to a bytearray as MessagePack.
+    '''
+
+    if value is None:
+        out.append(0xc0)
+    elif value is True or value is False:
+        _pack_bool(out, value)
+    elif isinstance(value, six.integer_types):
+        _pack_int(out, value)
+    elif isinstance(value, float):
+        _pack_float(out, value)
+    elif isinstance(value, six.string_types):
+        _pack_str(out, value)
+    elif isinstance(value, (bytes, bytearray)):
+        _pack_bin(out, value)
+    elif isinstance(value, (list, tuple)):
+        _pack_array_header(out, len(value))
+        for element in value:
+            pack_value(out, element)
+    elif isinstance(value, dict):
+        _pack_map_header(out, len(value))
+        for key, element in six.iteritems(value):
+            pack_value(out, key)
+            pack_value(out, element)
+    else:
+        raise TypeError('{} is not a basic serializable type'.format(type(value).__name__))
+
+
+def _read_length(data, index, code):
+    length_struct, size = _LENGTHS[code]
+    if length_struct is None:
+        return data[index], index + 1
+    return length_struct.unpack_from(data, index)[0], index + size
+
+
+def _read_bytes(data, index, length):
+    end = index + length
+    if end > len(data):
+        raise _truncated(index)
+    return data[index:end], end
+
+
+def _container_header(data, index):
+    ''' (True for maps or False for arrays, length, index after the header)
+        of the map or array at index, or None for other values.
+    '''
+
+    code = data[index]
+    if 0x80 <= code <= 0x8f:
+        return True, code & 0x0f, index + 1
+    elif 0x90 <= code <= 0x9f:
+        return False, code & 0x0f, index + 1
+    elif code == 0xde or code == 0xdf or code == 0xdc or code == 0xdd:
+        length, end = _read_length(data, index + 1, code)
+        return code >= 0xde, length, end
+    return None
+
+
+def _unpack_value(data, index):
+    code = data[index]
+    index += 1
+    if code < 0x80:
+        return code, index
+    elif code >= 0xe0:
+        return code - 0x100, index
+    elif 0xa0 <= code <= 0xbf or 0xd9 <= code <= 0xdb:
+        if code <= 0xbf:
+            length = code & 0x1f
+        else:
+            length, index = _read_length(data, index, code)
+        value, index = _read_bytes(data, index, length)
+        return value.decode('utf-8'), index
+    elif code in _FIXED:
+        value_struct, size = _FIXED[code]
+        if value_struct is None:
+            return data[index], index + 1
+        return value_struct.unpack_from(data, index)[0], index + size
+    elif code == 0xc0:
+        return None, index
+    elif code == 0xc2:
+        return False, index
+    elif code == 0xc3:
+        return True, index
+    elif 0xc4 <= code <= 0xc6:
+        length, index = _read_length(data, index, code)
+        value, index = _read_bytes(data, index, length)
+        return bytes(value), index
+
+    header = _container_header(data, index - 1)
+    if header is None:
+        raise ValueError('unsupported MessagePack format 0x{:02x} at offset {}'.format(
+                code, index - 1))
+    is_map, length, index = header
+    if is_map:
+        result = dict()
+        for _ in six.moves.range(length):
+            key, index = _unpack_value(data, index)
+            result[key], index = _unpack_value(data, index)
+        return result, index
+
+    result = []
+    for _ in six.moves.range(length):
+        value, index = _unpack_value(data, index)
+        result.append(value)
+    return result, index
+
+
+def unpack_value(data, index):
+    ''' Decode the MessagePack value at index into basic types, returning
+        (value, index after the value).
+    '''
+
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+    return _unpack_value(data, index)
+
+
+def _skip_value(data, index):
+    count = 1
+    while count:
+        count -= 1
+        code = data[index]
+        index += 1
+        if code < 0x80 or code >= 0xe0 or 0xc0 <= code <= 0xc3:
+            continue
+        elif 0xa0 <= code <= 0xbf:
+            index += code & 0x1f
+        elif code in _FIXED:
+            index += _FIXED[code][1]
+        elif code in _EXT:
+            size = _EXT[code]
+            if size is None:
+                size, index = _read_length(data, index, code - 0x03)  # as bin
+            index += size + 1
+        elif 0xc4 <= code <= 0xc6 or 0xd9 <= code <= 0xdb:
+            length, index = _read_length(data, index, code)
+            index += length
+        else:
+            header = _container_header(data, index - 1)
+            if header is None:
+                raise ValueError('invalid MessagePack format 0x{:02x} at offset {}'.format(
+                        code, index - 1))
+            is_map, length, index = header
+            count += length * 2 if is_map else length
+
+    if index > len(data):
+        raise _truncated(len(data))
+    return index
+
+
+def skip_value(data, index):
+    ''' Index after the MessagePack value at index, found without decoding it '''
+
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+    return _skip_value(data, index)
+
+
+def value_encoder(inst, integer_keys):
+    ''' Function appending a property's non-null values to a bytearray '''
+
+    if _is_plain(inst, StringProperty) or _is_plain(inst, EnumerationProperty):
+        return _pack_str
+    elif _is_plain(inst, BooleanProperty):
+        return _pack_bool
+    elif _is_plain(inst, IntegerProperty):
+        return _pack_int
+    elif _is_plain(inst, FloatProperty):
+        return _pack_float
+    elif _is_plain(inst, UUIDProperty):
+        return _pack_uuid
+    elif _is_plain(inst, ObjectProperty):
+        kind = inst._kind
+        return lambda out, value: contract_encoder(kind, integer_keys)(out, value)
+    elif (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty)) and \
+            inst._property is not None:
+        encode = value_encoder(inst._property, integer_keys)
+
+        def encode_elements(out, value):
+            _pack_array_header(out, len(value))
+            for element in value:
+                if element is None:
+                    out.append(0xc0)
+                else:
+                    encode(out, element)
+
+        return encode_elements
+    elif _is_plain(inst, DictProperty) and inst._property is not None:
+        encode = value_encoder(inst._property, integer_keys)
+
+        def encode_items(out, value):
+            _pack_map_header(out, len(value))
+            for key, element in six.iteritems(value):
+                pack_value(out, key)
+                if element is None:
+                    out.append(0xc0)
+                else:
+                    encode(out, element)
+
+        return encode_items
+
+    serialize = inst.serialize
+    return lambda out, value: pack_value(out, serialize(value))
+
+
+def _integer_keys(cls):
+    ''' Integer key of each encoded property of cls '''
+
+    fields = _fields(cls)
+    if _tagged(cls):
+        return [inst.tag for _, inst in fields]
+    return list(six.moves.range(len(fields)))
+
+
+def contract_encoder(cls, integer_keys=False):
+    ''' Function appending a contract of class cls to a bytearray, built once per class '''
+
+    encoders = _encoders.setdefault(cls, dict())
+    try:
+        return encoders[integer_keys]
+    except KeyError:
+        pass
+
+    fields = _fields(cls)
+    keys = _integer_keys(cls) if integer_keys else [inst.name for _, inst in fields]
+    # (attribute name, packed key, value encoder, exclude_if_none)
+    specs = []
+    for (name, inst), key in zip(fields, keys):
+        packed = bytearray()
+        pack_value(packed, key)
+        specs.append((name, bytes(packed), value_encoder(inst, integer_keys),
+                      inst.exclude_if_none))
+
+    def encode(out, contract):
+        entries = []
+        for name, key, encode_value, exclude_if_none in specs:
+            value = getattr(contract, name)
+            if value is not None or not exclude_if_none:
+                entries.append((key, encode_value, value))
+
+        _pack_map_header(out, len(entries))
+        for key, encode_value, value in entries:
+            out += key
+            if value is None:
+                out.append(0xc0)
+            else:
+                encode_value(out, value)
+
+    encoders[integer_keys] = encode
+    return encode
+
+
+def _deserializing_decoder(inst):
+    deserialize = inst.deserialize
+
+    def decode(data, index):
+        value, index = _unpack_value(data, index)
+        if value is not None:
+            try:
+                value = deserialize(value)
+            except Exception as e:
+                raise _PropertyError(value, e)
+        return value, index
+
+    return decode
+
+
+def value_decoder(inst):
+    ''' Function decoding and deserializing a property's value at an index of a
+        bytes-like object, returning (value, index after the value).
+    '''
+
+    fallback = _deserializing_decoder(inst)
+
+    for kind in (IntegerProperty, FloatProperty, BooleanProperty, StringProperty):
+        if _is_plain(inst, kind):
+            types = kind._type if isinstance(kind._type, tuple) else (kind._type,)
+
+            def decode(data, index):
+                value, end = _unpack_value(data, index)
+                if type(value) in types:
+                    return value, end
+                return fallback(data, index)
+            return decode
+
+    if _is_plain(inst, UUIDProperty):
+        def decode(data, index):
+            if data[index] == 0xc4 and data[index + 1] == 16:
+                return uuid.UUID(bytes=bytes(data[index + 2:index + 18])), index + 18
+            return fallback(data, index)
+        return decode
+
+    elif _is_plain(inst, ObjectProperty):
+        kind = inst._kind
+
+        def decode(data, index):
+            header = _container_header(data, index)
+            if header is not None and header[0]:
+                return contract_decoder(kind)(data, index)
+            return fallback(data, index)
+        return decode
+
+    elif (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty) or
+          _is_plain(inst, DictProperty)) and inst._property is not None:
+        decode_element = value_decoder(inst._property)
+        kind = inst._type
+
+        def decode(data, index):
+            header = _container_header(data, index)
+            if header is None or header[0] != (kind is dict):
+                return fallback(data, index)
+
+            _, length, index = header
+            result = []
+            for _ in six.moves.range(length):
+                if kind is dict:
+                    key, index = _unpack_value(data, index)
+                if data[index] == 0xc0:
+                    value = None
+                    index += 1
+                else:
+                    value, index = decode_element(data, index)
+                result.append((key, value) if kind is dict else value)
+            return (result if kind is list else kind(result)), index
+        return decode
+
+    return fallback
+
+
+def contract_decoder(cls):
+    ''' Function decoding a contract of class cls from the MessagePack map at an
+        index of a bytes-like object, returning (contract, index after the map).
+        Maps keyed by name or by integer are both accepted. Built once per class.
+    '''
+
+    try:
+        return _decoders[cls]
+    except KeyError:
+        pass
+
+    fields = _fields(cls)
+    # (position, attribute name, value decoder) by key, and by packed key for names
+    # which are short enough to be packed as fixstr
+    specs = dict()
+    packed_specs = dict()
+    for i, ((name, inst), key) in enumerate(zip(fields, _integer_keys(cls))):
+        spec = (i, name, value_decoder(inst))
+        specs[key] = spec
+        for key in _message_keys(name, inst):
+            specs[key] = spec
+            packed = bytearray()
+            _pack_str(packed, key)
+            if packed[0] <= 0xbf:
+                packed_specs[bytes(packed)] = spec
+    discard = _discards_undefined(cls)
+    build = _builder(cls, fields)
+
+    def decode(data, index):
+        header = _container_header(data, index)
+        if header is None or not header[0]:
+            raise ValueError('expected a map at offset {}'.format(index))
+
+        _, length, index = header
+        values = [_MISSING] * len(fields)
+        undefined = []
+        for _ in six.moves.range(length):
+            code = data[index]
+            spec = None
+            if 0xa0 <= code <= 0xbf:
+                end = index + 1 + (code & 0x1f)
+                spec = packed_specs.get(bytes(data[index:end]))
+                if spec is not None:
+                    index = end
+            elif code < 0x80:
+                spec = specs.get(code)
+                if spec is not None:
+                    index += 1
+
+            if spec is None:
+                key, index = _unpack_value(data, index)
+                spec = specs.get(key)
+            if spec is None:
+                if discard:
+                    index = _skip_value(data, index)
+                else:
+                    value, index = _unpack_value(data, index)
+                    undefined.append((key, value))
+                continue
+
+            i, name, decode_value = spec
+            if data[index] == 0xc0:
+                values[i] = None
+                index += 1
+            else:
+                try:
+                    values[i], index = decode_value(data, index)
+                except _PropertyError as e:
+                    raise _deserialization_error(cls.__new__(cls), name, e.value, e.cause)
+
+        return build(values, undefined), index
+
+    _decoders[cls] = decode
+    return decode
+
+
+def dumps(contract, integer_keys=False):
+    ''' Serialize a contract to MessagePack.
+        integer_keys (bool): key values by integer rather than by name
+    '''
+
+    assert isinstance(contract, LazyContract)
+    out = bytearray()
+    contract_encoder(type(contract), integer_keys)(out, contract)
+    return bytes(out)
+
+
+def loads(cls, data):
+    ''' Deserialize a contract of class cls from MessagePack in a bytes-like object '''
+
+    assert issubclass(cls, LazyContract)
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+
+    try:
+        contract, index = contract_decoder(cls)(data, 0)
+    except (IndexError, struct.error):
+        raise _truncated(len(data))
+
+    if index != len(data):
+        raise ValueError('extra data at offset {}'.format(index))
+    return contract
@@ -0,0 +1,409 @@
+''' Protocol Buffers wire format for contracts whose properties all declare a
+    tag, which is used as the field number. Properties map to protobuf types:
+
+     * IntegerProperty to int64, or sint64 (zigzag) for SignedIntegerProperty
+     * FloatProperty to double (float fields are accepted when decoding)
+     * BooleanProperty to bool
+     * StringProperty, EnumerationProperty and UUIDProperty to string
+     * ObjectProperty to an embedded message
+     * ListProperty and SetProperty of a property to a repeated field, packed
+       for numbers and booleans (unpacked fields are accepted when decoding)
+     * DictProperty of a property to a map with string or int64 keys
+     * anything else to a string holding the JSON of its serialized value
+
+    None values are omitted. As in protobuf, empty lists, sets and dicts are
+    indistinguishable from absent ones and decode to the property's default.
+    Unknown fields are skipped.
+'''
+
+from __future__ import absolute_import
+
+from ..contract import LazyContract, LazyContractError, _MISSING, _deserialization_error
+from ..properties import (StringProperty, IntegerProperty, FloatProperty, BooleanProperty,
+                          EnumerationProperty, ObjectProperty, ListProperty, SetProperty,
+                          DictProperty, ContainerProperty)
+from ..extra import UUIDProperty
+from .binary import (read_varint, write_varint, _read_int, _write_int, _read_string,
+                     _write_string, _builder, _fields, _truncated)
+from .json import _is_plain, _PropertyError
+
+import json
+import six
+import struct
+import uuid
+import weakref
+
+
+_encoders = weakref.WeakKeyDictionary()  # message encoder by contract class
+_decoders = weakref.WeakKeyDictionary()  # message decoder by contract class
+
+_DOUBLE = struct.Struct('<d')
+_FLOAT = struct.Struct('<f')
+
+_VARINT, _FIXED64, _DELIMITED, _START_GROUP, _END_GROUP, _FIXED32 = range(6)
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+class SignedIntegerProperty(IntegerProperty):
+    ''' IntegerProperty encoded as a protobuf sint64 rather than int64,
+        which is smaller for negative values.
+    '''
+
+    pass
+
+
+def _write_int64(out, value):
+    if not _INT64_MIN <= value <= _INT64_MAX:
+        raise ValueError('{} is out of range for int64'.format(value))
+    write_varint(out, value if value >= 0 else value + (1 << 64))
+
+
+def _read_int64(data, index):
+    value, index = read_varint(data, index)
+    return (value - (1 << 64) if value > _INT64_MAX else value), index
+
+
+def _write_bool(out, value):
+    out.append(1 if value else 0)
+
+
+def _read_bool(data, index):
+    value, index = read_varint(data, index)
+    return value != 0, index
+
+
+def _write_double(out, value):
+    out += _DOUBLE.pack(value)
+
+
+def _read_double(data, index):
+    return _DOUBLE.unpack_from(data, index)[0], index + 8
+
+
+def _read_float(data, index):
+    return _FLOAT.unpack_from(data, index)[0], index + 4
+
+
+def _write_uuid(out, value):
+    _write_string(out, str(value).lower())
+
+
+def _read_uuid(data, index):
+    value, index = _read_string(data, index)
+    try:
+        return uuid.UUID(value), index
+    except ValueError as e:
+        raise _PropertyError(value, e)
+
+
+def skip_field(data, index, wire_type):
+    ''' Index after a field value with wire type wire_type at index '''
+
+    if wire_type == _VARINT:
+        while data[index] >= 0x80:
+            index += 1
+        return index + 1
+    elif wire_type == _FIXED64:
+        return index + 8
+    elif wire_type == _DELIMITED:
+        length, index = read_varint(data, index)
+        return index + length
+    elif wire_type == _FIXED32:
+        return index + 4
+    raise ValueError('unsupported wire type {} at offset {}'.format(wire_type, index))
+
+
+def _none_element_error():
+    return ValueError('repeated protobuf fields can\'t hold None')
+
+
+def _delimited(write):
+    def write_delimited(out, value):
+        body = bytearray()
+        write(body, value)
+        write_varint(out, len(body))
+        out += body
+    return write_delimited
+
+
+def _packed(write):
+    def write_packed(out, values):
+        body = bytearray()
+        for value in values:
+            if value is None:
+                raise _none_element_error()
+            write(body, value)
+        write_varint(out, len(body))
+        out += body
+    return write_packed
+
+
+def _is_repeated(inst):
+    return (_is_plain(inst, ListProperty) or _is_plain(inst, SetProperty)) and \
+        inst._property is not None and not isinstance(inst._property, ContainerProperty)
+
+
+def _is_map(inst):
+    return _is_plain(inst, DictProperty) and inst._property is not None and \
+        not isinstance(inst._property, ContainerProperty)
+
+
+def value_codec(inst):
+    ''' (wire type, write, read) of a property's non-null values as a single
+        field: write(bytearray, value) appends a value and read(data, index)
+        returns (deserialized value, index after the value).
+    '''
+
+    if isinstance(inst, SignedIntegerProperty) and _is_plain(inst, IntegerProperty):
+        return _VARINT, _write_int, _read_int
+    elif _is_plain(inst, IntegerProperty):
+        return _VARINT, _write_int64, _read_int64
+    elif _is_plain(inst, BooleanProperty):
+        return _VARINT, _write_bool, _read_bool
+    elif _is_plain(inst, FloatProperty):
+        return _FIXED64, _write_double, _read_double
+    elif _is_plain(inst, StringProperty) or _is_plain(inst, EnumerationProperty):
+        return _DELIMITED, _write_string, _read_string
+    elif _is_plain(inst, UUIDProperty):
+        return _DELIMITED, _write_uuid, _read_uuid
+    elif _is_plain(inst, ObjectProperty):
+        kind = inst._kind
+
+        def read(data, index):
+            length, index = read_varint(data, index)
+            end = index + length
+            if end > len(data):
+                raise _truncated(index)
+            return contract_decoder(kind)(data, index, end), end
+
+        return _DELIMITED, _delimited(lambda out, value: contract_encoder(kind)(out, value)), read
+
+    serialize = inst.serialize
+    deserialize = inst.deserialize
+
+    def write(out, value):
+        _write_string(out, json.dumps(serialize(value), separators=(',', ':')))
+
+    def read(data, index):
+        value, index = _read_string(data, index)
+        value = json.loads(value)
+        if value is not None:
+            try:
+                value = deserialize(value)
+            except Exception as e:
+                raise _PropertyError(value, e)
+        return value, index
+
+    return _DELIMITED, write, read
+
+
+def _map_entry_codec(inst):
+    ''' (write, read) of the (key, value) entries of a map field '''
+
+    value_type, write_value, read_value = value_codec(inst._property)
+    value_key = 2 << 3 | value_type
+
+    def write(out, item):
+        key, value = item
+        body = bytearray()
+        if isinstance(key, six.integer_types) and not isinstance(key, bool):
+            body.append(1 << 3 | _VARINT)
+            _write_int64(body, key)
+        else:
+            body.append(1 << 3 | _DELIMITED)
+            _write_string(body, key if isinstance(key, six.string_types) else str(key))
+        if value is not None:
+            body.append(value_key)
+            write_value(body, value)
+        write_varint(out, len(body))
+        out += body
+
+    def read(data, index):
+        length, index = read_varint(data, index)
+        end = index + length
+        key = value = None
+        while index < end:
+            field_key, index = read_varint(data, index)
+            if field_key == 1 << 3 | _VARINT:
+                key, index = _read_int64(data, index)
+            elif field_key == 1 << 3 | _DELIMITED:
+                key, index = _read_string(data, index)
+            elif field_key == value_key:
+                value, index = read_value(data, index)
+            else:
+                index = skip_field(data, index, field_key & 7)
+        if index != end:
+            raise ValueError('invalid length at offset {}'.format(index))
+        return (key, value), index
+
+    return write, read
+
+
+def _field_numbers(cls):
+    fields = _fields(cls)
+    for name, inst in fields:
+        if inst.tag is None:
+            raise LazyContractError('{}.{} requires a tag to be encoded as protobuf'.format(
+                    cls.__name__, name))
+    return fields
+
+
+def contract_encoder(cls):
+    ''' Function appending the fields of a contract of class cls to a bytearray,
+        built once per class.
+    '''
+
+    try:
+        return _encoders[cls]
+    except KeyError:
+        pass
+
+    def key(tag, wire_type):
+        out = bytearray()
+        write_varint(out, tag << 3 | wire_type)
+        return bytes(out)
+
+    # (attribute name, key, write, whether empty values are omitted) of single fields
+    single = []
+    # (attribute name, key, wire type of elements or None for maps, write element)
+    multiple = []
+    for name, inst in _field_numbers(cls):
+        if _is_repeated(inst):
+            wire_type, write, _ = value_codec(inst._property)
+            if wire_type == _DELIMITED:
+                multiple.append((name, key(inst.tag, _DELIMITED), wire_type, write))
+            else:
+                single.append((name, key(inst.tag, _DELIMITED), _packed(write), True))
+        elif _is_map(inst):
+            write, _ = _map_entry_codec(inst)
+            multiple.append((name, key(inst.tag, _DELIMITED), None, write))
+        else:
+            wire_type, write, _ = value_codec(inst)
+            single.append((name, key(inst.tag, wire_type), write, False))
+
+    def encode(out, contract):
+        for name, key, write, omit_empty in single:
+            value = getattr(contract, name)
+            if value is not None and (value or not omit_empty):
+                out += key
+                write(out, value)
+
+        for name, key, wire_type, write in multiple:
+            value = getattr(contract, name)
+            if value is None:
+                continue
+            for element in (value if wire_type is not None else six.iteritems(value)):
+                if element is None:
+                    raise _none_element_error()
+                out += key
+                write(out, element)
+
+    _encoders[cls] = encode
+    return encode
+
+
+def contract_decoder(cls):
+    ''' Function decoding the fields of a contract of class cls between two
+        indices of a bytes-like object, built once per class.
+    '''
+
+    try:
+        return _decoders[cls]
+    except KeyError:
+        pass
+
+    fields = _field_numbers(cls)
+    build = _builder(cls, fields)
+    # (position, attribute name, wire type, read, container type or None) by field number
+    specs = dict()
+    for i, (name, inst) in enumerate(fields):
+        if _is_repeated(inst):
+            wire_type, _, read = value_codec(inst._property)
+            specs[inst.tag] = (i, name, wire_type, read, inst._type)
+        elif _is_map(inst):
+            specs[inst.tag] = (i, name, _DELIMITED, _map_entry_codec(inst)[1], dict)
+        else:
+            wire_type, _, read = value_codec(inst)
+            specs[inst.tag] = (i, name, wire_type, read, None)
+    # (position, container type) of repeated properties which aren't lists
+    conversions = [(spec[0], spec[4]) for spec in six.itervalues(specs)
+                   if spec[4] is not None and spec[4] is not list]
+
+    def decode(data, index, end):
+        values = [_MISSING] * len(fields)
+        while index < end:
+            key = data[index]
+            if key < 0x80:
+                index += 1
+            else:
+                key, index = read_varint(data, index)
+            wire_type = key & 7
+            spec = specs.get(key >> 3)
+            if spec is None:
+                index = skip_field(data, index, wire_type)
+                continue
+
+            i, name, expected, read, container = spec
+            try:
+                if wire_type == expected:
+                    value, index = read(data, index)
+                elif expected == _FIXED64 and wire_type == _FIXED32:
+                    value, index = _read_float(data, index)
+                elif container is not None and wire_type == _DELIMITED:
+                    # packed repeated
+                    length, index = read_varint(data, index)
+                    stop = index + length
+                    if values[i] is _MISSING:
+                        values[i] = []
+                    while index < stop:
+                        value, index = read(data, index)
+                        values[i].append(value)
+                    continue
+                else:
+                    raise ValueError('wire type {} of {}.{} is not {} at offset {}'.format(
+                            wire_type, cls.__name__, name, expected, index))
+            except _PropertyError as e:
+                raise _deserialization_error(cls.__new__(cls), name, e.value, e.cause)
+
+            if container is None:
+                values[i] = value
+            else:
+                if values[i] is _MISSING:
+                    values[i] = []
+                values[i].append(value)
+
+        if index != end:
+            raise ValueError('invalid length at offset {}'.format(index))
+
+        for i, container in conversions:
+            if values[i] is not _MISSING:
+                values[i] = container(values[i])
+
+        return build(values)
+
+    _decoders[cls] = decode
+    return decode
+
+
+def dumps(contract):
+    ''' Serialize a contract to a protobuf message '''
+
+    assert isinstance(contract, LazyContract)
+    out = bytearray()
+    contract_encoder(type(contract))(out, contract)
+    return bytes(out)
+
+
+def loads(cls, data):
+    ''' Deserialize a contract of class cls from a protobuf message in a bytes-like object '''
+
+    assert issubclass(cls, LazyContract)
+    if six.PY2 or not isinstance(data, (bytes, bytearray)):
+        data = bytearray(data)
+
+    try:
+        return contract_decoder(cls)(data, 0, len(data))
+    except (IndexError, struct.error):
+        raise _truncated(len(data))
@@ -0,0 +1,140 @@
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, StrictContract, LazyContractError,
+                        LazyContractValidationError, LazyContractDeserializationError)
+from ..properties import (ObjectProperty, ListProperty, SetProperty, DictProperty,
+                          StringProperty, IntegerProperty, FloatProperty, BooleanProperty,
+                          EnumerationProperty)
+from ..extra import UUIDProperty, UUIDStringProperty
+from . import binary
+
+
+class NestedContract(LazyContract):
+    x = IntegerProperty()
+    y = BooleanProperty()
+
+
+class BinaryContract(LazyContract):
+    a = StringProperty()
+    b = IntegerProperty(name='bb')
+    c = FloatProperty()
+    d = BooleanProperty()
+    e = ListProperty(StringProperty())
+    f = ObjectProperty(NestedContract)
+    g = DictProperty(IntegerProperty())
+    h = SetProperty()
+    i = UUIDProperty()
+    j = ListProperty()
+    k = StringProperty(exclude_if_none=False)
+    l = IntegerProperty(default=7)
+    m = ListProperty(ObjectProperty(NestedContract))
+    n = UUIDStringProperty()
+    o = EnumerationProperty(['on', 'off'])
+    p = BooleanProperty(default=True)
+    _q = StringProperty()
+
+
+def test_binary():
+    t = BinaryContract(a=u'h\xe9llo', b=-(2 ** 70), c=1.5, d=False, e=['a', None],
+                       f=dict(x=300, y=True), g={'k': -1, 2: 3}, h=[1, 'x'], _q='hidden',
+                       i='14d0a7b5-33c5-439b-a66b-2d464f4e7d1b', j=[1, None, {'z': [2.5]}],
+                       m=[None, dict(x=1)], n='14D0A7B5-33C5-439B-A66B-2D464F4E7D1B', o='on')
+
+    data = t.to_bytes()
+    assert isinstance(data, bytes)
+    assert len(data) < len(t.to_json()) / 2
+
+    u = BinaryContract.from_bytes(data)
+    assert u == BinaryContract(t.to_dict())
+    assert u.d is False and u.f.y is True and u.p is True
+    assert BinaryContract.from_bytes(bytearray(data)) == u
+    assert BinaryContract.from_bytes(memoryview(data)) == u
+
+    assert BinaryContract.from_bytes(BinaryContract().to_bytes()) == BinaryContract()
+    assert BinaryContract.from_bytes(BinaryContract(l=None).to_bytes()).l == 7
+
+    # presence bitmaps spanning many bytes
+    t = BinaryContract()
+    t.m = [NestedContract(x=i) if i % 3 else None for i in range(1000)]
+    t.g = dict((str(i), i if i % 5 else None) for i in range(1000))
+    assert BinaryContract.from_bytes(t.to_bytes()) == t
+
+    for value in (0, 1, -1, 63, -64, 64, 2 ** 64, -(2 ** 64)):
+        out = bytearray()
+        binary.write_value(out, value)
+        assert binary.read_value(out, 0) == (value, len(out))
+        assert binary.read_value(bytes(out), 0) == (value, len(out))
+
+
+def test_binary_init():
+    class InitContract(LazyContract):
+        a = IntegerProperty()
+
+        def __init__(self, _obj=None, **kwargs):
+            super(InitContract, self).__init__(_obj, **kwargs)
+            self.initialized = True
+
+    t = InitContract.from_bytes(InitContract(a=1).to_bytes())
+    assert t.a == 1 and t.initialized
+
+
+def test_binary_errors():
+    class RequiredContract(StrictContract):
+        a = IntegerProperty(required=True)
+        b = UUIDStringProperty()
+
+    class OptionalContract(StrictContract):
+        a = IntegerProperty()
+        b = StringProperty()
+
+    data = RequiredContract(a=1).to_bytes()
+    for data, error in ((OptionalContract().to_bytes(), LazyContractValidationError),
+                        (OptionalContract(a=1, b='x').to_bytes(), LazyContractDeserializationError),
+                        (data + b'\x00', ValueError),
+                        (data[:-1], ValueError),
+                        (b'', ValueError)):
+        try:
+            RequiredContract.from_bytes(data)
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
+
+
+def test_binary_tags():
+    class Version1(LazyContract):
+        a = IntegerProperty(tag=1)
+        b = StringProperty(tag=2, default='b')
+        c = ObjectProperty(NestedContract, tag=3)
+
+    class Version2(LazyContract):
+        a = IntegerProperty(tag=1)
+        c = ObjectProperty(NestedContract, tag=3)
+        d = FloatProperty(tag=4, default=1.5)
+        e = ListProperty(IntegerProperty(), tag=5)
+        f = BooleanProperty(tag=6, exclude_if_none=False, default=True)
+        g = ObjectProperty(Version1, tag=7)
+        h = IntegerProperty(tag=2 ** 40)
+
+    t = Version2(a=-5, c=dict(x=1), d=2.5, e=[1, 2], g=dict(a=1), h=2)
+    assert Version2.from_bytes(t.to_bytes()) == t
+    assert Version1.from_bytes(t.to_bytes()) == Version1(a=-5, c=dict(x=1))
+    assert Version2.from_bytes(Version1(a=1, b='x').to_bytes()) == Version2(a=1)
+
+    u = Version2.from_bytes(Version1(a=1).to_bytes())
+    assert u.d == 1.5 and u.f is True
+    assert Version2.from_bytes(Version2(a=1, f=None).to_bytes()).f is None
+
+    class Mixed(LazyContract):
+        a = IntegerProperty(tag=1)
+        b = IntegerProperty()
+
+    class ChangedType(LazyContract):
+        a = StringProperty(tag=1)
+
+    for error, f in ((LazyContractError, lambda: Mixed().to_bytes()),
+                     (ValueError, lambda: ChangedType.from_bytes(t.to_bytes()))):
+        try:
+            f()
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
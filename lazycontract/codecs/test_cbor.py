@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, StrictContract, DynamicContract, LazyProperty,
+                        LazyContractValidationError, LazyContractDeserializationError)
+from ..properties import (ObjectProperty, ListProperty, SetProperty, DictProperty,
+                          StringProperty, IntegerProperty, FloatProperty, BooleanProperty)
+from ..extra import UUIDProperty
+from . import cbor
+
+import datetime
+import uuid
+
+
+class TimestampProperty(LazyProperty):
+
+    _type = datetime.datetime
+
+
+class BytesProperty(LazyProperty):
+
+    _type = bytes
+
+
+class NestedContract(LazyContract):
+    x = IntegerProperty()
+    y = FloatProperty()
+
+
+class CBORContract(LazyContract):
+    a = StringProperty()
+    b = IntegerProperty(name='bb')
+    c = FloatProperty()
+    d = BooleanProperty()
+    e = ListProperty(StringProperty())
+    f = ObjectProperty(NestedContract)
+    g = DictProperty(ObjectProperty(NestedContract))
+    h = SetProperty(IntegerProperty())
+    i = UUIDProperty()
+    j = ListProperty()
+    k = StringProperty(exclude_if_none=False)
+    l = ListProperty(UUIDProperty())
+    m = BytesProperty()
+    _n = StringProperty()
+
+
+def test_cbor():
+    t = CBORContract(a=u'h\xe9llo', b=-(2 ** 70), c=1.1, d=True, e=['a', None],
+                     f=dict(x=70000, y=0.5), g={'k': dict(x=-5), 'n': None}, h=[1, 300],
+                     i='14d0a7b5-33c5-439b-a66b-2d464f4e7d1b', _n='hidden',
+                     j=[1, None, {'z': [2.5, b'\x00' * 300]}], l=[uuid.UUID(int=1)],
+                     m=b'\x00\xff')
+
+    data = cbor.dumps(t)
+    assert cbor.loads(CBORContract, data) == CBORContract(t.to_dict())
+    assert cbor.dumps(CBORContract(i=uuid.UUID(int=1))) == \
+        b'\xa2\x61i\xd8\x25\x50' + uuid.UUID(int=1).bytes + b'\x61k\xf6'
+
+    # examples from RFC 7049 appendix A
+    for value, encoded in ((0, b'\x00'),
+                           (1000000, b'\x1a\x00\x0f\x42\x40'),
+                           (18446744073709551616, b'\xc2\x49\x01' + b'\x00' * 8),
+                           (-18446744073709551617, b'\xc3\x49\x01' + b'\x00' * 8),
+                           (-1000, b'\x39\x03\xe7'),
+                           (1.5, b'\xfa\x3f\xc0\x00\x00'),
+                           (1.1, b'\xfb\x3f\xf1\x99\x99\x99\x99\x99\x9a'),
+                           (u'\u6c34', b'\x63\xe6\xb0\xb4'),
+                           ([1, [2, 3]], b'\x82\x01\x82\x02\x03'),
+                           ({u'a': 1}, b'\xa1\x61\x61\x01')):
+        out = bytearray()
+        cbor.encode_value(out, value)
+        assert bytes(out) == encoded
+        assert cbor.decode_value(out, 0) == (value, len(out))
+
+    for encoded, value in ((b'\xf9\x3c\x00', 1.0),
+                           (b'\xf9\xc4\x00', -4.0),
+                           (b'\xf7', None),
+                           (b'\x5f\x42\x01\x02\x43\x03\x04\x05\xff', b'\x01\x02\x03\x04\x05'),
+                           (b'\x7f\x65strea\x64ming\xff', u'streaming'),
+                           (b'\x9f\x01\x82\x02\x03\x9f\x04\x05\xff\xff', [1, [2, 3], [4, 5]]),
+                           (b'\xbf\x61a\x01\xff', {u'a': 1}),
+                           (b'\xd9\xd9\xf7\x01', 1)):
+        assert cbor.decode_value(encoded, 0) == (value, len(encoded))
+
+    # {"x": 1, "y": 2.5 as a half-precision float} with indefinite length
+    assert cbor.loads(NestedContract, b'\xbf\x61x\x01\x61y\xf9\x41\x00\xff') == \
+        NestedContract(x=1, y=2.5)
+
+
+def test_cbor_datetime():
+    class TimestampContract(LazyContract):
+        a = TimestampProperty()
+
+    t = TimestampContract(a=datetime.datetime(2013, 3, 21, 20, 4))
+    data = cbor.dumps(t)
+    assert data == b'\xa1\x61a\xc1\x1a\x51\x4b\x67\xb0'
+
+    a = cbor.loads(TimestampContract, data).a
+    assert a.replace(tzinfo=None) == t.a
+    assert a.utcoffset() in (None, datetime.timedelta(0))
+
+    t.a = datetime.datetime(2013, 3, 21, 20, 4, 0, 500000)
+    assert cbor.loads(TimestampContract, cbor.dumps(t)).a.replace(tzinfo=None) == t.a
+
+
+def test_cbor_errors():
+    class StrictCBORContract(StrictContract):
+        a = IntegerProperty(required=True)
+
+    class DynamicCBORContract(DynamicContract):
+        a = IntegerProperty()
+
+    assert cbor.loads(DynamicCBORContract, b'\xa2\x61a\x01\x61b\x82\x01\x02').b == [1, 2]
+
+    for data, error in ((b'\xa2\x61a\x01\x61b\x01', LazyContractValidationError),
+                        (b'\xa0', LazyContractValidationError),
+                        (b'\xa1\x61a\x61x', LazyContractDeserializationError),
+                        (b'\xa1\x61a\x01\x01', ValueError),
+                        (b'\xa1\x61a', ValueError),
+                        (b'\x81\x01', ValueError)):
+        try:
+            cbor.loads(StrictCBORContract, data)
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
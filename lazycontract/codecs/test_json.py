@@ -0,0 +1,114 @@
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, StrictContract, DynamicContract, LazyContractValidationError,
+                        LazyContractDeserializationError)
+from ..properties import (ObjectProperty, ListProperty, SetProperty, DictProperty,
+                          StringProperty, IntegerProperty, FloatProperty, BooleanProperty)
+from ..extra import UUIDProperty
+from . import json as json_codec
+
+import io
+import json
+import uuid
+
+
+class NestedContract(LazyContract):
+    x = IntegerProperty()
+    y = FloatProperty()
+
+
+class JSONContract(LazyContract):
+    a = StringProperty()
+    b = IntegerProperty(name='bb')
+    c = FloatProperty()
+    d = BooleanProperty()
+    e = ListProperty(StringProperty())
+    f = ObjectProperty(NestedContract)
+    g = DictProperty(IntegerProperty())
+    h = SetProperty()
+    i = UUIDProperty()
+    j = ListProperty()
+    k = StringProperty(exclude_if_none=False)
+    _l = StringProperty()
+
+
+def test_to_json():
+    t = JSONContract(a=u'h\xe9llo "x"', b='5', c=1.5, d=True, e=['a', 'b'],
+                     f=dict(x=1, y=2.0), g={'k': 1, 2: 3}, h=[1], _l='hidden',
+                     i='14d0a7b5-33c5-439b-a66b-2d464f4e7d1b', j=[1, None, {'z': [2]}])
+
+    text = t.to_json()
+    assert text.startswith(u'{"a":"h\\u00e9llo \\"x\\"","bb":5,')
+    assert json.loads(text) == json.loads(json.dumps(t.to_dict()))
+    assert JSONContract().to_json() == '{"k":null}'
+    assert JSONContract(b=-(2 ** 70), g={2 ** 70: 1}).to_json() == \
+        '{"bb":-1180591620717411303424,"g":{"1180591620717411303424":1},"k":null}'
+
+    f = io.StringIO()
+    t.dump(f)
+    assert f.getvalue() == text
+    assert json_codec.dumps(t) == text
+
+    class DefaultContract(LazyContract):
+        x = FloatProperty(default=0)
+
+    assert DefaultContract().to_json() == '{"x":0.0}'
+    assert DefaultContract(x=float('inf')).to_json() == '{"x":Infinity}'
+
+    class VersionedContract(LazyContract):
+        a = StringProperty()
+
+        def to_dict(self):
+            return dict(super(VersionedContract, self).to_dict(), version=2)
+
+    class OuterContract(LazyContract):
+        b = ObjectProperty(VersionedContract)
+        c = IntegerProperty()
+
+    t = OuterContract(b=dict(a='x'), c=True)
+    assert json.loads(t.b.to_json()) == t.b.to_dict() == dict(a='x', version=2)
+    assert json.loads(t.to_json()) == t.to_dict() == dict(b=dict(a='x', version=2), c=True)
+    assert t.to_json().endswith('"c":true}')
+
+
+def test_from_json():
+    t = JSONContract(a=u'h\xe9llo "x"', b='5', c=1.5, d=True, e=['a', 'b'],
+                     f=dict(x=1, y=2.0), g={'k': 1}, h=[1], _l='hidden',
+                     i='14d0a7b5-33c5-439b-a66b-2d464f4e7d1b', j=[1, None, {'z': [2]}])
+
+    assert JSONContract.from_json(t.to_json()) == JSONContract(t.to_dict())
+    assert JSONContract.from_json(t.to_json().encode('utf-8')) == JSONContract(t.to_dict())
+    assert json_codec.loads(JSONContract, json.dumps(t.to_dict(), indent=2)) == \
+        JSONContract(t.to_dict())
+
+    t = JSONContract.from_json(' {"b": "7", "bb": "8", "d": "true", "e": null, '
+                               '"f": {"x": "2", "q": [1, {}]}, "g": {"k": "3"}, "z": {}} ')
+    assert t.b == 8
+    assert t.d is True
+    assert t.e is None
+    assert t.f == NestedContract(x=2)
+    assert t.g == dict(k=3)
+    assert t.i is None
+    assert JSONContract.from_json('{}') == JSONContract()
+
+
+def test_from_json_errors():
+    class StrictJSONContract(StrictContract):
+        a = IntegerProperty(required=True)
+
+    class DynamicJSONContract(DynamicContract):
+        a = IntegerProperty()
+
+    assert DynamicJSONContract.from_json('{"a": 1, "b": [2]}').b == [2]
+
+    for text, error in (('{"a": 1, "b": 2}', LazyContractValidationError),
+                        ('{}', LazyContractValidationError),
+                        ('{"a": "x"}', LazyContractDeserializationError),
+                        ('{"a": 1,}', ValueError),
+                        ('{"a": 1} 2', ValueError),
+                        ('[]', ValueError)):
+        try:
+            StrictJSONContract.from_json(text)
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+
+from ..contract import (LazyContract, StrictContract, DynamicContract,
+                        LazyContractValidationError, LazyContractDeserializationError)
+from ..properties import (ObjectProperty, ListProperty, SetProperty, DictProperty,
+                          StringProperty, IntegerProperty, FloatProperty, BooleanProperty)
+from ..extra import UUIDProperty
+from . import msgpack
+
+import uuid
+
+
+class NestedContract(LazyContract):
+    x = IntegerProperty()
+    y = FloatProperty()
+
+
+class MsgPackContract(LazyContract):
+    a = StringProperty()
+    b = IntegerProperty(name='bb')
+    c = FloatProperty()
+    d = BooleanProperty()
+    e = ListProperty(StringProperty())
+    f = ObjectProperty(NestedContract)
+    g = DictProperty(ObjectProperty(NestedContract))
+    h = SetProperty(IntegerProperty())
+    i = UUIDProperty()
+    j = ListProperty()
+    k = StringProperty(exclude_if_none=False)
+    _l = StringProperty()
+
+
+def test_msgpack():
+    t = MsgPackContract(a=u'h\xe9llo' * 10, b=-(2 ** 40), c=1.1, d=True, e=['a', None],
+                        f=dict(x=70000, y=0.5), g={'k': dict(x=-5), 'n': None}, h=[1, 300],
+                        i='14d0a7b5-33c5-439b-a66b-2d464f4e7d1b', _l='hidden',
+                        j=[1, None, {'z': [2.5, b'\x00' * 300]}])
+
+    data = msgpack.dumps(t)
+    expected = MsgPackContract(t.to_dict())
+    assert msgpack.loads(MsgPackContract, data) == expected
+    assert msgpack.loads(MsgPackContract, msgpack.dumps(t, integer_keys=True)) == expected
+    assert len(msgpack.dumps(t, integer_keys=True)) < len(data)
+    assert msgpack.dumps(MsgPackContract()) == b'\x81\xa1k\xc0'
+    assert msgpack.loads(MsgPackContract, b'\x81\xa1k\xc0') == MsgPackContract()
+
+    # smallest formats
+    for value, packed in ((5, b'\x05'),
+                          (-3, b'\xfd'),
+                          (200, b'\xcc\xc8'),
+                          (-200, b'\xd1\xff\x38'),
+                          (2 ** 32, b'\xcf\x00\x00\x00\x01\x00\x00\x00\x00'),
+                          (0.5, b'\xca\x3f\x00\x00\x00'),
+                          (u'x' * 40, b'\xd9\x28' + b'x' * 40),
+                          ([0] * 16, b'\xdc\x00\x10' + b'\x00' * 16)):
+        out = bytearray()
+        msgpack.pack_value(out, value)
+        assert bytes(out) == packed
+        assert msgpack.unpack_value(out, 0) == (value, len(out))
+        assert msgpack.skip_value(out, 0) == len(out)
+        assert msgpack.unpack_value(packed, 0) == (value, len(packed))
+
+    u = NestedContract(x=1)
+    assert msgpack.dumps(u) == b'\x81\xa1x\x01'
+    assert msgpack.dumps(u, integer_keys=True) == b'\x81\x00\x01'
+    assert msgpack.loads(MsgPackContract, msgpack.dumps(MsgPackContract(
+            i=uuid.UUID(int=1)))).i == uuid.UUID(int=1)
+
+
+def test_msgpack_undefined():
+    class DynamicMsgPackContract(DynamicContract):
+        a = IntegerProperty()
+
+    class StrictMsgPackContract(StrictContract):
+        a = IntegerProperty(required=True)
+
+    # {"a": 1, "b": [1, {"c": ext}]}
+    data = b'\x82\xa1a\x01\xa1b\x92\x01\x81\xa1c\xd5\x01\x00\x00'
+    assert msgpack.loads(NestedContract, data) == NestedContract()
+    try:
+        msgpack.unpack_value(data, 0)
+        assert 'ValueError expected' == False
+    except ValueError:
+        pass
+
+    data = b'\x82\xa1a\x01\xa1b\x92\x01\x02'
+    assert msgpack.loads(DynamicMsgPackContract, data).b == [1, 2]
+
+    for data, error in ((data, LazyContractValidationError),
+                        (b'\x80', LazyContractValidationError),
+                        (b'\x81\xa1a\xa1x', LazyContractDeserializationError),
+                        (b'\x81\xa1a\x01\x01', ValueError),
+                        (b'\x81\xa1a', ValueError),
+                        (b'\x91\x01', ValueError)):
+        try:
+            msgpack.loads(StrictMsgPackContract, data)
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
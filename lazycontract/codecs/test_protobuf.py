@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+
+from ..contract import LazyContract, LazyContractError, LazyContractDeserializationError
+from ..properties import (ObjectProperty, ListProperty, SetProperty, DictProperty,
+                          StringProperty, IntegerProperty, FloatProperty, BooleanProperty)
+from ..extra import UUIDProperty
+from . import protobuf
+from .protobuf import SignedIntegerProperty
+
+import struct
+
+
+class NestedMessage(LazyContract):
+    x = IntegerProperty(tag=1)
+    y = StringProperty(tag=2)
+
+
+class Message(LazyContract):
+    a = IntegerProperty(tag=1)
+    b = SignedIntegerProperty(tag=2)
+    c = FloatProperty(tag=3)
+    d = BooleanProperty(tag=4)
+    e = StringProperty(tag=5)
+    f = ObjectProperty(NestedMessage, tag=6)
+    g = ListProperty(IntegerProperty(), tag=7)
+    h = ListProperty(ObjectProperty(NestedMessage), tag=8)
+    i = DictProperty(IntegerProperty(), tag=9)
+    j = SetProperty(StringProperty(), tag=10)
+    k = UUIDProperty(tag=11)
+    l = ListProperty(tag=12)
+    m = IntegerProperty(tag=13, default=3)
+
+
+def test_protobuf():
+    t = Message(a=-1, b=-1, c=1.5, d=True, e=u'h\xe9llo', f=dict(x=150), g=[1, 300],
+                h=[dict(y='a'), dict(x=2)], i={'k': 1, 2: 3}, j=['x', 'y'],
+                k='14d0a7b5-33c5-439b-a66b-2d464f4e7d1b', l=[1, 'x', None])
+
+    data = protobuf.dumps(t)
+    assert protobuf.loads(Message, data) == t
+    assert protobuf.loads(Message, protobuf.dumps(Message())) == Message()
+
+    # examples from the protocol buffers encoding documentation
+    assert protobuf.dumps(NestedMessage(x=150)) == b'\x08\x96\x01'
+    assert protobuf.dumps(NestedMessage(y='testing')) == b'\x12\x07testing'
+    assert protobuf.dumps(NestedMessage(x=-1)) == b'\x08' + b'\xff' * 9 + b'\x01'
+    assert protobuf.dumps(Message(g=[3, 270, 86942], m=None)) == \
+        b'\x3a\x06\x03\x8e\x02\x9e\xa7\x05'
+    assert protobuf.dumps(Message(b=-1, m=None)) == b'\x10\x01'
+
+    # unpacked repeated fields, float fields and unknown fields
+    data = b'\x38\x01\x38\x02' + b'\x1d' + struct.pack('<f', 0.5) + b'\xa0\x06\x01' + \
+        b'\xa2\x06\x01x' + b'\xa9\x06' + b'\x00' * 8 + b'\xad\x06' + b'\x00' * 4
+    t = protobuf.loads(Message, data)
+    assert t.g == [1, 2] and t.c == 0.5 and t.m == 3
+
+
+def test_protobuf_errors():
+    class Untagged(LazyContract):
+        a = IntegerProperty()
+
+    class UUIDMessage(LazyContract):
+        e = UUIDProperty(tag=5)
+
+    t = Message()
+    t.g = [1, None]
+
+    for error, f in ((LazyContractError, lambda: protobuf.dumps(Untagged())),
+                     (LazyContractDeserializationError,
+                      lambda: protobuf.loads(UUIDMessage, protobuf.dumps(Message(e='x')))),
+                     (ValueError, lambda: protobuf.dumps(t)),
+                     (ValueError, lambda: protobuf.dumps(Message(a=2 ** 63))),
+                     (ValueError, lambda: protobuf.loads(Message, b'\x08')),
+                     (ValueError, lambda: protobuf.loads(Message, b'\x09'))):
+        try:
+            f()
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
@@ -0,0 +1,295 @@
+''' Columnar files of contracts for reading a few properties of many records.
+
+    Records are split into row groups and each property of a row group is
+    stored as a separate, optionally compressed, column chunk. A chunk holds
+    a bitmap of the rows whose value isn't None, unless none are, followed by
+    the values of the other rows in one of these encodings:
+
+     * delta: integers as zigzag varints of the difference with the previous value
+     * dictionary: strings as a list of the distinct values followed by the
+       varint index of each value, when there are at most half as many
+       distinct values as values
+     * plain: the binary encoding of lazycontract.codecs.binary
+
+    The footer at the end of the file describes the contract and locates
+    each chunk, so readers only read and decode the columns they request.
+'''
+
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .properties import StringProperty, IntegerProperty, EnumerationProperty
+from .columns import ContractColumns
+from .container import _codec, describe_schema, schema_fingerprint
+from .codecs import binary
+from .codecs.json import _is_plain
+
+import binascii
+import json
+import six
+import struct
+
+
+MAGIC = b'LZCC\x01'
+
+_FOOTER_SIZE = struct.Struct('<I')
+
+PLAIN = 'plain'
+DELTA = 'delta'
+DICTIONARY = 'dictionary'
+
+_ALL_PRESENT = 0
+_BITMAP = 1
+
+_BIT_COUNTS = [bin(byte).count('1') for byte in range(256)]  # number of bits set by byte
+
+
+def _fields(contract):
+    ''' (attribute name, property) of the stored properties of a contract class '''
+
+    return [(name, inst) for name, inst in ContractColumns(contract)._fields
+            if not inst.name.startswith('_')]
+
+
+def _encode_column(inst, values):
+    ''' (encoding, payload) of a chunk of a column '''
+
+    out = bytearray()
+    present = [value for value in values if value is not None]
+    if len(present) == len(values):
+        out.append(_ALL_PRESENT)
+    else:
+        out.append(_BITMAP)
+        binary._write_bitmap(out, [value is not None for value in values])
+
+    if _is_plain(inst, IntegerProperty):
+        previous = 0
+        for value in present:
+            binary._write_int(out, value - previous)
+            previous = value
+        return DELTA, out
+
+    if _is_plain(inst, StringProperty) or _is_plain(inst, EnumerationProperty):
+        indices = dict()
+        for value in present:
+            indices.setdefault(value, len(indices))
+        if len(indices) * 2 <= len(present) and \
+                all(isinstance(value, six.string_types) for value in indices):
+            binary.write_varint(out, len(indices))
+            for value in sorted(indices, key=indices.get):
+                binary._write_string(out, value)
+            for value in present:
+                binary.write_varint(out, indices[value])
+            return DICTIONARY, out
+
+    write = binary.value_codec(inst)[0]
+    for value in present:
+        write(out, value)
+    return PLAIN, out
+
+
+def _decode_column(inst, encoding, data, rows):
+    ''' Values of the rows of a chunk of a column '''
+
+    if data[0] == _ALL_PRESENT:
+        bits = None
+        count = rows
+        index = 1
+    else:
+        bits, index = binary._read_bitmap(data, 1, rows)
+        count = sum(_BIT_COUNTS[byte] for byte in bits)
+
+    present = []
+    append = present.append
+    if encoding == DELTA:
+        value = 0
+        read_int = binary._read_int
+        for _ in six.moves.range(count):
+            delta, index = read_int(data, index)
+            value += delta
+            append(value)
+    elif encoding == DICTIONARY:
+        size, index = binary.read_varint(data, index)
+        dictionary = []
+        for _ in six.moves.range(size):
+            value, index = binary._read_string(data, index)
+            dictionary.append(value)
+        read_varint = binary.read_varint
+        for _ in six.moves.range(count):
+            value, index = read_varint(data, index)
+            append(dictionary[value])
+    elif encoding == PLAIN:
+        read = binary.value_codec(inst)[1]
+        for _ in six.moves.range(count):
+            value, index = read(data, index)
+            append(value)
+    else:
+        raise LazyContractError('unknown column encoding {}'.format(encoding))
+
+    if index != len(data):
+        raise LazyContractError('invalid column chunk of {}'.format(inst.name))
+
+    if bits is None:
+        return present
+    values = iter(present)
+    return [next(values) if bits[i >> 3] >> (i & 7) & 1 else None
+            for i in six.moves.range(rows)]
+
+
+class ColumnFileWriter(object):
+    ''' Writes contracts of a single class to a columnar file '''
+
+    def __init__(self, fileobj, contract, codec='null', row_group_rows=10000):
+        ''' Create a ColumnFileWriter.
+            fileobj (file):       binary file to write to
+            contract (class):     LazyContract-derived class of the records
+            codec (string):       'null', 'zlib' or 'lzma' compression of column chunks
+            row_group_rows (int): number of records per row group
+        '''
+
+        assert issubclass(contract, LazyContract)
+        self._compress = _codec(codec)[0]
+        self._codec = codec
+        self._fileobj = fileobj
+        self._contract = contract
+        self._fields = _fields(contract)
+        self._row_group_rows = row_group_rows
+        self._rows = ContractColumns(contract)
+        self._row_groups = []
+        self._offset = len(MAGIC)
+        fileobj.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, obj):
+        ''' Append a contract, or deserialize a dict, writing a row group when it's full '''
+
+        self.extend((obj,))
+
+    def extend(self, objs):
+        ''' Append contracts, or deserialize dicts, writing row groups when they're full '''
+
+        for obj in objs:
+            self._rows.append(obj)
+            if len(self._rows) >= self._row_group_rows:
+                self.flush()
+
+    def flush(self):
+        ''' Write the pending records, if any, as a row group '''
+
+        rows = self._rows
+        if not len(rows):
+            return
+
+        chunks = dict()
+        for name, inst in self._fields:
+            encoding, payload = _encode_column(inst, rows.column(name))
+            data = self._compress(bytes(payload))
+            self._fileobj.write(data)
+            chunks[inst.name] = [self._offset, len(data), encoding]
+            self._offset += len(data)
+
+        self._row_groups.append(dict(rows=len(rows), columns=chunks))
+        self._rows = ContractColumns(self._contract)
+
+    def close(self):
+        ''' Write the pending records and the footer. The file object is left open. '''
+
+        self.flush()
+        footer = json.dumps(dict(
+                schema=describe_schema(self._contract),
+                fingerprint=binascii.hexlify(schema_fingerprint(self._contract)).decode('ascii'),
+                codec=self._codec,
+                row_groups=self._row_groups), separators=(',', ':')).encode('utf-8')
+        self._fileobj.write(footer)
+        self._fileobj.write(_FOOTER_SIZE.pack(len(footer)))
+        self._fileobj.write(MAGIC)
+
+
+class ColumnFileReader(object):
+    ''' Reads the columns of contracts from a columnar file '''
+
+    def __init__(self, fileobj, contract, check_schema=True):
+        ''' Create a ColumnFileReader and read the footer.
+            fileobj (file):      seekable binary file to read from
+            contract (class):    LazyContract-derived class of the records
+            check_schema (bool): raise LazyContractError if the file was written
+                                 for a contract with different properties
+        '''
+
+        assert issubclass(contract, LazyContract)
+        self._fileobj = fileobj
+        self._contract = contract
+
+        trailer = len(MAGIC) + _FOOTER_SIZE.size
+        fileobj.seek(0, 2)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        if size < len(MAGIC) + trailer or fileobj.read(len(MAGIC)) != MAGIC:
+            raise LazyContractError('not a column file')
+        fileobj.seek(size - trailer)
+        footer_size = _FOOTER_SIZE.unpack(fileobj.read(_FOOTER_SIZE.size))[0]
+        if fileobj.read(len(MAGIC)) != MAGIC or footer_size > size - len(MAGIC) - trailer:
+            raise LazyContractError('truncated column file')
+        fileobj.seek(size - trailer - footer_size)
+        footer = json.loads(fileobj.read(footer_size).decode('utf-8'))
+
+        fingerprint = binascii.hexlify(schema_fingerprint(contract)).decode('ascii')
+        if check_schema and footer['fingerprint'] != fingerprint:
+            raise LazyContractError('column file schema does not match {}'.format(
+                    contract.__name__))
+
+        self.schema = footer['schema']
+        self.codec = footer['codec']
+        self.row_groups = footer['row_groups']
+        self._decompress = _codec(self.codec)[1]
+        self._fields = dict(_fields(contract))
+
+    def __len__(self):
+        return sum(row_group['rows'] for row_group in self.row_groups)
+
+    def column(self, name):
+        ''' Values of the property with attribute name in every row, as a list '''
+
+        name = self._contract._schema.mappings.get(name, name)
+        inst = self._fields.get(name)
+        if inst is None:
+            raise LazyContractError('{} has no stored property {}'.format(
+                    self._contract.__name__, name))
+
+        result = []
+        for row_group in self.row_groups:
+            chunk = row_group['columns'].get(inst.name)
+            if chunk is None:
+                result.extend([self._contract._schema.defaults[name]] * row_group['rows'])
+                continue
+
+            offset, size, encoding = chunk
+            self._fileobj.seek(offset)
+            data = self._decompress(self._fileobj.read(size))
+            if six.PY2 or not isinstance(data, bytes):
+                data = bytearray(data)
+            result.extend(_decode_column(inst, encoding, data, row_group['rows']))
+        return result
+
+    def read_columns(self, names=None):
+        ''' ContractColumns of every row holding only the properties with
+            attribute names in names, or all of them. Others hold their defaults.
+        '''
+
+        if names is None:
+            names = list(self._fields)
+        return ContractColumns.from_columns(
+                self._contract, dict((self._contract._schema.mappings.get(name, name),
+                                      self.column(name)) for name in names), len(self))
+
+    def read(self, names=None):
+        ''' Contracts of every row with only the properties with attribute names
+            in names, or all of them, read from the file. Others hold their defaults.
+        '''
+
+        return self.read_columns(names).to_contracts()
@@ -0,0 +1,274 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, _deserialization_error, _manages_assignment, _message_keys
+from .properties import IntegerProperty, FloatProperty, BooleanProperty
+
+import array
+import six
+
+
+def _integer_typecode():
+    ''' array.array typecode of 64-bit integers, or None if there's none '''
+
+    for typecode in ('q', 'l'):
+        try:
+            if array.array(typecode).itemsize == 8:
+                return typecode
+        except ValueError:  # 'q' requires python 3.3
+            pass
+    return None
+
+
+# array.array typecodes for properties with fixed-size values;
+# integer columns are lists where arrays can't hold 64-bit integers
+_TYPECODES = ((BooleanProperty, 'b'), (IntegerProperty, _integer_typecode()), (FloatProperty, 'd'))
+
+
+def _typecode(inst):
+    for kind, typecode in _TYPECODES:
+        if isinstance(inst, kind) and inst._type is kind._type:
+            return typecode
+    return None
+
+
+class ContractColumns(object):
+    ''' Struct-of-arrays collection of contracts of a single LazyContract class.
+        Each property is stored in its own column: an array.array for integer,
+        float and boolean properties, otherwise a list. Columns fall back to
+        lists when they need to hold None or integers which don't fit in 64 bits.
+        Undeclared attributes and properties which define __set__ (such as
+        AliasProperty) are not stored.
+    '''
+
+    def __init__(self, contract, objs=()):
+        ''' Create a ContractColumns.
+            contract (class): LazyContract-derived class of the rows
+            objs (iterable):  dicts or contracts to append
+        '''
+
+        assert issubclass(contract, LazyContract)
+        self.contract = contract
+        self._length = 0
+        self._fields = [(name, inst) for name, inst in six.iteritems(contract._schema.properties)
+                        if not _manages_assignment(inst)]
+        self._typecodes = {name: _typecode(inst) for name, inst in self._fields}
+        self.columns = {name: self._new_column(name) for name, _ in self._fields}
+        self.extend(objs)
+
+    @classmethod
+    def from_columns(cls, contract, columns, length):
+        ''' Create a ContractColumns from sequences of values which were already
+            validated, such as those read from a file.
+            contract (class): LazyContract-derived class of the rows
+            columns (dict):   sequence of length values by attribute name;
+                              other properties hold their default
+            length (int):     number of rows
+        '''
+
+        result = cls(contract)
+        for name, inst in result._fields:
+            values = columns.get(name)
+            if values is None:
+                values = [contract._schema.defaults[name]] * length
+            elif len(values) != length:
+                raise ValueError('column {} has {} values rather than {}'.format(
+                        name, len(values), length))
+
+            typecode = result._typecodes[name]
+            try:
+                result.columns[name] = list(values) if typecode is None \
+                    else array.array(typecode, values)
+            except (TypeError, OverflowError):
+                result.columns[name] = list(values)
+                result._typecodes[name] = None
+
+        result._length = length
+        return result
+
+    def _new_column(self, name):
+        typecode = self._typecodes[name]
+        return list() if typecode is None else array.array(typecode)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('{} index out of range'.format(type(self).__name__))
+        return ContractRow(self, index)
+
+    def __iter__(self):
+        for index in six.moves.range(self._length):
+            yield ContractRow(self, index)
+
+    def column(self, name):
+        ''' Values of one property as a list or array.array '''
+
+        if self._typecodes[name] == 'b' and isinstance(self.columns[name], array.array):
+            return [bool(value) for value in self.columns[name]]
+        return self.columns[name]
+
+    def get(self, index, name):
+        ''' Value of property name for the row at index '''
+
+        value = self.columns[name][index]
+        if self._typecodes[name] == 'b' and value is not None:
+            return bool(value)
+        return value
+
+    def set(self, index, name, value):
+        ''' Validate and store the value of property name for the row at index '''
+
+        self.contract._schema.properties[name].validate(value)
+        self._store(name, index, value)
+
+    def _store(self, name, index, value):
+        column = self.columns[name]
+        try:
+            if index == self._length:
+                column.append(value)
+            else:
+                column[index] = value
+        except (TypeError, OverflowError):
+            # array.array can't hold the value
+            self.columns[name] = column = list(self.column(name))
+            self._typecodes[name] = None
+            self._store(name, index, value)
+
+    def append(self, obj):
+        ''' Deserialize a dict, or copy a contract, into a new row '''
+
+        self.extend((obj,))
+
+    def extend(self, objs):
+        ''' Deserialize dicts, or copy contracts, into new rows in a single pass '''
+
+        contract = self.contract
+        strict = not contract._ignore_undefined_attributes
+        defaults = contract._schema.defaults
+        fields = [(name, inst, _message_keys(name, inst)) for name, inst in self._fields]
+        store = self._store
+
+        for obj in objs:
+            index = self._length
+
+            if isinstance(obj, LazyContract):
+                for name, inst, _ in fields:
+                    store(name, index, getattr(obj, name))
+                self._length += 1
+                continue
+
+            found = 0
+            for name, inst, keys in fields:
+                for key in keys:
+                    if key in obj:
+                        value = obj[key]
+                        found += 1
+                        break
+                else:
+                    if inst.required or (inst.not_none and inst.default is None):
+                        self._rollback(index)
+                        contract._check_required(contract.__new__(contract), obj)
+                    store(name, index, defaults[name])
+                    continue
+
+                try:
+                    if value is not None:
+                        try:
+                            value = inst.deserialize(value)
+                        except Exception as e:
+                            raise _deserialization_error(contract.__new__(contract), name, value, e)
+                    inst.validate(value)
+                except Exception:
+                    self._rollback(index)
+                    raise
+                store(name, index, value)
+
+            if strict and found != len(obj):
+                try:
+                    contract.__new__(contract)._populate_undefined(obj)
+                except Exception:
+                    self._rollback(index)
+                    raise
+
+            self._length += 1
+
+    def _rollback(self, index):
+        for column in six.itervalues(self.columns):
+            del column[index:]
+
+    def to_contracts(self):
+        ''' Materialize the rows as a list of contracts '''
+
+        return [row.to_contract() for row in self]
+
+    def to_dicts(self):
+        ''' Serialize the rows into a list of dicts '''
+
+        return [row.to_dict() for row in self]
+
+
+class ContractRow(object):
+    ''' Lightweight view of one row of a ContractColumns which reads and
+        writes property values like the corresponding contract.
+    '''
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns, index):
+        object.__setattr__(self, '_columns', columns)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, key):
+        columns = self._columns
+        name = columns.contract._schema.mappings.get(key, key)
+        if name not in columns.columns:
+            raise AttributeError('{!r} object has no attribute {!r}'.format(
+                    columns.contract.__name__, key))
+        return columns.get(self._index, name)
+
+    def __setattr__(self, key, value):
+        columns = self._columns
+        name = columns.contract._schema.mappings.get(key, key)
+        if name not in columns.columns:
+            raise AttributeError('{!r} object has no attribute {!r}'.format(
+                    columns.contract.__name__, key))
+        columns.set(self._index, name, value)
+
+    def __repr__(self):
+        columns = self._columns
+        return '{}({})'.format(
+            columns.contract.__name__,
+            ', '.join('{}={}'.format(name, repr(columns.get(self._index, name)))
+                      for name, _ in columns._fields))
+
+    def __eq__(self, other):
+        if isinstance(other, (ContractRow, self._columns.contract)):
+            return all(getattr(self, name) == getattr(other, name)
+                       for name, _ in self._columns._fields)
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def to_dict(self):
+        ''' Serialize the row into a Python dictionary '''
+
+        result = dict()
+        for name, prop in self._columns._fields:
+            value = self._columns.get(self._index, name)
+            if not prop.name.startswith('_') and (value is not None or not prop.exclude_if_none):
+                result[prop.name] = prop.serialize(value)
+        return result
+
+    def to_contract(self):
+        ''' Materialize the row as a contract '''
+
+        columns = self._columns
+        contract = columns.contract.__new__(columns.contract)
+        for name, _ in columns._fields:
+            setattr(contract, name, columns.get(self._index, name))
+        return contract
@@ -0,0 +1,274 @@
+''' Splittable container files of contracts, in the spirit of Avro object
+    container files.
+
+    A file starts with a header: the magic bytes, a description of the
+    contract's properties and its fingerprint, the name of the compression
+    codec and a random 16-byte sync marker. Blocks of records follow, each
+    made of the number of records, the size of the block's data, the data
+    (the records in the binary encoding of lazycontract.codecs.binary,
+    optionally compressed) and the sync marker.
+
+    A reader given a byte range [start, end) searches for the first sync
+    marker at or after start and reads the blocks which follow sync markers
+    before end, so readers of adjacent ranges read each block exactly once.
+'''
+
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .properties import ObjectProperty, ContainerProperty
+from .codecs import binary
+
+import hashlib
+import json
+import os
+import six
+import zlib
+
+try:
+    import lzma
+except ImportError:  # python 2
+    lzma = None
+
+
+MAGIC = b'LZC\x01'
+
+SYNC_SIZE = 16
+
+
+def _compress_zlib(data):
+    return zlib.compress(data)
+
+
+def _compress_lzma(data):
+    return lzma.compress(data)
+
+
+def _decompress_lzma(data):
+    return lzma.decompress(data)
+
+
+# (compress, decompress) by codec name
+CODECS = {
+    'null': (bytes, bytes),
+    'zlib': (_compress_zlib, zlib.decompress),
+    'lzma': (_compress_lzma, _decompress_lzma),
+}
+
+
+def _describe(inst):
+    description = [type(inst).__name__, inst.name, inst.tag]
+    if isinstance(inst, ObjectProperty):
+        description.append(describe_schema(inst._kind))
+    elif isinstance(inst, ContainerProperty) and inst._property is not None:
+        description.append(_describe(inst._property))
+    return description
+
+
+def describe_schema(cls):
+    ''' JSON-compatible description of the encoded properties of a contract class '''
+
+    return [_describe(inst) for _, inst in binary._fields(cls)]
+
+
+def schema_fingerprint(cls):
+    ''' 8-byte fingerprint of describe_schema(cls) '''
+
+    text = json.dumps(describe_schema(cls), separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).digest()[:8]
+
+
+def _codec(name):
+    if name not in CODECS:
+        raise LazyContractError('codec must be one of {}'.format(', '.join(sorted(CODECS))))
+    elif name == 'lzma' and lzma is None:
+        raise LazyContractError('lzma codec requires the lzma module')
+    return CODECS[name]
+
+
+def _write_varint(fileobj, value):
+    out = bytearray()
+    binary.write_varint(out, value)
+    fileobj.write(bytes(out))
+
+
+def _read_varint(fileobj):
+    ''' Varint read from fileobj, or None at the end of the file '''
+
+    result = 0
+    shift = 0
+    while True:
+        byte = fileobj.read(1)
+        if not byte:
+            if shift:
+                raise LazyContractError('truncated container file')
+            return None
+        byte = ord(byte)
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result
+        shift += 7
+
+
+def _read_exactly(fileobj, size):
+    data = fileobj.read(size)
+    if len(data) != size:
+        raise LazyContractError('truncated container file')
+    return data
+
+
+class ContainerWriter(object):
+    ''' Writes contracts of a single class to a container file in blocks '''
+
+    def __init__(self, fileobj, contract, codec='null', block_records=1000):
+        ''' Create a ContainerWriter and write the file header.
+            fileobj (file):      binary file to write to
+            contract (class):    LazyContract-derived class of the records
+            codec (string):      'null', 'zlib' or 'lzma' compression of blocks
+            block_records (int): number of records per block
+        '''
+
+        assert issubclass(contract, LazyContract)
+        self._compress = _codec(codec)[0]
+        self._fileobj = fileobj
+        self._contract = contract
+        self._encode = binary.contract_encoder(contract)
+        self._block_records = block_records
+        self._block = bytearray()
+        self._count = 0
+        self.sync = os.urandom(SYNC_SIZE)
+
+        schema = json.dumps(describe_schema(contract), separators=(',', ':'), sort_keys=True)
+        fileobj.write(MAGIC)
+        for value in (schema.encode('utf-8'), codec.encode('ascii')):
+            _write_varint(fileobj, len(value))
+            fileobj.write(value)
+        fileobj.write(schema_fingerprint(contract))
+        fileobj.write(self.sync)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, contract):
+        ''' Append a contract, writing a block when it's full '''
+
+        assert isinstance(contract, self._contract)
+        self._encode(self._block, contract)
+        self._count += 1
+        if self._count >= self._block_records:
+            self.flush()
+
+    def extend(self, contracts):
+        ''' Append contracts, writing blocks when they're full '''
+
+        for contract in contracts:
+            self.write(contract)
+
+    def flush(self):
+        ''' Write the pending records, if any, as a block '''
+
+        if not self._count:
+            return
+
+        data = self._compress(bytes(self._block))
+        _write_varint(self._fileobj, self._count)
+        _write_varint(self._fileobj, len(data))
+        self._fileobj.write(data)
+        self._fileobj.write(self.sync)
+        self._block = bytearray()
+        self._count = 0
+
+    def close(self):
+        ''' Write the pending records. The file object is left open. '''
+
+        self.flush()
+
+
+class ContainerReader(object):
+    ''' Reads contracts from the blocks of a container file within a byte range.
+        Readers of disjoint ranges which cover the file, such as
+        [0, size / 2) and [size / 2, size), together read every record once.
+    '''
+
+    def __init__(self, fileobj, contract, start=0, end=None, check_schema=True):
+        ''' Create a ContainerReader and read the file header.
+            fileobj (file):      seekable binary file to read from
+            contract (class):    LazyContract-derived class of the records
+            start (int):         offset from which to search for the first block
+            end (int):           offset past which no more blocks are started
+            check_schema (bool): raise LazyContractError if the file was written
+                                 for a contract with different properties
+        '''
+
+        assert issubclass(contract, LazyContract)
+        self._fileobj = fileobj
+        self._contract = contract
+        self._start = start
+        self._end = end
+
+        fileobj.seek(0)
+        if fileobj.read(len(MAGIC)) != MAGIC:
+            raise LazyContractError('not a container file')
+        schema = _read_exactly(fileobj, _read_varint(fileobj) or 0)
+        codec = _read_exactly(fileobj, _read_varint(fileobj) or 0).decode('ascii')
+        fingerprint = _read_exactly(fileobj, 8)
+        self.sync = _read_exactly(fileobj, SYNC_SIZE)
+        self.schema = json.loads(schema.decode('utf-8'))
+        self.codec = codec
+        self._decompress = _codec(codec)[1]
+
+        if check_schema and fingerprint != schema_fingerprint(contract):
+            raise LazyContractError('container file schema does not match {}'.format(
+                    contract.__name__))
+
+    def _find_sync(self, offset):
+        ''' Offset of the first sync marker at or after offset, or None '''
+
+        fileobj = self._fileobj
+        fileobj.seek(offset)
+        tail = b''
+        while True:
+            chunk = fileobj.read(65536)
+            if not chunk:
+                return None
+            data = tail + chunk
+            index = data.find(self.sync)
+            if index >= 0:
+                return offset - len(tail) + index
+            tail = data[-(SYNC_SIZE - 1):]
+            offset += len(chunk)
+
+    def blocks(self):
+        ''' Yield the decompressed data and record count of each block in the range '''
+
+        fileobj = self._fileobj
+        sync = self._find_sync(self._start)
+
+        while sync is not None and (self._end is None or sync < self._end):
+            fileobj.seek(sync + SYNC_SIZE)
+            count = _read_varint(fileobj)
+            if count is None:
+                return
+            size = _read_varint(fileobj)
+            if size is None:
+                raise LazyContractError('truncated container file')
+            data = self._decompress(_read_exactly(fileobj, size))
+            sync = fileobj.tell()
+            if _read_exactly(fileobj, SYNC_SIZE) != self.sync:
+                raise LazyContractError('invalid sync marker at offset {}'.format(sync))
+            yield data, count
+
+    def __iter__(self):
+        decode = binary.contract_decoder(self._contract)
+        for data, count in self.blocks():
+            if six.PY2 or not isinstance(data, bytes):
+                data = bytearray(data)
+            index = 0
+            for _ in six.moves.range(count):
+                contract, index = decode(data, index)
+                yield contract
+            if index != len(data):
+                raise LazyContractError('invalid block of {} records'.format(count))
@@ -1,7 +1,18 @@
 from __future__ import absolute_import
 
+import copy
+import itertools
+import operator
 import re
 import six
+import uuid
+
+from collections import OrderedDict
+
+try:
+    from types import MappingProxyType as _frozendict
+except ImportError:  # python 2, where schema dicts must keep their order
+    _frozendict = OrderedDict
 
 
 IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\Z')
@@ -28,6 +39,21 @@ class LazyContractValidationError(LazyContractError):
     ATTR_TYPE_FMT = '{}.{} value {} is not of type {}'
 
 
+_MISSING = object()  # sentinel for values absent from a message
+
+_property_order = itertools.count()  # creation order of properties
+
+# types of values which copy.deepcopy returns as they are
+_IMMUTABLE_TYPES = frozenset(six.string_types + six.integer_types + (
+        six.text_type, bytes, float, bool, type(None), uuid.UUID))
+
+
+def _deserialization_error(contract, key, value, e):
+    return LazyContractDeserializationError(
+            LazyContractDeserializationError.FMT.format(
+                    type(contract).__name__, key, repr(value), e))
+
+
 class LazyProperty(object):
     ''' Base class for descriptors used as properties in a LazyContract.
         Create a sub-class of this to define your own (de-)serialization.
@@ -38,32 +64,40 @@ class LazyProperty(object):
     _default_name = '(anonymous)'  # applies to properties within a container
 
     def __init__(self, name=None, default=None,
-                 required=False, not_none=False, exclude_if_none=True):
+                 required=False, not_none=False, exclude_if_none=True, tag=None):
         ''' Create a LazyProperty.
             name (string):   the attribute name used for (de-)serialization
             default (_type): default value if not available during deserialization
             required (bool): raise LazyContractValidationError if not provided
             not_none (bool): raise LazyContractValidationError if value is None
             exclude_if_none (bool): don't serialize if value is None
+            tag (int):       stable positive field number identifying the property
+                             in binary encodings instead of its position
         '''
 
         if required and default is not None:
             raise LazyContractError('default specified for required property')
+        if tag is not None and (not isinstance(tag, six.integer_types) or tag < 1):
+            raise LazyContractError('tag must be a positive integer')
 
         self.name = name or self._default_name
+        self._order = next(_property_order)
         self.required = required
         self.default = default
         self.not_none = not_none
         self.exclude_if_none = exclude_if_none
+        self.tag = tag
 
     def __get__(self, obj, objtype=None):
-        value = obj.__dict__.get(self.name, self.default)
-        self.validate(value)
-        return value
-
-    def __set__(self, obj, value):
-        self.validate(value)
-        obj.__dict__[self.name] = value
+        # values are validated when set and stored in the instance __dict__
+        # under the attribute name, which takes precedence over this
+        # non-data descriptor: it's only consulted for absent values
+        if obj is None:
+            return self
+        elif obj._lazy_source is None:
+            return self.default
+        else:
+            return obj._load_property(self)
 
     def validate(self, obj):
         ''' Validate values whenever they're set.
@@ -96,11 +130,438 @@ class LazyProperty(object):
         return obj if isinstance(obj, self._type) else self._type(obj)
 
 
+class ContractSchema(object):
+    ''' Immutable description of the properties of a LazyContract-derived class.
+        Built once by LazyContractMeta when the class is created.
+    '''
+
+    __slots__ = ('properties', 'mappings', 'required', 'defaults', 'attributes', 'slots', 'tags',
+                 'stored', 'managed')
+
+    def __init__(self, cls):
+        properties = OrderedDict()
+        mappings = dict()
+        slots = set()
+
+        for base in reversed(cls.__mro__):
+            for name, inst in _declared_properties(base):
+                properties[name] = inst
+                if name in base.__dict__.get('__slots__', ()):
+                    slots.add(name)
+                else:
+                    slots.discard(name)
+
+                if inst.name == inst._default_name:
+                    inst.name = name
+                elif inst.name != name:
+                    mappings[inst.name] = name
+
+        tags = dict()
+        for name, inst in six.iteritems(properties):
+            if inst.tag is not None:
+                if inst.tag in tags:
+                    raise LazyContractError('{}.{} and {}.{} have the same tag {}'.format(
+                            cls.__name__, tags[inst.tag], cls.__name__, name, inst.tag))
+                tags[inst.tag] = name
+
+        # properties which must be present when deserializing
+        required = tuple((name, inst) for name, inst in six.iteritems(properties)
+                         if inst.required or (inst.not_none and inst.default is None))
+
+        self.properties = _frozendict(properties)
+        self.mappings = _frozendict(mappings)
+        self.slots = frozenset(slots)  # properties stored in __slots__ instead of __dict__
+        self.tags = _frozendict(tags)  # attribute name by property tag
+        self.required = required
+        self.defaults = _frozendict(OrderedDict(
+                (name, inst.default) for name, inst in six.iteritems(properties)))
+
+        # (attribute name, property to validate) by name assigned in __setattr__;
+        # properties which define __set__ handle assignment themselves
+        attributes = {key: (name, properties[name]) for key, name in six.iteritems(mappings)}
+        attributes.update((name, (name, inst)) for name, inst in six.iteritems(properties))
+        self.attributes = _frozendict({
+                key: (name, None if _manages_assignment(inst) else inst)
+                for key, (name, inst) in six.iteritems(attributes)})
+
+        # attribute names of the properties which hold a value, in schema order
+        self.stored = tuple(name for name, inst in six.iteritems(properties)
+                            if not _manages_assignment(inst))
+        # (attribute name, property) of the others, which lazy contracts assign eagerly
+        self.managed = tuple((name, inst) for name, inst in six.iteritems(properties)
+                             if _manages_assignment(inst))
+
+
+def _declared_properties(cls):
+    ''' Properties declared by a class, including those moved to __slots__,
+        in the order they were created, which the class __dict__ doesn't keep
+        on every interpreter
+    '''
+
+    declared = [(name, inst) for name, inst in six.iteritems(cls.__dict__)
+                if isinstance(inst, LazyProperty)]
+    declared.extend(cls.__dict__.get('_slotted_properties', ()))
+    return sorted(declared, key=lambda item: item[1]._order)
+
+
+def _slotted_getattr(self, key):
+    ''' __getattr__ for slotted contracts, called for properties without a value '''
+
+    default = self._schema.defaults.get(key, _MISSING)
+    if default is _MISSING:
+        raise AttributeError('{!r} object has no attribute {!r}'.format(
+                type(self).__name__, key))
+    elif getattr(self, '_lazy_source', None) is None:
+        return default
+    else:
+        return self._load_property(self._schema.properties[key])
+
+
+def _manages_assignment(inst):
+    ''' Whether a property is a data descriptor storing its own value '''
+
+    return hasattr(type(inst), '__set__')
+
+
+def _inherits(kind, base, method):
+    ''' Whether class kind uses the method of base rather than its own.
+        Compares functions since python 2 creates a new unbound method on each access.
+    '''
+
+    return six.get_unbound_function(getattr(kind, method)) is \
+        six.get_unbound_function(getattr(base, method))
+
+
+def _overrides(cls, method):
+    ''' Whether a contract class defines its own method rather than using
+        LazyContract's or a generated one.
+    '''
+
+    function = six.get_unbound_function(getattr(cls, method))
+    return function is not six.get_unbound_function(getattr(LazyContract, method)) and \
+        not getattr(function, '_generated', False)
+
+
+def _overrides_init(cls):
+    ''' Whether a contract class defines its own __init__, which alternate
+        constructors must call rather than populating a new instance directly.
+    '''
+
+    return _overrides(cls, '__init__')
+
+
+def _discards_undefined(cls):
+    ''' Whether a contract class ignores undefined attributes without inspecting them '''
+
+    return cls._ignore_undefined_attributes and \
+        cls._undefined_attribute == LazyContract._undefined_attribute
+
+
+def _message_keys(name, inst):
+    ''' Keys which may hold a property's value in a message '''
+
+    return (inst.name,) if inst.name == name else (inst.name, name)
+
+
+def _state_functions(cls):
+    ''' (state, restore) of a contract class, built once per class: state(contract)
+        returns the tuple of its values of schema.stored and a dict of its undeclared
+        attributes or None, from which restore(values, extras) rebuilds a contract
+        without calling __init__ or validating the values again
+    '''
+
+    functions = cls.__dict__.get('_contract_state_functions')
+    if functions is not None:
+        return functions
+
+    schema = cls._schema
+    stored = schema.stored
+    if len(stored) > 1:
+        values = operator.attrgetter(*stored)
+    elif stored:
+        getter = operator.attrgetter(stored[0])
+        values = lambda contract: (getter(contract),)
+    else:
+        values = lambda contract: ()
+
+    if cls.__dictoffset__:
+        # attributes of the instance __dict__ which aren't properties
+        attributes = frozenset(schema.attributes) | frozenset(['_lazy_source'])
+
+        def state(contract):
+            d = contract.__dict__
+            undeclared = six.viewkeys(d) - attributes
+            return values(contract), {key: d[key] for key in undeclared} if undeclared else None
+    else:
+        def state(contract):
+            return values(contract), None
+
+    env = dict(new=cls.__new__, cls=cls, setattr_=object.__setattr__, iteritems=six.iteritems)
+    restore = ['def restore(values, extras):',
+               '    self = new(cls)']
+    if any(name not in schema.slots for name in stored):
+        restore.append('    d = self.__dict__')
+    if stored:
+        restore.append('    {}, = values'.format(', '.join('v{}'.format(i) for i in range(len(stored)))))
+    for i, name in enumerate(stored):
+        if name in schema.slots:
+            env['set_{}'.format(i)] = getattr(cls, name).__set__
+            restore.append('    set_{}(self, v{})'.format(i, i))
+        else:
+            restore.append('    d[{!r}] = v{}'.format(name, i))
+    restore.append('    if extras:')
+    restore.append('        for key, value in iteritems(extras):')
+    restore.append('            setattr_(self, key, value)')
+    restore.append('    return self')
+    six.exec_(compile('\n'.join(restore) + '\n', '<lazycontract {}>'.format(cls.__name__), 'exec'), env)
+
+    functions = (state, env['restore'])
+    setattr(cls, '_contract_state_functions', functions)
+    return functions
+
+
+def _contract_state(contract):
+    ''' (tuple of the values of schema.stored, dict of undeclared attributes or None)
+        of a contract, from which _restore_contract rebuilds it
+    '''
+
+    return _state_functions(type(contract))[0](contract)
+
+
+def _restore_contract(cls, values, extras=None):
+    ''' Rebuild a contract from _contract_state without calling __init__ or
+        validating the values again
+    '''
+
+    return _state_functions(cls)[1](values, extras)
+
+
+def _last_key(obj, keys):
+    ''' The one of keys which comes last when iterating over obj '''
+
+    last = None
+    for key in obj:
+        if key in keys:
+            last = key
+    return last
+
+
+def _slot_properties(namespace):
+    ''' Replace the plain properties of a class namespace with __slots__ '''
+
+    slotted = [(name, inst) for name, inst in six.iteritems(namespace)
+               if isinstance(inst, LazyProperty) and not _manages_assignment(inst) and
+               _inherits(type(inst), LazyProperty, '__get__')]
+
+    for name, _ in slotted:
+        del namespace[name]
+
+    slots = tuple(namespace.get('__slots__', ()))
+    namespace['__slots__'] = slots + tuple(name for name, _ in slotted)
+    namespace['_slotted_properties'] = tuple(slotted)
+    namespace.setdefault('__getattr__', _slotted_getattr)
+
+
+def _populate_source(cls, env):
+    ''' Lines of the body of a generated function deserializing the message obj
+        into the new contract self, with the handling of each property unrolled.
+        Adds the names they use to env.
+    '''
+
+    schema = cls._schema
+    env.update(missing=_MISSING, deserialization_error=_deserialization_error,
+               last_key=_last_key)
+
+    populate = []
+    if len(schema.slots) < len(schema.properties):
+        populate.append('    d = self.__dict__')
+    populate.append('    get = obj.get')
+    populate.append('    found = 0')
+
+    for i, (name, inst) in enumerate(six.iteritems(schema.properties)):
+        env['deserialize_{}'.format(i)] = inst.deserialize
+        env['validate_{}'.format(i)] = inst.validate
+        env['type_{}'.format(i)] = inst._type
+        kind = type(inst)
+
+        keys = _message_keys(name, inst)
+        populate.append('    value = get({!r}, missing)'.format(keys[0]))
+        if len(keys) > 1:
+            # like _populate_properties, the key which comes last in obj wins
+            populate.append('    if value is missing:')
+            populate.append('        value = get({!r}, missing)'.format(keys[1]))
+            populate.append('    elif {!r} in obj:'.format(keys[1]))
+            populate.append('        found += 1')
+            populate.append('        value = obj[last_key(obj, {!r})]'.format(keys))
+        populate.append('    if value is not missing:')
+        populate.append('        found += 1')
+        populate.append('        if value is not None:')
+        populate.append('            try:')
+        populate.append('                value = deserialize_{}(value)'.format(i))
+        populate.append('            except Exception as e:')
+        populate.append('                raise deserialization_error(self, {!r}, value, e)'.format(name))
+        if _manages_assignment(inst):
+            populate.append('        setattr(self, {!r}, value)'.format(name))
+            continue
+
+        if not _inherits(kind, LazyProperty, 'validate'):
+            populate.append('        validate_{}(value)'.format(i))
+        elif inst.not_none:
+            populate.append('        if value is None or not isinstance(value, type_{}):'.format(i))
+            populate.append('            validate_{}(value)'.format(i))
+        else:
+            populate.append('        if value is not None and not isinstance(value, type_{}):'.format(i))
+            populate.append('            validate_{}(value)'.format(i))
+        if name in schema.slots:
+            env['set_{}'.format(i)] = getattr(cls, name).__set__
+            populate.append('        set_{}(self, value)'.format(i))
+        else:
+            populate.append('        d[{!r}] = value'.format(name))
+
+    populate.append('    if found != len(obj):')
+    populate.append('        self._populate_undefined(obj)')
+    return populate
+
+
+def _compile_contract(cls):
+    ''' Generate __init__, _populate_properties and to_dict for a contract
+        class with the handling of each property unrolled.
+    '''
+
+    schema = cls._schema
+    env = dict(LazyContractError=LazyContractError, missing=_MISSING)
+
+    init = ['def __init__(self, _obj=None, **kwargs):',
+            '    if _obj is not None and kwargs:',
+            '        raise LazyContractError(\'both _obj and kwargs provided\')',
+            '    obj = _obj or kwargs']
+    for name, inst in schema.required:
+        init.append('    if {}:'.format(' and '.join(
+                '{!r} not in obj'.format(key) for key in _message_keys(name, inst))))
+        init.append('        self._check_required(obj)')
+    init.append('    self.{}(obj)'.format(
+            '_defer_properties' if cls._lazy else '_populate_properties'))
+
+    populate = ['def _populate_properties(self, obj):'] + _populate_source(cls, env)
+
+    to_dict = ['def to_dict(self):']
+    if len(schema.slots) < len(schema.properties):
+        to_dict.append('    d = self.__dict__')
+    to_dict.append('    result = {}')
+
+    for i, (name, inst) in enumerate(six.iteritems(schema.properties)):
+        if inst.name.startswith('_'):
+            continue
+        env['serialize_{}'.format(i)] = inst.serialize
+        env['default_{}'.format(i)] = schema.defaults[name]
+        kind = type(inst)
+
+        if not _inherits(kind, LazyProperty, '__get__') or name in schema.slots:
+            to_dict.append('    value = self.{}'.format(name))
+        elif cls._lazy:
+            to_dict.append('    value = d.get({!r}, missing)'.format(name))
+            to_dict.append('    if value is missing:')
+            to_dict.append('        value = getattr(self, {!r})'.format(name))
+        else:
+            to_dict.append('    value = d.get({!r}, default_{})'.format(name, i))
+        serialized = 'value' if _inherits(kind, LazyProperty, 'serialize') \
+            else 'serialize_{}(value)'.format(i)
+        if inst.exclude_if_none:
+            to_dict.append('    if value is not None:')
+            to_dict.append('        result[{!r}] = {}'.format(inst.name, serialized))
+        else:
+            to_dict.append('    result[{!r}] = {}'.format(inst.name, serialized))
+
+    to_dict.append('    return result')
+
+    source = '\n'.join(init + [''] + populate + [''] + to_dict) + '\n'
+    six.exec_(compile(source, '<lazycontract {}>'.format(cls.__name__), 'exec'), env)
+
+    for method in ('__init__', '_populate_properties', 'to_dict'):
+        env[method]._generated = True
+        # keep methods defined by the class or any base other than LazyContract
+        inherited = six.get_unbound_function(getattr(cls, method))
+        if inherited is six.get_unbound_function(getattr(LazyContract, method)) or \
+                getattr(inherited, '_generated', False):
+            setattr(cls, method, env[method])
+    cls._compiled_source = source
+
+
+def _batch_function(cls):
+    ''' Function deserializing an iterable of dicts into a list of contracts of
+        a class with the required checks and the handling of each property
+        unrolled in the loop, built once per class. None if the class populates
+        contracts its own way.
+    '''
+
+    if '_contract_batch_function' in cls.__dict__:
+        return cls.__dict__['_contract_batch_function']
+
+    populate = six.get_unbound_function(cls._populate_properties)
+    function = None
+    if not cls._lazy and not _overrides_init(cls) and \
+            _inherits(cls, LazyContract, '__setattr__') and \
+            (populate is six.get_unbound_function(LazyContract._populate_properties) or
+             getattr(populate, '_generated', False)):
+        env = dict(new=cls.__new__, cls=cls)
+        batch = ['def from_dicts(objs):',
+                 '    result = []',
+                 '    append = result.append',
+                 '    for obj in objs:',
+                 '        self = new(cls)']
+        for name, inst in cls._schema.required:
+            batch.append('        if {}:'.format(' and '.join(
+                    '{!r} not in obj'.format(key) for key in _message_keys(name, inst))))
+            batch.append('            self._check_required(obj)')
+        batch.extend('    ' + line for line in _populate_source(cls, env))
+        batch.append('        append(self)')
+        batch.append('    return result')
+        six.exec_(compile('\n'.join(batch) + '\n', '<lazycontract {}>'.format(cls.__name__),
+                          'exec'), env)
+        function = env['from_dicts']
+
+    setattr(cls, '_contract_batch_function', function)
+    return function
+
+
+class LazyContractMeta(type):
+    ''' Metaclass for LazyContract which builds the class ContractSchema '''
+
+    def __new__(mcs, name, bases, namespace):
+        def option(key):
+            return namespace.get(key, any(getattr(base, key, False) for base in bases))
+
+        if option('_slotted'):
+            _slot_properties(namespace)
+            if option('_lazy') and not any('_lazy_source' in klass.__dict__.get('__slots__', ())
+                                           for base in bases for klass in base.__mro__):
+                namespace['__slots__'] += ('_lazy_source',)
+        return super(LazyContractMeta, mcs).__new__(mcs, name, bases, namespace)
+
+    def __init__(cls, name, bases, namespace):
+        super(LazyContractMeta, cls).__init__(name, bases, namespace)
+        cls._schema = ContractSchema(cls)
+
+        if cls._compiled:
+            _compile_contract(cls)
+
+
+@six.add_metaclass(LazyContractMeta)
 class LazyContract(object):
     ''' Base class for custom contracts to be serialized and deserialized. '''
 
+    __slots__ = ()
+
     _ignore_undefined_attributes = True
 
+    _compiled = False  # generate specialized __init__, _populate_properties and to_dict
+
+    _lazy = False  # deserialize properties when they are first accessed
+
+    _slotted = False  # store properties in __slots__ rather than the instance __dict__
+
+    _lazy_source = None  # message retained by lazy contracts
+
     def __init__(self, _obj=None, **kwargs):
         ''' Deserialize a contract.
             _obj (dict): data to deserialize
@@ -110,14 +571,22 @@ class LazyContract(object):
         if _obj is not None and kwargs:
             raise LazyContractError('both _obj and kwargs provided')
 
-        self._properties = dict()
-        self._mappings = dict()
+        obj = _obj or kwargs
+        self._check_required(obj)
 
-        for cls in reversed(self.__class__.__mro__):
-            if cls != LazyContract and issubclass(cls, LazyContract):
-                self.__discover_properties(_obj or kwargs, cls)
+        if self._lazy:
+            self._defer_properties(obj)
+        else:
+            self._populate_properties(obj)
 
-        self._populate_properties(_obj or kwargs)
+    def __setattr__(self, key, value):
+        attribute = self._schema.attributes.get(key)
+        if attribute is not None:
+            key, inst = attribute
+            if inst is not None:
+                inst.validate(value)
+
+        object.__setattr__(self, key, value)
 
     def __repr__(self):
         return '{}({})'.format(
@@ -125,51 +594,101 @@ class LazyContract(object):
             ', '.join('{}={}'.format(name, repr(value))
                       for name, _, value in self.__iter_properties()))
 
-    def __discover_properties(self, obj, cls):
-        for name, inst in six.iteritems(cls.__dict__):
-            if isinstance(inst, LazyProperty):
-                self._properties[name] = inst
-
-                if inst.name == inst._default_name:
-                    inst.name = name
-                else:
-                    self._mappings[inst.name] = name
-
-                if inst.name not in obj and name not in obj:
-                    if inst.required:
-                        raise LazyContractValidationError(
-                                LazyContractValidationError.REQUIRED_FMT.format(
-                                        type(self).__name__, inst.name, repr(obj)))
+    def _check_required(self, obj):
+        for name, inst in self._schema.required:
+            if all(key not in obj for key in _message_keys(name, inst)):
+                if inst.required:
+                    raise LazyContractValidationError(
+                            LazyContractValidationError.REQUIRED_FMT.format(
+                                    type(self).__name__, inst.name, repr(obj)))
 
-                    if inst.not_none and inst.default is None:
-                        raise LazyContractValidationError(
-                                LazyContractValidationError.NOT_NONE_FMT.format(
-                                        type(self).__name__, inst.name))
+                raise LazyContractValidationError(
+                        LazyContractValidationError.NOT_NONE_FMT.format(
+                                type(self).__name__, inst.name))
 
     def _populate_properties(self, obj):
+        properties = self._schema.properties
+        mappings = self._schema.mappings
+
         for key, value in six.iteritems(obj):
-            if key in self._mappings:
-                key = self._mappings[key]
+            if key in mappings:
+                key = mappings[key]
 
-            if key not in self._properties:
-                if self._ignore_undefined_attributes:
-                    continue
-                raise LazyContractValidationError(
-                        LazyContractValidationError.INVALID_ATTR_FMT.format(
-                                type(self).__name__, key))
+            if key not in properties:
+                self._undefined_attribute(key, value)
+                continue
 
             if value is not None:
                 try:
-                    value = self._properties[key].deserialize(value)
+                    value = properties[key].deserialize(value)
                 except Exception as e:
-                    raise LazyContractDeserializationError(
-                            LazyContractDeserializationError.FMT.format(
-                                    type(self).__name__, key, repr(value), e))
+                    raise _deserialization_error(self, key, value, e)
 
             setattr(self, key, value)
 
+    def _defer_properties(self, obj):
+        mappings = self._schema.mappings
+
+        # retain a copy of the message keyed by serialization name for _load_property,
+        # so later changes to obj don't affect properties which weren't read yet
+        source = None
+        if mappings:
+            renamed = {name: key for key, name in six.iteritems(mappings)}
+            if any(name in obj for name in renamed):
+                source = {renamed.get(key, key): value for key, value in six.iteritems(obj)}
+        if source is None:
+            source = dict(obj)
+
+        object.__setattr__(self, '_lazy_source', source)
+
+        # properties which define __set__ are never read through _load_property
+        for name, inst in self._schema.managed:
+            value = source.get(inst.name, _MISSING)
+            if value is not _MISSING:
+                if value is not None:
+                    try:
+                        value = inst.deserialize(value)
+                    except Exception as e:
+                        raise _deserialization_error(self, name, value, e)
+                setattr(self, name, value)
+
+        if not _discards_undefined(type(self)):
+            self._populate_undefined(obj)
+
+    def _load_property(self, inst):
+        ''' Deserialize a property retained by a lazy contract and cache it '''
+
+        name = self._schema.mappings.get(inst.name, inst.name)
+        if inst.name not in self._lazy_source:
+            return self._schema.defaults[name]
+
+        value = self._lazy_source[inst.name]
+        if value is not None:
+            try:
+                value = inst.deserialize(value)
+            except Exception as e:
+                raise _deserialization_error(self, name, value, e)
+
+        inst.validate(value)
+        object.__setattr__(self, name, value)
+        return value
+
+    def _populate_undefined(self, obj):
+        properties = self._schema.properties
+        mappings = self._schema.mappings
+
+        for key, value in six.iteritems(obj):
+            if key not in properties and key not in mappings:
+                self._undefined_attribute(key, value)
+
+    def _undefined_attribute(self, key, value):
+        if not self._ignore_undefined_attributes:
+            raise LazyContractValidationError(
+                    LazyContractValidationError.INVALID_ATTR_FMT.format(
+                            type(self).__name__, key))
+
     def __iter_properties(self):
-        for name, prop in six.iteritems(self._properties):
+        for name, prop in six.iteritems(self._schema.properties):
             yield name, prop, getattr(self, name)
 
     def __eq__(self, other):
@@ -183,6 +702,28 @@ class LazyContract(object):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __copy__(self):
+        cls = type(self)
+        state, restore = _state_functions(cls)
+        values, extras = state(self)
+        return restore(values, dict(extras) if extras else None)
+
+    def __deepcopy__(self, memo):
+        # only values which may be mutable, such as contracts and containers, are copied
+        cls = type(self)
+        state, restore = _state_functions(cls)
+        values, extras = state(self)
+        values = tuple(value if type(value) in _IMMUTABLE_TYPES else copy.deepcopy(value, memo)
+                       for value in values)
+        result = restore(values, copy.deepcopy(extras, memo) if extras else None)
+        memo[id(self)] = result
+        return result
+
+    def __reduce__(self):
+        # pickle the class and the values in schema order, restored without __init__
+        cls = type(self)
+        return (_restore_contract, (cls,) + _state_functions(cls)[0](self))
+
     def to_dict(self):
         ''' Serialize the contract object into a Python dictionary '''
 
@@ -191,30 +732,99 @@ class LazyContract(object):
                 if not prop.name.startswith('_') and
                 (value is not None or not prop.exclude_if_none)}
 
+    def to_json(self):
+        ''' Serialize the contract object into a compact JSON string '''
+
+        from .codecs import json
+        return json.dumps(self)
+
+    def dump(self, fp):
+        ''' Serialize the contract object as compact JSON to a file-like object '''
+
+        from .codecs import json
+        json.dump(self, fp)
+
+    @classmethod
+    def from_json(cls, text):
+        ''' Deserialize a contract from a JSON object in a string or UTF-8 bytes '''
+
+        from .codecs import json
+        return json.loads(cls, text)
+
+    def to_bytes(self):
+        ''' Serialize the contract object with the compact binary encoding '''
+
+        from .codecs import binary
+        return binary.dumps(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        ''' Deserialize a contract from the compact binary encoding in a bytes-like object.
+            See lazycontract.codecs.binary.
+        '''
+
+        from .codecs import binary
+        return binary.loads(cls, data)
+
+    @classmethod
+    def from_dicts(cls, objs):
+        ''' Deserialize an iterable of dicts into a list of contracts.
+            Equivalent to [cls(obj) for obj in objs] for classes which don't
+            override __init__, with the handling of each property unrolled
+            in a loop generated once per class.
+        '''
+
+        from_dicts = _batch_function(cls)
+        if from_dicts is not None:
+            return from_dicts(objs)
+        elif _overrides_init(cls):
+            return [cls(obj) for obj in objs]
+
+        new = cls.__new__
+        check_required = cls._check_required
+        populate = cls._defer_properties if cls._lazy else cls._populate_properties
+        required = [_message_keys(name, inst) for name, inst in cls._schema.required]
+
+        result = []
+        append = result.append
+        for obj in objs:
+            contract = new(cls)
+            for keys in required:
+                if all(key not in obj for key in keys):
+                    check_required(contract, obj)
+            populate(contract, obj)
+            append(contract)
+
+        return result
+
+    @classmethod
+    def to_dicts(cls, contracts):
+        ''' Serialize an iterable of contracts into a list of dicts '''
+
+        to_dict = cls.to_dict
+        return [to_dict(contract) if type(contract) is cls else contract.to_dict()
+                for contract in contracts]
+
     @classmethod
     def contract_properties(cls):
-        for name, inst in six.iteritems(cls.__dict__):
-            if isinstance(inst, LazyProperty):
-                yield name, inst
+        return _declared_properties(cls)
 
 
 class StrictContract(LazyContract):
     ''' Variant of LazyContract does not allow undefined attributes
     '''
 
+    __slots__ = ()
+
     _ignore_undefined_attributes = False
 
 
 class DynamicContract(LazyContract):
     ''' Variant of LazyContract that deserializes undeclared attributes '''
 
-    def _populate_properties(self, obj):
-        contained = {k: v for k, v in six.iteritems(obj) \
-                     if k in self._properties or k in self._mappings}
-        super(DynamicContract, self)._populate_properties(contained)
+    __slots__ = ('__dict__',)  # undeclared attributes
 
-        for key, value in six.iteritems(obj):
-            if key not in self._properties and key not in self._mappings:
-                # ignore non-ascii keys in python2
-                if not six.PY2 or IDENTIFIER_RE.match(key):
-                    setattr(self, key, value)
+    def _undefined_attribute(self, key, value):
+        # ignore non-ascii keys in python2
+        if not six.PY2 or IDENTIFIER_RE.match(key):
+            setattr(self, key, value)
@@ -0,0 +1,57 @@
+''' Deserialize large batches of dicts into contracts in worker processes.
+
+    Workers return each contract as the tuple of its property values in
+    schema order rather than pickling the contract, and the contracts are
+    rebuilt from the values without being validated again.
+'''
+
+from __future__ import absolute_import
+
+from .contract import LazyContract, _contract_state, _restore_contract
+
+import itertools
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:  # python 2 without the futures backport
+    ProcessPoolExecutor = None
+
+
+def _deserialize_chunk(cls, objs):
+    return [_contract_state(contract) for contract in cls.from_dicts(objs)]
+
+
+def _chunks(objs, chunk_size):
+    for start in range(0, len(objs), chunk_size):
+        yield objs[start:start + chunk_size]
+
+
+def deserialize_many(cls, objs, workers=None, chunk_size=1000, executor=None):
+    ''' Deserialize dicts into a list of contracts, like cls.from_dicts(objs),
+        in chunks deserialized in parallel by worker processes. Properties of
+        lazy contracts are deserialized by the workers.
+        cls (class):         LazyContract-derived class, importable by the workers
+        objs (iterable):     dicts to deserialize
+        workers (int):       number of worker processes, by default the number of
+                             CPUs; 1 deserializes in this process
+        chunk_size (int):    number of dicts sent to a worker at once
+        executor (Executor): concurrent.futures executor to use instead of a new
+                             ProcessPoolExecutor with workers processes
+    '''
+
+    assert issubclass(cls, LazyContract)
+    objs = list(objs)
+
+    if executor is None:
+        if ProcessPoolExecutor is None or workers == 1 or len(objs) <= chunk_size:
+            return cls.from_dicts(objs)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return deserialize_many(cls, objs, chunk_size=chunk_size, executor=executor)
+
+    result = []
+    append = result.append
+    for states in executor.map(_deserialize_chunk, itertools.repeat(cls),
+                               _chunks(objs, chunk_size)):
+        for values, extras in states:
+            append(_restore_contract(cls, values, extras))
+    return result
@@ -1,6 +1,6 @@
 from __future__ import absolute_import
 
-from .contract import LazyProperty, LazyContract
+from .contract import LazyProperty, LazyContract, LazyContractError
 
 import six
 
@@ -28,6 +28,18 @@ class IntegerProperty(LazyProperty):
 
     _type = six.integer_types
 
+    def __init__(self, *args, **kwargs):
+        ''' Create an IntegerProperty.
+            width (int): optional size in bytes (1, 2, 4 or 8) of the signed
+                         integer in fixed-width layouts, see lazycontract.records
+        '''
+
+        width = kwargs.pop('width', None)
+        if width not in (None, 1, 2, 4, 8):
+            raise LazyContractError('width must be 1, 2, 4 or 8')
+        super(IntegerProperty, self).__init__(*args, **kwargs)
+        self.width = width
+
     def deserialize(self, obj):
         return obj if isinstance(obj, self._type) else int(obj)
 
@@ -0,0 +1,260 @@
+''' Fixed-width records of contracts made only of fixed-size properties.
+
+    Records are packed with struct into a shared buffer, such as a bytearray
+    or an mmap, and read through views of memoryview slices of the buffer
+    which unpack each property when it's accessed, so no per-record dict
+    or contract exists. A record starts with a bitmap of its properties
+    whose value isn't None followed by the value of each property, in
+    schema order:
+
+     * IntegerProperty with a width: signed little-endian integer of width bytes
+     * FloatProperty: little-endian double
+     * BooleanProperty: one byte
+     * UUIDProperty: 16 bytes
+'''
+
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError, LazyContractValidationError, \
+    _manages_assignment
+from .properties import IntegerProperty, FloatProperty, BooleanProperty
+from .extra import UUIDProperty
+
+import six
+import struct
+import uuid
+import weakref
+
+
+_layouts = weakref.WeakKeyDictionary()  # _Layout by contract class
+
+_BYTE = struct.Struct('<B')
+
+# struct format of signed integers by width in bytes
+_INTEGER_FORMATS = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+
+# (property class, struct format, value of absent properties) of other fixed-size properties
+_FORMATS = ((FloatProperty, 'd', 0.0), (BooleanProperty, '?', False), (UUIDProperty, '16s', b''))
+
+
+def _format(cls, name, inst):
+    ''' (struct format, value of absent properties) of a property '''
+
+    if isinstance(inst, IntegerProperty) and inst._type is IntegerProperty._type:
+        if inst.width is None:
+            raise LazyContractError('{}.{} must declare a width for fixed-width records'.format(
+                    cls.__name__, name))
+        return _INTEGER_FORMATS[inst.width], 0
+    for kind, fmt, zero in _FORMATS:
+        if isinstance(inst, kind) and inst._type is kind._type:
+            return fmt, zero
+    raise LazyContractError('{}.{} is not a fixed-size property'.format(cls.__name__, name))
+
+
+def _invalid_record(cls, e):
+    return LazyContractValidationError('invalid {} record: {}'.format(cls.__name__, e))
+
+
+class _Field(object):
+    ''' Descriptor reading and writing a property of record views in place '''
+
+    def __init__(self, cls, name, inst, index, offset, fmt):
+        self.cls = cls
+        self.name = name
+        self.inst = inst
+        self.offset = offset
+        self._byte = index >> 3
+        self._mask = 1 << (index & 7)
+        self._struct = struct.Struct('<' + fmt)
+        self._uuid = inst._type is uuid.UUID
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        data = obj._data
+        if not six.indexbytes(data, self._byte) & self._mask:
+            return None
+        value = self._struct.unpack_from(data, self.offset)[0]
+        return uuid.UUID(bytes=value) if self._uuid else value
+
+    def __set__(self, obj, value):
+        self.inst.validate(value)
+        data = obj._data
+        flags = six.indexbytes(data, self._byte)
+        if value is None:
+            _BYTE.pack_into(data, self._byte, flags & ~self._mask)
+            return
+        try:
+            self._struct.pack_into(data, self.offset, value.bytes if self._uuid else value)
+        except struct.error as e:
+            raise _invalid_record(self.cls, e)
+        _BYTE.pack_into(data, self._byte, flags | self._mask)
+
+
+class RecordView(object):
+    ''' Lightweight view of a fixed-width record in a buffer which reads and
+        writes property values in place like the corresponding contract.
+    '''
+
+    __slots__ = ('_data',)
+
+    _contract = None  # contract class of the records
+    _fields = ()      # _Field of each property
+
+    def __init__(self, data):
+        ''' Create a RecordView.
+            data (memoryview): the bytes of the record
+        '''
+
+        self._data = data
+
+    def __repr__(self):
+        return '{}({})'.format(
+            self._contract.__name__,
+            ', '.join('{}={}'.format(field.name, repr(getattr(self, field.name)))
+                      for field in self._fields))
+
+    def __eq__(self, other):
+        if isinstance(other, (RecordView, self._contract)):
+            return all(getattr(self, field.name) == getattr(other, field.name)
+                       for field in self._fields)
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def to_dict(self):
+        ''' Serialize the record into a Python dictionary '''
+
+        result = dict()
+        for field in self._fields:
+            value = getattr(self, field.name)
+            prop = field.inst
+            if not prop.name.startswith('_') and (value is not None or not prop.exclude_if_none):
+                result[prop.name] = prop.serialize(value)
+        return result
+
+    def to_contract(self):
+        ''' Materialize the record as a contract '''
+
+        contract = self._contract.__new__(self._contract)
+        for field in self._fields:
+            setattr(contract, field.name, getattr(self, field.name))
+        return contract
+
+
+class _Layout(object):
+    ''' struct layout and view class of the records of a contract class '''
+
+    def __init__(self, cls):
+        fields = [(name, inst) for name, inst in six.iteritems(cls._schema.properties)
+                  if not _manages_assignment(inst)]
+        formats = [_format(cls, name, inst) for name, inst in fields]
+        self.flags = (len(fields) + 7) // 8
+        self.struct = struct.Struct('<{}s{}'.format(self.flags, ''.join(fmt for fmt, _ in formats)))
+        self.zeros = [zero for _, zero in formats]
+        self.cls = cls
+
+        self.fields = []
+        offset = self.flags
+        for index, ((name, inst), (fmt, _)) in enumerate(zip(fields, formats)):
+            self.fields.append(_Field(cls, name, inst, index, offset, fmt))
+            offset += struct.calcsize('<' + fmt)
+
+        attrs = dict((field.name, field) for field in self.fields)
+        attrs.update(__slots__=(), _contract=cls, _fields=tuple(self.fields))
+        self.view = type(cls.__name__ + 'Record', (RecordView,), attrs)
+
+    def pack_into(self, buffer, offset, obj):
+        ''' Pack a contract, or another record view, into buffer at offset '''
+
+        values = list(self.zeros)
+        bits = 0
+        for i, field in enumerate(self.fields):
+            value = getattr(obj, field.name)
+            if value is not None:
+                bits |= 1 << i
+                values[i] = value.bytes if field._uuid else value
+        flags = bytes(bytearray((bits >> shift) & 0xff for shift in range(0, self.flags * 8, 8)))
+        try:
+            self.struct.pack_into(buffer, offset, flags, *values)
+        except struct.error as e:
+            raise _invalid_record(self.cls, e)
+
+
+def _layout(cls):
+    assert issubclass(cls, LazyContract)
+    layout = _layouts.get(cls)
+    if layout is None:
+        layout = _layouts[cls] = _Layout(cls)
+    return layout
+
+
+def record_size(cls):
+    ''' Size in bytes of the fixed-width records of a contract class.
+        Raises LazyContractError if it has properties which aren't fixed-size.
+    '''
+
+    return _layout(cls).struct.size
+
+
+def pack(cls, objs):
+    ''' Pack contracts, record views or dicts to deserialize into a bytearray of records '''
+
+    layout = _layout(cls)
+    objs = [obj if isinstance(obj, (cls, RecordView)) else cls(obj) for obj in objs]
+    buffer = bytearray(layout.struct.size * len(objs))
+    for i, obj in enumerate(objs):
+        layout.pack_into(buffer, i * layout.struct.size, obj)
+    return buffer
+
+
+class StructRecords(object):
+    ''' Sequence of views of the fixed-width records of a contract class in a buffer '''
+
+    def __init__(self, contract, buffer):
+        ''' Create a StructRecords.
+            contract (class): LazyContract-derived class of the records
+            buffer (buffer):  bytes, bytearray, mmap or other object supporting the
+                              buffer protocol holding whole records, as made by pack;
+                              records are only writable if the buffer is
+        '''
+
+        self.contract = contract
+        self.buffer = buffer
+        self._layout = _layout(contract)
+        self._size = self._layout.struct.size
+        self._data = memoryview(buffer)
+        if len(self._data) % self._size:
+            raise LazyContractError('buffer of {} bytes does not hold whole {}-byte records'.format(
+                    len(self._data), self._size))
+
+    def __len__(self):
+        return len(self._data) // self._size
+
+    def __getitem__(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('record index out of range')
+        offset = index * self._size
+        return self._layout.view(self._data[offset:offset + self._size])
+
+    def __iter__(self):
+        view = self._layout.view
+        size = self._size
+        data = self._data
+        for offset in six.moves.range(0, len(data), size):
+            yield view(data[offset:offset + size])
+
+    def to_contracts(self):
+        ''' Materialize the records as a list of contracts '''
+
+        return [record.to_contract() for record in self]
+
+    def to_dicts(self):
+        ''' Serialize the records into a list of dicts '''
+
+        return [record.to_dict() for record in self]
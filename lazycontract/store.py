@@ -0,0 +1,268 @@
+''' Append-only store of contracts in a memory-mapped file.
+
+    The data file starts with the magic bytes and the fingerprint of the
+    contract's schema, followed by the records in the binary encoding of
+    lazycontract.codecs.binary. The index file holds the offset and size of
+    each record as fixed-width entries, so a record is found by position
+    without reading the others. When the store declares a key property,
+    the keys file holds the binary encoding of each record's key, from which
+    the mapping of keys to positions is built the first time it's needed.
+
+    Records beyond the last entry of the index, such as those of a process
+    which stopped while appending, are discarded when the store is opened.
+'''
+
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .container import schema_fingerprint
+from .codecs import binary
+
+import mmap
+import os
+import six
+import struct
+
+
+MAGIC = b'LZS\x01'
+
+_HEADER_SIZE = len(MAGIC) + 8
+
+_ENTRY = struct.Struct('<QI')  # offset and size of a record
+
+
+def _open(path, readonly):
+    if readonly:
+        return open(path, 'rb')
+    return open(path, 'r+b' if os.path.exists(path) else 'w+b')
+
+
+def _size(fileobj):
+    fileobj.seek(0, 2)
+    return fileobj.tell()
+
+
+class MMapStore(object):
+    ''' Contracts of a single class appended to files which are memory-mapped
+        to read them by position or by the value of a key property.
+    '''
+
+    def __init__(self, path, contract, key=None, readonly=False, check_schema=True):
+        ''' Open or create a MMapStore.
+            path (string):       path of the data file; the index and keys files
+                                 are path + '.idx' and path + '.keys'
+            contract (class):    LazyContract-derived class of the records
+            key (string):        attribute name of the property identifying records;
+                                 later records replace earlier ones with the same key
+            readonly (bool):     open existing files for reading only
+            check_schema (bool): raise LazyContractError if the store was written
+                                 for a contract with different properties
+        '''
+
+        assert issubclass(contract, LazyContract)
+        if key is not None and key not in contract._schema.properties:
+            raise LazyContractError('{} has no property {}'.format(contract.__name__, key))
+
+        self.path = path
+        self.contract = contract
+        self.key = key
+        self.readonly = readonly
+        self._data = self._data_map = None
+        self._index = self._index_map = None
+        self._keys = None
+        self._positions = None
+
+        self._data = _open(path, readonly)
+        try:
+            self._index = _open(path + '.idx', readonly)
+            if key is not None:
+                self._keys = _open(path + '.keys', readonly)
+            self._open_files(check_schema)
+        except Exception:
+            self.close()
+            raise
+
+    def _open_files(self, check_schema):
+        fingerprint = schema_fingerprint(self.contract)
+        size = _size(self._data)
+        if not size and not self.readonly:
+            self._data.write(MAGIC + fingerprint)
+            size = _HEADER_SIZE
+
+        self._data.seek(0)
+        header = self._data.read(_HEADER_SIZE)
+        if header[:len(MAGIC)] != MAGIC or len(header) != _HEADER_SIZE:
+            raise LazyContractError('not a store file: {}'.format(self.path))
+        if check_schema and header[len(MAGIC):] != fingerprint:
+            raise LazyContractError('store schema does not match {}'.format(
+                    self.contract.__name__))
+
+        self._length = _size(self._index) // _ENTRY.size
+        self._map()
+        self._end = _HEADER_SIZE
+        if self._length:
+            offset, length = _ENTRY.unpack_from(self._index_map, (self._length - 1) * _ENTRY.size)
+            self._end = offset + length
+        if self._end > size:
+            raise LazyContractError('truncated store file: {}'.format(self.path))
+
+        if not self.readonly:
+            # discard what was written after the last complete record
+            self._unmap()
+            self._data.truncate(self._end)
+            self._index.truncate(self._length * _ENTRY.size)
+            if self._keys is not None:
+                self._load_keys()
+                self._keys.truncate(self._keys_end)
+            self._map()
+
+    def _map(self):
+        ''' Map the data and index files, which must be flushed '''
+
+        self._data_map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_map = mmap.mmap(self._index.fileno(), 0, access=mmap.ACCESS_READ) \
+            if self._length else b''
+
+    def _unmap(self):
+        for name in ('_data_map', '_index_map'):
+            mapped = getattr(self, name)
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+            setattr(self, name, None)
+
+    def _load_keys(self):
+        ''' Build the positions of the keys of the indexed records '''
+
+        read = binary.value_codec(self.contract._schema.properties[self.key])[1]
+        self._keys.seek(0)
+        data = self._keys.read()
+        if six.PY2 or not isinstance(data, bytes):
+            data = bytearray(data)
+
+        positions = dict()
+        index = 0
+        try:
+            for position in six.moves.range(self._length):
+                key, index = read(data, index)
+                positions[key] = position
+        except (IndexError, struct.error):
+            raise LazyContractError('truncated keys file: {}.keys'.format(self.path))
+        self._positions = positions
+        self._keys_end = index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        ''' Contract at a position, in the order they were appended '''
+
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError('store position out of range')
+
+        if self._index_map is None or len(self._index_map) < (position + 1) * _ENTRY.size:
+            self.flush()
+        offset, length = _ENTRY.unpack_from(self._index_map, position * _ENTRY.size)
+        return binary.loads(self.contract, self._data_map[offset:offset + length])
+
+    def __iter__(self):
+        for position in six.moves.range(self._length):
+            yield self[position]
+
+    def __contains__(self, key):
+        return key in self.positions()
+
+    def positions(self):
+        ''' Dict of the position of the latest record with each key '''
+
+        if self.key is None:
+            raise LazyContractError('store has no key property')
+        if self._positions is None:
+            self._load_keys()
+        return self._positions
+
+    def get(self, key, default=None):
+        ''' Latest contract with a key, or default '''
+
+        position = self.positions().get(key)
+        return default if position is None else self[position]
+
+    def append(self, contract):
+        ''' Append a contract and return its position '''
+
+        self.extend((contract,))
+        return self._length - 1
+
+    def extend(self, contracts):
+        ''' Append contracts '''
+
+        if self.readonly:
+            raise LazyContractError('store is read-only')
+
+        encode = binary.contract_encoder(self.contract)
+        if self.key is not None:
+            write_key = binary.value_codec(self.contract._schema.properties[self.key])[0]
+            positions = self.positions()
+
+        data = bytearray()
+        entries = bytearray()
+        keys = bytearray()
+        new_keys = []
+        for contract in contracts:
+            assert isinstance(contract, self.contract)
+            start = len(data)
+            encode(data, contract)
+            entries += _ENTRY.pack(self._end + start, len(data) - start)
+            if self.key is not None:
+                key = getattr(contract, self.key)
+                if key is None:
+                    raise LazyContractError('{}.{} key must not be None'.format(
+                            self.contract.__name__, self.key))
+                write_key(keys, key)
+                new_keys.append(key)
+
+        self._data.seek(0, 2)
+        self._data.write(bytes(data))
+        if self._keys is not None:
+            self._keys.seek(0, 2)
+            self._keys.write(bytes(keys))
+        # the index entries are written last so only records whose data and key
+        # are complete are indexed
+        self._data.flush()
+        if self._keys is not None:
+            self._keys.flush()
+        self._index.seek(0, 2)
+        self._index.write(bytes(entries))
+
+        for i, key in enumerate(new_keys):
+            positions[key] = self._length + i
+        self._length += len(entries) // _ENTRY.size
+        self._end += len(data)
+
+    def flush(self):
+        ''' Write appended records to disk and map them for reading '''
+
+        for fileobj in (self._data, self._index, self._keys):
+            if fileobj is not None and not self.readonly:
+                fileobj.flush()
+        self._unmap()
+        self._map()
+
+    def close(self):
+        ''' Flush and close the files '''
+
+        self._unmap()
+        for name in ('_data', '_index', '_keys'):
+            fileobj = getattr(self, name)
+            if fileobj is not None:
+                if not self.readonly:
+                    fileobj.flush()
+                fileobj.close()
+            setattr(self, name, None)
@@ -0,0 +1,533 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .codecs import binary
+
+import codecs
+import json
+import re
+import six
+import struct
+
+
+ON_ERROR = ('raise', 'skip', 'collect')
+MISSING = ('none', 'raise')
+
+
+class LazyContractStreamError(LazyContractError):
+    ''' Exception reading a contract from a stream '''
+
+    FMT = 'failed to read {} from line {} due to: {}'
+    ELEMENT_FMT = 'failed to read {} from element {} due to: {}'
+    OFFSET_FMT = 'failed to read {} from offset {} due to: {}'
+    SYNTAX_FMT = 'expected {} at offset {}'
+
+    def __init__(self, message, line_number=None, line=None, cause=None):
+        super(LazyContractStreamError, self).__init__(message)
+        self.line_number = line_number
+        self.line = line
+        self.cause = cause
+
+
+def _iter_lines(fileobj, chunk_size):
+    ''' Yield (line number, line) for non-blank lines read in chunks of chunk_size '''
+
+    pieces = []  # of the line continued by the next chunk, joined once it ends
+    line_number = 0
+
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+
+        newline = b'\n' if isinstance(chunk, bytes) else u'\n'
+        if newline not in chunk:
+            pieces.append(chunk)
+            continue
+
+        lines = chunk.split(newline)
+        if pieces:
+            pieces.append(lines[0])
+            lines[0] = chunk[:0].join(pieces)
+        pieces = [lines.pop()]
+
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+
+    remainder = pieces[0][:0].join(pieces) if pieces else None
+    if remainder is not None and remainder.strip():
+        yield line_number + 1, remainder
+
+
+def read_jsonl(fileobj, contract, batch_size=None, on_error='raise', errors=None,
+               chunk_size=65536):
+    ''' Read contracts from a JSON Lines file, one per line.
+        fileobj (file):      text or binary file to read from
+        contract (class):    LazyContract-derived class of each line
+        batch_size (int):    yield lists of up to batch_size contracts instead of contracts
+        on_error (string):   'raise' a LazyContractStreamError for invalid lines,
+                             'skip' them, or 'collect' the errors into errors
+        errors (list):       receives a LazyContractStreamError per invalid line
+        chunk_size (int):    number of bytes or characters read from fileobj at once
+    '''
+
+    assert issubclass(contract, LazyContract)
+    if on_error not in ON_ERROR:
+        raise LazyContractError('on_error must be one of {}'.format(', '.join(ON_ERROR)))
+    if on_error == 'collect' and errors is None:
+        raise LazyContractError('errors list required to collect errors')
+
+    def fail(line_number, line, e):
+        error = LazyContractStreamError(
+                LazyContractStreamError.FMT.format(contract.__name__, line_number, e),
+                line_number, line, e)
+        if on_error == 'raise':
+            six.raise_from(error, e)
+        elif on_error == 'collect':
+            errors.append(error)
+
+    def parse(lines):
+        # yields (line number, line, dict, parse error)
+        for line_number, line in lines:
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                yield line_number, line, json.loads(line), None
+            except ValueError as e:
+                yield line_number, line, None, e
+
+    def deserialize(batch):
+        if not any(error for _, _, _, error in batch):
+            try:
+                return contract.from_dicts(obj for _, _, obj, _ in batch)
+            except Exception:
+                pass
+
+        # attribute errors to individual lines
+        result = []
+        for line_number, line, obj, error in batch:
+            try:
+                if error is not None:
+                    raise error
+                result.append(contract(obj))
+            except Exception as e:
+                fail(line_number, line, e)
+        return result
+
+    parsed = parse(_iter_lines(fileobj, chunk_size))
+
+    if batch_size is None:
+        for item in parsed:
+            for instance in deserialize([item]):
+                yield instance
+        return
+
+    batch = []
+    for item in parsed:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            contracts = deserialize(batch)
+            if contracts:
+                yield contracts
+            batch = []
+
+    if batch:
+        contracts = deserialize(batch)
+        if contracts:
+            yield contracts
+
+
+def _iter_line_offsets(fileobj, chunk_size):
+    ''' Yield (line number, byte offset, line) for non-blank lines of a binary
+        file read in chunks of chunk_size, without their line break
+    '''
+
+    pieces = []  # of the line continued by the next chunk, joined once it ends
+    offset = 0  # of the line continued by the next chunk
+    line_number = 0
+
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+
+        if b'\n' not in chunk:
+            pieces.append(chunk)
+            continue
+
+        lines = chunk.split(b'\n')
+        if pieces:
+            pieces.append(lines[0])
+            lines[0] = b''.join(pieces)
+        pieces = [lines.pop()]
+
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, offset, line
+            offset += len(line) + 1
+
+    remainder = b''.join(pieces)
+    if remainder.strip():
+        yield line_number + 1, offset, remainder
+
+
+class JSONLIndex(object):
+    ''' Byte offset and length of the line holding each value of a key
+        property in a JSON Lines file, to read lines by key without scanning
+        the file. Later lines replace earlier ones with the same key.
+
+        Indexes are saved as the magic bytes followed by the binary encoding
+        of each key, see lazycontract.codecs.binary, and varints of the
+        offset and length of its line.
+    '''
+
+    MAGIC = b'LZJI\x01'
+
+    def __init__(self, contract, key, entries=None):
+        ''' Create a JSONLIndex.
+            contract (class): LazyContract-derived class of each line
+            key (string):     attribute name of the property identifying lines
+            entries (dict):   (offset, length) of the line by key
+        '''
+
+        assert issubclass(contract, LazyContract)
+        if key not in contract._schema.properties:
+            raise LazyContractError('{} has no property {}'.format(contract.__name__, key))
+
+        self.contract = contract
+        self.key = key
+        self.entries = dict() if entries is None else entries
+        self._property = contract._schema.properties[key]
+
+    @classmethod
+    def build(cls, fileobj, contract, key, chunk_size=65536):
+        ''' Index the lines of a JSON Lines file. Lines without a key are not indexed.
+            fileobj (file):      binary file to read from
+            contract (class):    LazyContract-derived class of each line
+            key (string):        attribute name of the property identifying lines
+            chunk_size (int):    number of bytes read from fileobj at once
+        '''
+
+        index = cls(contract, key)
+        inst = index._property
+        entries = index.entries
+
+        for line_number, offset, line in _iter_line_offsets(fileobj, chunk_size):
+            try:
+                value = json.loads(line.decode('utf-8')).get(inst.name)
+                if value is not None:
+                    entries[index._normalize(value)] = (offset, len(line))
+            except Exception as e:
+                six.raise_from(LazyContractStreamError(
+                        LazyContractStreamError.FMT.format(contract.__name__, line_number, e),
+                        line_number, line, e), e)
+
+        return index
+
+    @classmethod
+    def load(cls, fileobj, contract, key):
+        ''' Read an index saved by save from a binary file '''
+
+        data = fileobj.read()
+        if six.PY2 or not isinstance(data, bytes):
+            data = bytearray(data)
+        if bytes(data[:len(cls.MAGIC)]) != cls.MAGIC:
+            raise LazyContractError('not a JSON Lines index')
+
+        index = cls(contract, key)
+        read = binary.value_codec(index._property)[1]
+        read_varint = binary.read_varint
+        entries = index.entries
+        position = len(cls.MAGIC)
+        try:
+            while position < len(data):
+                value, position = read(data, position)
+                offset, position = read_varint(data, position)
+                length, position = read_varint(data, position)
+                entries[value] = (offset, length)
+        except (IndexError, struct.error):
+            raise LazyContractError('truncated JSON Lines index')
+
+        return index
+
+    def save(self, fileobj):
+        ''' Write the index to a binary file '''
+
+        write = binary.value_codec(self._property)[0]
+        write_varint = binary.write_varint
+        out = bytearray(self.MAGIC)
+        for value, (offset, length) in six.iteritems(self.entries):
+            write(out, value)
+            write_varint(out, offset)
+            write_varint(out, length)
+        fileobj.write(bytes(out))
+
+    def _normalize(self, value):
+        inst = self._property
+        return value if isinstance(value, inst._type) else inst.deserialize(value)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, value):
+        return self._normalize(value) in self.entries
+
+    def read(self, fileobj, value):
+        ''' Contract of the line with a key from the indexed binary file.
+            Raises KeyError if no line has the key.
+        '''
+
+        return self.read_many(fileobj, (value,), missing='raise')[0]
+
+    def read_many(self, fileobj, values, missing='none'):
+        ''' Contracts of the lines with keys from the indexed binary file, in the
+            order of values. Lines are read in the order they appear in the file.
+            missing (string): return 'none' for keys no line has, or 'raise' KeyError
+        '''
+
+        if missing not in MISSING:
+            raise LazyContractError('missing must be one of {}'.format(', '.join(MISSING)))
+        values = [self._normalize(value) for value in values]
+        entries = self.entries
+        if missing == 'raise':
+            for value in values:
+                if value not in entries:
+                    raise KeyError(value)
+
+        contracts = dict()
+        for offset, length in sorted(set(entries[value] for value in values if value in entries)):
+            fileobj.seek(offset)
+            line = fileobj.read(length)
+            try:
+                contracts[offset] = self.contract(json.loads(line.decode('utf-8')))
+            except Exception as e:
+                six.raise_from(LazyContractStreamError(
+                        LazyContractStreamError.OFFSET_FMT.format(self.contract.__name__, offset, e),
+                        line=line, cause=e), e)
+
+        return [contracts[entries[value][0]] if value in entries else None for value in values]
+
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+_SCALAR_END_RE = re.compile(r'[ \t\n\r,:\]}]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+_CONTAINER_SPECIAL_RE = re.compile(r'["\[\]{}]')
+
+
+class JSONValueScanner(object):
+    ''' Finds the end of a JSON value by matching brackets and quotes without
+        decoding it. scan() may be called repeatedly as more text is available.
+    '''
+
+    __slots__ = ('_kind', '_depth', '_in_string', '_escape')
+
+    def __init__(self):
+        self._kind = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def scan(self, text, index):
+        ''' Scan text from index, which must be where the previous call left off.
+            Returns the index after the end of the value or None if text ends first.
+        '''
+
+        if self._kind is None:
+            if index >= len(text):
+                return None
+            char = text[index]
+            if char == '"':
+                self._kind = 'container'
+                self._in_string = True
+                index += 1
+            elif char in '[{':
+                self._kind = 'container'
+                self._depth = 1
+                index += 1
+            else:
+                self._kind = 'scalar'
+
+        if self._kind == 'scalar':
+            match = _SCALAR_END_RE.search(text, index)
+            return match.start() if match else None
+
+        while True:
+            if self._in_string:
+                if self._escape:
+                    if index >= len(text):
+                        return None
+                    index += 1
+                    self._escape = False
+                match = _STRING_SPECIAL_RE.search(text, index)
+                if match is None:
+                    return None
+                index = match.end()
+                if match.group() == '\\':
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    return index
+            else:
+                match = _CONTAINER_SPECIAL_RE.search(text, index)
+                if match is None:
+                    return None
+                index = match.end()
+                char = match.group()
+                if char == '"':
+                    self._in_string = True
+                elif char in '[{':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        return index
+
+    def finish(self, text):
+        ''' End of the value when no more text is available, or None '''
+
+        return len(text) if self._kind == 'scalar' else None
+
+
+class _JSONStreamReader(object):
+    ''' Tokenizes JSON from a text or binary file object with a bounded buffer '''
+
+    def __init__(self, fileobj, chunk_size):
+        self._fileobj = fileobj
+        self._chunk_size = chunk_size
+        self._decoder = None
+        self._text = u''
+        self._index = 0
+        self._offset = 0  # characters discarded from the start of _text
+
+    def _read(self):
+        chunk = self._fileobj.read(self._chunk_size)
+        while isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder('utf-8')()
+            text = self._decoder.decode(chunk, final=not chunk)
+            if text or not chunk:
+                return text
+            # incomplete multi-byte character
+            chunk = self._fileobj.read(self._chunk_size)
+        return chunk
+
+    def _fill(self):
+        chunk = self._read()
+        if not chunk:
+            return False
+
+        self._offset += self._index
+        self._text = self._text[self._index:] + chunk
+        self._index = 0
+        return True
+
+    def error(self, expected):
+        return LazyContractStreamError(LazyContractStreamError.SYNTAX_FMT.format(
+                expected, self._offset + self._index))
+
+    def peek(self):
+        ''' Skip whitespace and return the next character, or '' at the end '''
+
+        while True:
+            self._index = _WHITESPACE_RE.match(self._text, self._index).end()
+            if self._index < len(self._text):
+                return self._text[self._index]
+            elif not self._fill():
+                return u''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise self.error(' or '.join(repr(c) for c in chars))
+        self._index += 1
+        return char
+
+    def _scan(self, keep):
+        scanner = JSONValueScanner()
+        index = self._index
+        while True:
+            end = scanner.scan(self._text, index)
+            if end is not None:
+                return end
+
+            if not keep:
+                self._index = len(self._text)
+            index = len(self._text) - self._index
+            if not self._fill():
+                end = scanner.finish(self._text)
+                if end is None:
+                    raise self.error('end of value')
+                return end
+            index += self._index
+
+    def string(self):
+        if self.peek() != '"':
+            raise self.error('string')
+        end = self._scan(keep=True)
+        value = json.loads(self._text[self._index:end])
+        self._index = end
+        return value
+
+    def value(self):
+        ''' Decode the next value '''
+
+        self.peek()
+        end = self._scan(keep=True)
+        value = json.loads(self._text[self._index:end])
+        self._index = end
+        return value
+
+    def skip(self):
+        ''' Skip over the next value without decoding it '''
+
+        self.peek()
+        self._index = self._scan(keep=False)
+
+
+def read_json_array(fileobj, contract, path=(), chunk_size=65536):
+    ''' Incrementally read contracts from a JSON array of objects without
+        loading the whole document.
+        fileobj (file):      text or binary file to read from
+        contract (class):    LazyContract-derived class of each element
+        path (sequence):     keys of the objects enclosing the array, if any
+        chunk_size (int):    number of bytes or characters read from fileobj at once
+    '''
+
+    assert issubclass(contract, LazyContract)
+    reader = _JSONStreamReader(fileobj, chunk_size)
+
+    for key in path:
+        reader.expect('{')
+        while True:
+            if reader.peek() == '}':
+                raise reader.error('key {!r}'.format(key))
+            name = reader.string()
+            reader.expect(':')
+            if name == key:
+                break
+            reader.skip()
+            if reader.expect(',}') == '}':
+                raise reader.error('key {!r}'.format(key))
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+
+    element = 0
+    while True:
+        try:
+            instance = contract(reader.value())
+        except LazyContractStreamError:
+            raise
+        except Exception as e:
+            six.raise_from(LazyContractStreamError(LazyContractStreamError.ELEMENT_FMT.format(
+                    contract.__name__, element, e)), e)
+        yield instance
+
+        element += 1
+        if reader.expect(',]') == ']':
+            break
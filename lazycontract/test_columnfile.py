@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .properties import StringProperty, IntegerProperty, FloatProperty, BooleanProperty, \
+    EnumerationProperty, ListProperty
+from . import columnfile, container
+
+import io
+
+
+class RecordContract(LazyContract):
+    a = IntegerProperty()
+    b = StringProperty()
+    c = EnumerationProperty(['red', 'green', 'blue'])
+    d = FloatProperty()
+    e = BooleanProperty()
+    f = ListProperty(IntegerProperty())
+    g = StringProperty(name='_g')
+
+
+def test_columnfile():
+    records = [RecordContract(a=1000 + i * 3, b='x' * (i % 5), c=['red', 'green', 'blue'][i % 3],
+                              d=i / 4.0, e=i % 2 == 0, f=[i, -i]) for i in range(53)]
+    records[7].a = None
+    records[8].b = u'h\xe9llo'
+    records[9].d = None
+
+    for codec in ('null', 'zlib', 'lzma'):
+        if codec == 'lzma' and container.lzma is None:
+            continue
+
+        f = io.BytesIO()
+        with columnfile.ColumnFileWriter(f, RecordContract, codec=codec, row_group_rows=20) as w:
+            w.extend(records)
+
+        reader = columnfile.ColumnFileReader(f, RecordContract)
+        assert reader.codec == codec
+        assert len(reader) == 53
+        assert [g['rows'] for g in reader.row_groups] == [20, 20, 13]
+        assert reader.read() == records
+        assert reader.column('a') == [r.a for r in records]
+        assert reader.column('b') == [r.b for r in records]
+
+        # only the requested columns are read
+        columns = reader.read_columns(['a', 'c'])
+        assert columns.column('c') == [r.c for r in records]
+        assert columns.column('b') == [None] * 53
+        assert reader.read(['e'])[3] == RecordContract(e=False)
+
+    chunks = reader.row_groups[0]['columns']
+    assert chunks['a'][2] == columnfile.DELTA
+    assert chunks['b'][2] == columnfile.DICTIONARY
+    assert chunks['c'][2] == columnfile.DICTIONARY
+    assert chunks['d'][2] == columnfile.PLAIN
+    assert '_g' not in chunks
+
+
+def test_columnfile_errors():
+    f = io.BytesIO()
+    with columnfile.ColumnFileWriter(f, RecordContract) as w:
+        w.write(RecordContract(a=1))
+
+    class OtherContract(LazyContract):
+        a = StringProperty()
+
+    try:
+        columnfile.ColumnFileReader(f, OtherContract)
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
+
+    try:
+        columnfile.ColumnFileReader(io.BytesIO(f.getvalue()[:-1]), RecordContract)
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
+
+    try:
+        columnfile.ColumnFileReader(f, RecordContract).column('z')
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
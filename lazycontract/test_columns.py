@@ -0,0 +1,66 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, StrictContract, LazyContractValidationError
+from .columns import ContractColumns, _integer_typecode
+from .properties import StringProperty, IntegerProperty, FloatProperty, BooleanProperty
+
+import array
+
+
+def test_columns():
+    class TestContract(LazyContract):
+        a = StringProperty()
+        b = IntegerProperty(name='x')
+        c = FloatProperty(default=1.5)
+        d = BooleanProperty()
+
+    messages = [dict(a='foo', x='1', c=2.5, d='true'),
+                dict(a='bar', b=2, d=False, y='ignored')]
+    columns = ContractColumns(TestContract, messages)
+
+    assert len(columns) == 2
+    assert type(columns.columns['b']) == array.array
+    assert type(columns.columns['c']) == array.array
+    assert columns.column('b') == array.array(_integer_typecode(), [1, 2])
+    assert columns.column('d') == [True, False]
+    assert columns.column('a') == ['foo', 'bar']
+
+    row = columns[1]
+    assert row.a == 'bar'
+    assert row.b == 2
+    assert row.x == 2
+    assert row.c == 1.5
+    assert row.d is False
+    assert row == TestContract(messages[1])
+    assert columns.to_dicts() == [dict(a='foo', x=1, c=2.5, d=True),
+                                  dict(a='bar', x=2, c=1.5, d=False)]
+    assert columns.to_contracts() == [TestContract(m) for m in messages]
+
+    row.b = 3
+    assert columns[-1].b == 3
+    columns.append(TestContract(a='baz'))
+    assert columns.column('b') == [1, 3, None]
+    assert columns[2].to_dict() == dict(a='baz', c=1.5)
+
+    try:
+        row.b = 'foo'
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+
+def test_strict_columns():
+    class TestContract(StrictContract):
+        a = IntegerProperty(required=True)
+
+    columns = ContractColumns(TestContract, [dict(a=1)])
+
+    for message in (dict(a=2, b=3), dict()):
+        try:
+            columns.append(message)
+            assert 'LazyContractValidationError expected' == False
+        except LazyContractValidationError:
+            pass
+
+    assert len(columns) == 1
+    assert columns.column('a') == array.array(_integer_typecode(), [1])
@@ -0,0 +1,76 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .properties import StringProperty, IntegerProperty, ListProperty, ObjectProperty
+from . import container
+
+import io
+
+
+class NestedContract(LazyContract):
+    x = IntegerProperty()
+
+
+class RecordContract(LazyContract):
+    a = IntegerProperty()
+    b = StringProperty()
+    c = ListProperty(ObjectProperty(NestedContract))
+
+
+def test_container():
+    records = [RecordContract(a=i, b='x' * (i % 7), c=[dict(x=i)]) for i in range(103)]
+
+    for codec in ('null', 'zlib', 'lzma'):
+        if codec == 'lzma' and container.lzma is None:
+            continue
+
+        f = io.BytesIO()
+        with container.ContainerWriter(f, RecordContract, codec=codec, block_records=10) as w:
+            w.extend(records[:50])
+            w.flush()
+            w.extend(records[50:])
+
+        reader = container.ContainerReader(f, RecordContract)
+        assert reader.codec == codec
+        assert list(reader) == records
+        assert [count for _, count in reader.blocks()] == [10] * 5 + [10] * 5 + [3]
+
+        # disjoint ranges read every record once
+        size = len(f.getvalue())
+        for splits in (2, 3, 7, 50):
+            bounds = [size * i // splits for i in range(splits)] + [size]
+            result = []
+            for start, end in zip(bounds, bounds[1:]):
+                result.extend(container.ContainerReader(f, RecordContract, start, end))
+            assert result == records
+
+    f = io.BytesIO()
+    container.ContainerWriter(f, RecordContract).close()
+    assert list(container.ContainerReader(f, RecordContract)) == []
+
+
+def test_container_errors():
+    f = io.BytesIO()
+    with container.ContainerWriter(f, RecordContract) as w:
+        w.write(RecordContract(a=1))
+
+    class OtherContract(LazyContract):
+        a = IntegerProperty()
+
+    data = f.getvalue()
+    for f, error in ((lambda: container.ContainerReader(io.BytesIO(data), OtherContract),
+                      LazyContractError),
+                     (lambda: list(container.ContainerReader(io.BytesIO(data[:-1]), RecordContract)),
+                      LazyContractError),
+                     (lambda: container.ContainerReader(io.BytesIO(b'{}'), RecordContract),
+                      LazyContractError),
+                     (lambda: container.ContainerWriter(io.BytesIO(), RecordContract, codec='x'),
+                      LazyContractError)):
+        try:
+            f()
+            assert '{} expected'.format(error.__name__) == False
+        except error:
+            pass
+
+    assert list(container.ContainerReader(io.BytesIO(data), OtherContract, check_schema=False)) == \
+        [OtherContract(a=1)]
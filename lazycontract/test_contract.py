@@ -1,8 +1,27 @@
 from __future__ import absolute_import
 
 from .contract import (LazyContract, StrictContract, DynamicContract, LazyContractValidationError,
-                       LazyContractDeserializationError)
-from .properties import StringProperty, IntegerProperty, FloatProperty
+                       LazyContractDeserializationError, LazyContractError)
+from .properties import StringProperty, IntegerProperty, FloatProperty, ListProperty, ObjectProperty
+from .extra import AliasProperty
+
+import copy
+import pickle
+
+from collections import OrderedDict
+
+
+class PickledContract(LazyContract):
+    a = StringProperty()
+    b = IntegerProperty(name='x', default=3)
+
+
+class PickledDynamicContract(DynamicContract):
+    _slotted = True
+    _lazy = True
+
+    a = ListProperty(ObjectProperty(PickledContract))
+    b = FloatProperty()
 
 
 def test_to_dict():
@@ -183,3 +202,374 @@ def test_equals():
     assert t1 == t2
     assert not t1 != t2
     assert t1 != t3
+
+
+def test_schema():
+    class TestContract1(LazyContract):
+        a = StringProperty(required=True)
+        b = IntegerProperty(name='x', default=3, tag=2)
+
+    class TestContract2(TestContract1):
+        c = FloatProperty(not_none=True, tag=3)
+
+    schema = TestContract2._schema
+    assert schema is not TestContract1._schema
+    assert sorted(schema.properties) == ['a', 'b', 'c']
+    assert list(schema.properties)[-1] == 'c'
+    assert dict(schema.mappings) == dict(x='b')
+    assert sorted(name for name, _ in schema.required) == ['a', 'c']
+    assert dict(schema.defaults) == dict(a=None, b=3, c=None)
+    assert dict(schema.tags) == {2: 'b', 3: 'c'}
+    assert sorted(TestContract1._schema.properties) == ['a', 'b']
+
+    class OrderedContract(TestContract1):
+        zeta = IntegerProperty()
+        alpha = IntegerProperty()
+        mu = StringProperty()
+        beta = FloatProperty()
+
+    # declaration order, whatever the order of the class __dict__
+    assert list(OrderedContract._schema.properties) == ['a', 'b', 'zeta', 'alpha', 'mu', 'beta']
+
+    try:
+        class TestContract3(TestContract2):
+            d = StringProperty(tag=2)
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
+
+    t = TestContract2(a='foo', x='4', c=1.5)
+    assert t.to_dict() == dict(a='foo', x=4, c=1.5)
+    assert '_properties' not in t.__dict__
+
+
+def test_compiled():
+    class TestContract(StrictContract):
+        _compiled = True
+
+        a = StringProperty(required=True)
+        b = IntegerProperty(name='x', default=3)
+        c = FloatProperty(exclude_if_none=False)
+        _d = StringProperty()
+
+    t = TestContract(a='foo', b='4', _d='bar')
+    assert 'def to_dict(self):' in TestContract._compiled_source
+    assert t.to_dict() == dict(a='foo', x=4, c=None)
+    assert TestContract(a='foo', x=5).b == 5
+    assert TestContract(a='foo').b == 3
+    assert t == TestContract(a='foo', x=4, _d='bar')
+
+    try:
+        TestContract(x=1)
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError as e:
+        assert 'TestContract.a is required' in str(e)
+
+    try:
+        TestContract(a='foo', y=1)
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError as e:
+        assert LazyContractValidationError.INVALID_ATTR_FMT.format(
+                'TestContract', 'y') in str(e)
+
+    try:
+        TestContract(a='foo', b='3.2')
+        assert 'expected LazyContractDeserializationError' == False
+    except LazyContractDeserializationError as e:
+        assert 'failed to deserialize TestContract.b' in str(e)
+
+    # the key which comes last wins, like in contracts which aren't compiled
+    class PlainContract(LazyContract):
+        b = IntegerProperty(name='x')
+
+    class CompiledContract(PlainContract):
+        _compiled = True
+
+    for contract in (PlainContract, CompiledContract):
+        assert contract(OrderedDict([('x', None), ('b', '5')])).b == 5
+        assert contract(OrderedDict([('b', '5'), ('x', None)])).b is None
+
+
+def test_compiled_inheritance():
+    class BaseContract(LazyContract):
+        a = StringProperty()
+
+        def __init__(self, *args, **kwargs):
+            super(BaseContract, self).__init__(*args, **kwargs)
+            self.initialized = True
+
+        def to_dict(self):
+            return dict(super(BaseContract, self).to_dict(), custom=True)
+
+    class TestContract(BaseContract):
+        _compiled = True
+
+        b = IntegerProperty()
+
+    t = TestContract(a='foo', b=1)
+    assert t.initialized
+    assert t.to_dict() == dict(a='foo', b=1, custom=True)
+    assert '__init__' not in TestContract.__dict__ and 'to_dict' not in TestContract.__dict__
+    assert getattr(TestContract._populate_properties, '_generated', False)
+
+
+def test_compiled_dynamic_contract():
+    class TestContract(DynamicContract):
+        _compiled = True
+
+        a = StringProperty()
+
+    t = TestContract(a='foo', b='bar')
+    assert t.to_dict() == dict(a='foo')
+    assert t.b == 'bar'
+
+
+def test_lazy():
+    calls = []
+
+    class CountingProperty(IntegerProperty):
+        def deserialize(self, obj):
+            calls.append(obj)
+            return super(CountingProperty, self).deserialize(obj)
+
+    class TestContract(StrictContract):
+        _lazy = True
+
+        a = CountingProperty()
+        b = CountingProperty(name='x', default=3)
+        c = CountingProperty()
+
+    t = TestContract(a='1', b='2')
+    assert calls == []
+    assert t.a == 1
+    assert t.a == 1
+    assert calls == ['1']
+    assert t.c is None
+    assert t.to_dict() == dict(a=1, x=2)
+    assert calls == ['1', '2']
+
+    t = TestContract(a='1', x='2')
+    t.a = 4
+    assert t.to_dict() == dict(a=4, x=2)
+    assert TestContract().b == 3
+
+    try:
+        TestContract(y=1)
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+    # the message is copied, so changing it doesn't change unread properties
+    obj = dict(a='1', x='2')
+    t = TestContract(obj)
+    obj['a'] = '5'
+    del obj['x']
+    assert t.a == 1 and t.b == 2
+
+    # properties which define __set__ are assigned eagerly
+    class StringAliasProperty(AliasProperty):
+        _type = str
+
+    for compiled in (False, True):
+        class AliasContract(LazyContract):
+            _lazy = True
+            _compiled = compiled
+
+            a = StringProperty()
+            b = StringAliasProperty('a')
+
+        t = AliasContract(b='v')
+        assert t.a == 'v'
+        assert t.to_dict() == dict(a='v', b='v')
+
+    t = TestContract(x='3.2')
+    try:
+        t.b
+        assert 'expected LazyContractDeserializationError' == False
+    except LazyContractDeserializationError as e:
+        assert 'failed to deserialize TestContract.b' in str(e)
+
+
+def test_validate_on_write():
+    calls = []
+
+    class CountingProperty(StringProperty):
+        def validate(self, obj):
+            calls.append(obj)
+            super(CountingProperty, self).validate(obj)
+
+    class TestContract(LazyContract):
+        a = CountingProperty(name='b')
+
+    t = TestContract(a='foo')
+    assert calls == ['foo']
+    assert t.a == 'foo'
+    assert t.to_dict() == dict(b='foo')
+    assert t == TestContract(b='foo')
+    assert calls == ['foo', 'foo']
+    assert t.__dict__ == dict(a='foo')
+
+    t.b = 'bar'
+    assert t.a == 'bar'
+    assert calls == ['foo', 'foo', 'bar']
+    assert isinstance(TestContract.a, CountingProperty)
+
+
+def test_slotted():
+    class TestContract(StrictContract):
+        _slotted = True
+
+        a = StringProperty()
+        b = IntegerProperty(name='x', default=3)
+
+    t = TestContract(a='foo')
+    assert not hasattr(t, '__dict__')
+    assert t.a == 'foo'
+    assert t.b == 3
+    assert t.to_dict() == dict(a='foo', x=3)
+    assert sorted(name for name, _ in TestContract.contract_properties()) == ['a', 'b']
+
+    t.x = 4
+    assert t.b == 4
+    try:
+        t.a = 1
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+    try:
+        t.y
+        assert 'Expected AttributeError' == False
+    except AttributeError:
+        pass
+
+
+def test_slotted_options():
+    class TestContract(DynamicContract):
+        _slotted = True
+        _compiled = True
+
+        a = StringProperty()
+        b = IntegerProperty(default=3)
+
+    class LazyTestContract(TestContract):
+        _lazy = True
+
+        c = FloatProperty()
+
+    t = TestContract(a='foo', y='bar')
+    assert t.__dict__ == dict(y='bar')
+    assert t.to_dict() == dict(a='foo', b=3)
+    assert t == TestContract(a='foo')
+
+    t = LazyTestContract(a='foo', c='1.5', y='bar')
+    assert t.__dict__ == dict(y='bar')
+    assert t.c == 1.5
+    assert t.to_dict() == dict(a='foo', b=3, c=1.5)
+
+
+def test_from_dicts():
+    class TestContract(LazyContract):
+        a = StringProperty(required=True)
+        b = IntegerProperty(name='x')
+
+    class CompiledTestContract(TestContract):
+        _compiled = True
+
+    for contract in (TestContract, CompiledTestContract):
+        messages = [dict(a='foo', x='1'), dict(a='bar', b=2), dict(a='baz')]
+        contracts = contract.from_dicts(iter(messages))
+        assert contracts == [contract(m) for m in messages]
+        assert all(type(c) is contract for c in contracts)
+        assert contract.to_dicts(contracts) == [
+                dict(a='foo', x=1), dict(a='bar', x=2), dict(a='baz')]
+
+        try:
+            contract.from_dicts([dict(a='foo'), dict(x=1)])
+            assert 'LazyContractValidationError expected' == False
+        except LazyContractValidationError as e:
+            assert 'a is required' in str(e)
+
+    class SlottedTestContract(DynamicContract):
+        _slotted = True
+
+        a = StringProperty()
+        b = IntegerProperty(name='x')
+
+    class PopulatingTestContract(TestContract):
+        def _populate_properties(self, obj):
+            super(PopulatingTestContract, self)._populate_properties(dict(obj, a='populated'))
+
+    contracts = SlottedTestContract.from_dicts([dict(a='foo', x='2', y='bar')])
+    assert contracts[0].b == 2 and contracts[0].y == 'bar'
+    assert PopulatingTestContract.from_dicts([dict(a='foo')])[0].a == 'populated'
+
+    class StrictTestContract(StrictContract):
+        a = StringProperty()
+
+    try:
+        StrictTestContract.from_dicts([dict(a='foo'), dict(y='bar')])
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+
+def test_pickle():
+    t = PickledContract(a=u'f\xf6o', x='4')
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        data = pickle.dumps(t, protocol)
+        u = pickle.loads(data)
+        assert type(u) is PickledContract
+        assert u == t and u.b == 4
+        u.a = 'bar'
+        assert t.a == u'f\xf6o'
+
+    assert pickle.loads(pickle.dumps(PickledContract())).b == 3
+
+    t = PickledDynamicContract(a=[dict(a='foo')], b='1.5', y='bar')
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        u = pickle.loads(pickle.dumps(t, protocol))
+        assert u == t
+        assert u.a == [PickledContract(a='foo')]
+        assert u.y == 'bar'
+        assert u.to_dict() == dict(a=[dict(a='foo', x=3)], b=1.5)
+
+
+def test_copy():
+    class NestedContract(LazyContract):
+        x = ListProperty(IntegerProperty())
+
+    class TestContract(DynamicContract):
+        a = StringProperty()
+        b = ObjectProperty(NestedContract)
+        c = ListProperty(ObjectProperty(NestedContract))
+        d = FloatProperty()
+
+    class SlottedTestContract(TestContract):
+        _slotted = True
+        _lazy = True
+
+    for contract in (TestContract, SlottedTestContract):
+        t = contract(a='foo', b=dict(x=[1]), c=[dict(x=[2])], y=dict(z=[3]))
+        t.d = None
+
+        u = copy.copy(t)
+        assert type(u) is contract and u == t and u.y == t.y
+        assert u.b is t.b and u.c is t.c
+        u.a = 'bar'
+        assert t.a == 'foo'
+
+        u = copy.deepcopy(t)
+        assert type(u) is contract and u == t and u.y == t.y
+        assert u.a is t.a and u.d is None
+        assert u.b is not t.b and u.b.x is not t.b.x
+        assert u.c is not t.c and u.c[0] is not t.c[0]
+        assert u.y is not t.y
+        u.b.x.append(4)
+        u.c[0].x.append(5)
+        assert t.b.x == [1] and t.c[0].x == [2]
+
+    t = PickledContract(a='foo')
+    shared = [t, t]
+    u = copy.deepcopy(shared)
+    assert u[0] is u[1] and u[0] == t and u[0] is not t
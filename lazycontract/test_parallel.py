@@ -0,0 +1,51 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, DynamicContract, LazyContractValidationError
+from .properties import StringProperty, IntegerProperty, ListProperty, ObjectProperty
+from .parallel import deserialize_many, ProcessPoolExecutor
+
+
+class NestedContract(LazyContract):
+    x = IntegerProperty()
+
+
+class ParallelContract(LazyContract):
+    a = IntegerProperty(required=True)
+    b = StringProperty(name='_b')
+    c = ListProperty(ObjectProperty(NestedContract))
+
+
+class LazySlottedContract(DynamicContract):
+    _lazy = True
+    _slotted = True
+
+    a = IntegerProperty()
+
+
+def test_deserialize_many():
+    objs = [dict(a=str(i), _b='x' * i, c=[dict(x=i)]) for i in range(25)]
+    expected = ParallelContract.from_dicts(objs)
+    assert deserialize_many(ParallelContract, objs, workers=1) == expected
+
+    if ProcessPoolExecutor is None:
+        return
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        contracts = deserialize_many(ParallelContract, iter(objs), chunk_size=4, executor=executor)
+        assert contracts == expected
+        assert [c.b for c in contracts] == [c.b for c in expected]
+        assert contracts[3].c[0].x == 3
+
+        objs = [dict(a=i, extra=[i]) for i in range(10)]
+        contracts = deserialize_many(LazySlottedContract, objs, chunk_size=3, executor=executor)
+        assert [(c.a, c.extra) for c in contracts] == [(i, [i]) for i in range(10)]
+
+        try:
+            deserialize_many(ParallelContract, [dict(a=1), dict(b='x')], chunk_size=1,
+                             executor=executor)
+            assert 'LazyContractValidationError expected' == False
+        except LazyContractValidationError:
+            pass
+
+    assert deserialize_many(ParallelContract, [dict(a=i) for i in range(9)], workers=2,
+                            chunk_size=2) == [ParallelContract(a=i) for i in range(9)]
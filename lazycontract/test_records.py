@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError, LazyContractValidationError
+from .properties import IntegerProperty, FloatProperty, BooleanProperty, StringProperty
+from .extra import UUIDProperty
+from . import records
+
+import uuid
+
+
+class SampleContract(LazyContract):
+    a = IntegerProperty(width=2)
+    b = IntegerProperty(width=8, name='_b')
+    c = FloatProperty()
+    d = BooleanProperty()
+    e = UUIDProperty()
+
+
+def test_records():
+    assert records.record_size(SampleContract) == 1 + 2 + 8 + 8 + 1 + 16
+
+    samples = [SampleContract(a=i, b=-i * 2 ** 40, c=i / 2.0, d=i % 2 == 0,
+                              e=uuid.UUID(int=i)) for i in range(10)]
+    samples[3].a = None
+    samples[4].e = None
+    samples[9].b = None  # hidden from to_dict
+    data = records.pack(SampleContract, samples[:9] + [samples[9].to_dict()])
+    assert len(data) == 10 * records.record_size(SampleContract)
+
+    view = records.StructRecords(SampleContract, data)
+    assert len(view) == 10
+    assert list(view) == samples
+    assert view.to_contracts() == samples
+    assert view.to_dicts() == [s.to_dict() for s in samples]
+    assert view[3].a is None and view[-2].b == -8 * 2 ** 40 and view[-1].b is None
+    assert view[4].e is None and view[5].e == uuid.UUID(int=5)
+    assert view[2].d is True and view[2] != view[3]
+
+    # records are views of the buffer
+    view[0].a = 1000
+    view[0].e = None
+    view[1].c = None
+    assert records.StructRecords(SampleContract, bytes(data))[0] == SampleContract(
+        a=1000, b=0, c=0.0, d=True)
+    assert view[1].c is None
+
+    # record views can be packed into other buffers
+    assert list(records.StructRecords(SampleContract, records.pack(SampleContract, view))) == list(view)
+
+    try:
+        view[10]
+        assert 'IndexError expected' == False
+    except IndexError:
+        pass
+
+    try:
+        view[0].a = 2 ** 15
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+    try:
+        view[0].d = 'yes'
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+    try:
+        records.pack(SampleContract, [SampleContract(a=2 ** 15)])
+        assert 'LazyContractValidationError expected' == False
+    except LazyContractValidationError:
+        pass
+
+
+def test_records_errors():
+    class UnsizedContract(LazyContract):
+        a = IntegerProperty()
+
+    class StringContract(LazyContract):
+        a = StringProperty()
+
+    for cls in (UnsizedContract, StringContract):
+        try:
+            records.record_size(cls)
+            assert 'LazyContractError expected' == False
+        except LazyContractError:
+            pass
+
+    try:
+        IntegerProperty(width=3)
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
+
+    try:
+        records.StructRecords(SampleContract, bytearray(5))
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .properties import StringProperty, IntegerProperty, ListProperty
+from .extra import UUIDProperty
+from .store import MMapStore
+from .codecs import binary
+
+import os
+import shutil
+import tempfile
+import uuid
+
+
+class RecordContract(LazyContract):
+    id = UUIDProperty()
+    a = IntegerProperty()
+    b = StringProperty()
+    c = ListProperty(IntegerProperty())
+
+
+def test_store():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'records')
+        records = [RecordContract(id=uuid.UUID(int=i), a=i, b='x' * i, c=[i]) for i in range(20)]
+        write_key = binary.value_codec(RecordContract.id)[0]
+        key = bytearray()
+        write_key(key, uuid.UUID(int=30))
+
+        with MMapStore(path, RecordContract, key='id') as store:
+            assert len(store) == 0
+            assert store.append(records[0]) == 0
+            assert store[0] == records[0]
+            store.extend(records[1:])
+            assert len(store) == 20
+            # the keys are on disk before the index entries which refer to them
+            assert os.path.getsize(path + '.keys') == 20 * len(key)
+            assert store[-1] == records[19]
+            assert list(store) == records
+            assert store.get(uuid.UUID(int=7)) == records[7]
+
+        # a partially appended record is discarded when reopened
+        with open(path, 'ab') as f:
+            f.write(b'\x01\x02')
+
+        with MMapStore(path, RecordContract, key='id') as store:
+            assert len(store) == 20
+            assert uuid.UUID(int=3) in store
+            assert uuid.UUID(int=30) not in store
+            assert store.get(uuid.UUID(int=30)) is None
+            store.append(RecordContract(id=uuid.UUID(int=3), a=-3))
+            assert store.get(uuid.UUID(int=3)) == RecordContract(id=uuid.UUID(int=3), a=-3)
+
+        # as is the key of a record whose index entry wasn't written
+        with open(path + '.keys', 'ab') as f:
+            f.write(bytes(key))
+
+        with MMapStore(path, RecordContract, key='id') as store:
+            assert len(store) == 21
+            assert uuid.UUID(int=30) not in store
+            store.append(RecordContract(id=uuid.UUID(int=31), a=31))
+
+        with MMapStore(path, RecordContract, key='id') as store:
+            assert len(store) == 22
+            assert uuid.UUID(int=30) not in store
+            assert store.get(uuid.UUID(int=31)).a == 31
+            assert store.positions()[uuid.UUID(int=31)] == 21
+
+        with MMapStore(path, RecordContract, readonly=True) as store:
+            assert len(store) == 22
+            assert store[5] == records[5]
+            assert list(store)[:20] == records
+
+            try:
+                store.append(records[0])
+                assert 'LazyContractError expected' == False
+            except LazyContractError:
+                pass
+
+            try:
+                store.get(uuid.UUID(int=3))
+                assert 'LazyContractError expected' == False
+            except LazyContractError:
+                pass
+
+            try:
+                store[22]
+                assert 'IndexError expected' == False
+            except IndexError:
+                pass
+
+        with MMapStore(path, RecordContract, key='id', readonly=True) as store:
+            assert store.get(uuid.UUID(int=3)).a == -3
+            assert store.positions()[uuid.UUID(int=4)] == 4
+
+        class OtherContract(LazyContract):
+            a = StringProperty()
+
+        try:
+            MMapStore(path, OtherContract)
+            assert 'LazyContractError expected' == False
+        except LazyContractError:
+            pass
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,136 @@
+from __future__ import absolute_import
+
+from .contract import LazyContract, LazyContractError
+from .properties import StringProperty, IntegerProperty
+from .extra import UUIDProperty
+from .stream import read_jsonl, read_json_array, LazyContractStreamError, JSONLIndex
+
+import io
+import uuid
+
+
+class StreamContract(LazyContract):
+    a = StringProperty()
+    b = IntegerProperty()
+
+
+LINES = b'{"a": "foo", "b": 1}\n\n{"a": "bar", "b": "x"}\n{"a": \n{"a": "baz", "b": 3}'
+
+
+def test_read_jsonl():
+    f = io.BytesIO(b'{"a": "foo", "b": 1}\n\n{"a": "bar"}\n')
+    assert list(read_jsonl(f, StreamContract, chunk_size=4)) == [
+            StreamContract(a='foo', b=1), StreamContract(a='bar')]
+
+    # lines spanning many chunks
+    long = 'x' * 10000
+    f = io.BytesIO(b'{"a": "%s"}\n{"b": 2}\n{"a": "%s"}' % (long.encode('ascii'), long.encode('ascii')))
+    assert list(read_jsonl(f, StreamContract, chunk_size=3)) == [
+            StreamContract(a=long), StreamContract(b=2), StreamContract(a=long)]
+
+    f = io.StringIO(u'{"a": "foo", "b": 1}\n{"a": "bar"}')
+    assert list(read_jsonl(f, StreamContract, batch_size=1)) == [
+            [StreamContract(a='foo', b=1)], [StreamContract(a='bar')]]
+
+
+def test_read_jsonl_errors():
+    try:
+        list(read_jsonl(io.BytesIO(LINES), StreamContract))
+        assert 'LazyContractStreamError expected' == False
+    except LazyContractStreamError as e:
+        assert e.line_number == 3
+
+    expected = [StreamContract(a='foo', b=1), StreamContract(a='baz', b=3)]
+    assert list(read_jsonl(io.BytesIO(LINES), StreamContract, on_error='skip')) == expected
+
+    errors = []
+    batches = list(read_jsonl(io.BytesIO(LINES), StreamContract, batch_size=10,
+                              on_error='collect', errors=errors))
+    assert batches == [expected]
+    assert [e.line_number for e in errors] == [3, 4]
+
+
+def test_read_json_array():
+    document = u'[{"a": "f\u00f6o", "b": 1}, {"a": "b\\\\\\"]}", "b": "2"}, {}]'
+    expected = [StreamContract(a=u'f\u00f6o', b=1), StreamContract(a='b\\"]}', b=2), StreamContract()]
+
+    for chunk_size in (1, 7, 65536):
+        f = io.BytesIO(document.encode('utf-8'))
+        assert list(read_json_array(f, StreamContract, chunk_size=chunk_size)) == expected
+
+    document = u'{"skip": {"items": [1, "]"]}, "meta": {"items": %s}}' % document
+    for chunk_size in (1, 5, 65536):
+        f = io.StringIO(document)
+        assert list(read_json_array(f, StreamContract, path=('meta', 'items'),
+                                    chunk_size=chunk_size)) == expected
+
+    assert list(read_json_array(io.BytesIO(b' [ ] '), StreamContract)) == []
+
+
+def test_read_json_array_errors():
+    for document in (b'[{"a": "foo"}, {"a": ', b'{"items": []}', b'[{"b": "x"}]'):
+        try:
+            list(read_json_array(io.BytesIO(document), StreamContract))
+            assert 'LazyContractStreamError expected' == False
+        except LazyContractStreamError:
+            pass
+
+    try:
+        list(read_json_array(io.BytesIO(b'{"a": [], "b": 1}'), StreamContract, path=('c',)))
+        assert 'LazyContractStreamError expected' == False
+    except LazyContractStreamError as e:
+        assert 'key \'c\'' in str(e)
+
+
+def test_jsonl_index():
+    class KeyedContract(LazyContract):
+        id = UUIDProperty()
+        a = StringProperty()
+
+    ids = [uuid.UUID(int=i) for i in range(5)]
+    lines = [u'{{"id": "{}", "a": "{}"}}'.format(ids[i], u'h\xe9llo' * i) for i in range(5)]
+    lines[2] = u'{"a": "no key"}'
+    data = (u'\n'.join(lines[:3]) + u'\n\n' + u'\r\n'.join(lines[3:])).encode('utf-8')
+
+    entries = []
+    for chunk_size in (3, 65536):
+        index = JSONLIndex.build(io.BytesIO(data), KeyedContract, 'id', chunk_size=chunk_size)
+        assert len(index) == 4
+        entries.append(index.entries)
+    assert entries[0] == entries[1]
+
+    saved = io.BytesIO()
+    index.save(saved)
+    saved.seek(0)
+    index = JSONLIndex.load(saved, KeyedContract, 'id')
+    assert len(index) == 4
+    assert ids[3] in index and str(ids[4]) in index and ids[2] not in index
+
+    f = io.BytesIO(data)
+    assert index.read(f, ids[4]) == KeyedContract(id=ids[4], a=u'h\xe9llo' * 4)
+    assert index.read_many(f, [str(ids[3]), ids[2], ids[0]]) == [
+            KeyedContract(id=ids[3], a=u'h\xe9llo' * 3), None, KeyedContract(id=ids[0], a=u'')]
+
+    try:
+        index.read(f, ids[2])
+        assert 'KeyError expected' == False
+    except KeyError:
+        pass
+
+    try:
+        index.read_many(f, [ids[2]], missing='skip')
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
+
+    try:
+        JSONLIndex.build(io.BytesIO(LINES), KeyedContract, 'a')
+        assert 'LazyContractStreamError expected' == False
+    except LazyContractStreamError as e:
+        assert e.line_number == 4
+
+    try:
+        JSONLIndex.load(io.BytesIO(b'{}'), KeyedContract, 'id')
+        assert 'LazyContractError expected' == False
+    except LazyContractError:
+        pass
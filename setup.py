@@ -11,7 +11,7 @@ setup(name='lazycontract',
       license='MIT',
       platforms=['Any'],
       url='https://github.com/neilisaac/lazycontract',
-      packages=['lazycontract'],
+      packages=['lazycontract', 'lazycontract.codecs'],
       install_requires=['six'],
       tests_require=['pytest', 'tox'],
       classifiers=[